@@ -1,8 +1,10 @@
 """Energosbyt API"""
+
 __all__ = (
     "CONFIG_SCHEMA",
     "async_unload_entry",
     "async_reload_entry",
+    "async_remove_entry",
     "async_setup",
     "async_setup_entry",
     "config_flow",
@@ -18,30 +20,74 @@ from typing import Any, Dict, List, Mapping, Optional, Tuple
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import ServiceCall
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.typing import ConfigType, HomeAssistantType
 
+from custom_components.tns_energo._backfill import (
+    ATTR_KINDS,
+    BackfillJob,
+    SERVICE_BACKFILL,
+    SERVICE_BACKFILL_SCHEMA,
+    async_remove_backfill_state,
+)
 from custom_components.tns_energo._base import UpdateDelegatorsDataType
+from custom_components.tns_energo._bulk import (
+    EVENT_PUSH_INDICATIONS_BULK,
+    SERVICE_PUSH_INDICATIONS_BULK,
+    SERVICE_PUSH_INDICATIONS_BULK_SCHEMA,
+    async_push_indications_bulk,
+)
+from custom_components.tns_energo._coordinator import TNSEnergoCoordinator
+from custom_components.tns_energo._export import (
+    ATTR_FORMAT,
+    ATTR_KIND,
+    ATTR_OVERWRITE,
+    ATTR_PATH,
+    ATTR_SYNC,
+    EVENT_EXPORT_HISTORY,
+    SERVICE_EXPORT_HISTORY,
+    SERVICE_EXPORT_HISTORY_SCHEMA,
+    async_export_history,
+)
+from custom_components.tns_energo._http import (
+    async_attach_shared_connector,
+    async_update_rate_limits,
+)
+from custom_components.tns_energo._queue import SubmissionQueue, async_remove_queue_state
 from custom_components.tns_energo._schema import CONFIG_ENTRY_SCHEMA
+from custom_components.tns_energo._store import SnapshotStore
 from custom_components.tns_energo._util import (
     IS_IN_RUSSIA,
     _find_existing_entry,
     _make_log_prefix,
+    get_circuit_breaker,
     mask_username,
 )
 from custom_components.tns_energo.const import (
+    ATTR_COMMENT,
+    ATTR_END,
+    ATTR_IGNORE_INDICATIONS,
+    ATTR_INCREMENTAL,
+    ATTR_START,
+    ATTR_SUCCESS,
+    CONF_ACCOUNTS,
+    CONF_MAX_BACKOFF,
+    CONF_MAX_CONCURRENCY,
+    CONF_METERS,
     CONF_USER_AGENT,
     DATA_API_OBJECTS,
+    DATA_BACKFILL_JOBS,
+    DATA_COORDINATORS,
     DATA_ENTITIES,
     DATA_FINAL_CONFIG,
+    DATA_SUBMISSION_QUEUES,
     DATA_UPDATE_DELEGATORS,
     DATA_UPDATE_LISTENERS,
     DATA_YAML_CONFIG,
     DOMAIN,
     SUPPORTED_PLATFORMS,
 )
-from tns_energo_api.exceptions import EmptyResultException
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -83,6 +129,81 @@ CONFIG_SCHEMA = vol.Schema(
 
 async def async_setup(hass: HomeAssistantType, config: ConfigType):
     """Set up the TNS Energo component."""
+
+    async def _async_service_backfill(call: ServiceCall) -> None:
+        """Start history backfill for every (or every matching) loaded config entry"""
+        account_codes = call.data.get(CONF_ACCOUNTS)
+
+        for entry_id, backfill_job in hass.data.get(DATA_BACKFILL_JOBS, {}).items():
+            coordinator: TNSEnergoCoordinator = hass.data[DATA_COORDINATORS][entry_id]
+            entry_account_codes = (
+                None
+                if account_codes is None
+                else [code for code in account_codes if code in coordinator.accounts]
+            )
+            if entry_account_codes == []:
+                continue
+
+            await backfill_job.async_start(entry_account_codes, call.data[ATTR_KINDS])
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_BACKFILL, _async_service_backfill, SERVICE_BACKFILL_SCHEMA
+    )
+
+    async def _async_service_push_indications_bulk(call: ServiceCall) -> None:
+        """Submit indications for multiple meters, firing a single aggregated event"""
+        event_data = await async_push_indications_bulk(
+            hass,
+            call.data[CONF_METERS],
+            incremental=call.data[ATTR_INCREMENTAL],
+            ignore_indications=call.data[ATTR_IGNORE_INDICATIONS],
+            max_concurrency=call.data[CONF_MAX_CONCURRENCY],
+        )
+        hass.bus.async_fire(EVENT_PUSH_INDICATIONS_BULK, event_data)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PUSH_INDICATIONS_BULK,
+        _async_service_push_indications_bulk,
+        SERVICE_PUSH_INDICATIONS_BULK_SCHEMA,
+    )
+
+    async def _async_service_export_history(call: ServiceCall) -> None:
+        """Export stored history into a file, firing an event upon completion"""
+        try:
+            event_data = await async_export_history(
+                hass,
+                call.data[ATTR_KIND],
+                export_format=call.data[ATTR_FORMAT],
+                path=call.data.get(ATTR_PATH),
+                start=call.data[ATTR_START],
+                end=call.data[ATTR_END],
+                account_codes=call.data.get(CONF_ACCOUNTS),
+                sync=call.data[ATTR_SYNC],
+                overwrite=call.data[ATTR_OVERWRITE],
+            )
+        except (OSError, ValueError) as e:
+            _LOGGER.error(
+                ("Ошибка экспорта истории" if IS_IN_RUSSIA else "History export failed")
+                + ": "
+                + str(e)
+            )
+            event_data = {
+                ATTR_KIND: call.data[ATTR_KIND],
+                ATTR_FORMAT: call.data[ATTR_FORMAT],
+                ATTR_PATH: call.data.get(ATTR_PATH),
+                ATTR_SUCCESS: False,
+                ATTR_COMMENT: str(e),
+            }
+        hass.bus.async_fire(EVENT_EXPORT_HISTORY, event_data)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_HISTORY,
+        _async_service_export_history,
+        SERVICE_EXPORT_HISTORY_SCHEMA,
+    )
+
     domain_config = config.get(DOMAIN)
     if not domain_config:
         return True
@@ -221,101 +342,43 @@ async def async_setup_entry(hass: HomeAssistantType, config_entry: config_entrie
     )
 
     from tns_energo_api import TNSEnergoAPI
-    from tns_energo_api.exceptions import TNSEnergoException
 
     api_object = TNSEnergoAPI(
         username=username,
         password=user_cfg[CONF_PASSWORD],
     )
+    await async_attach_shared_connector(hass, api_object)
+    get_circuit_breaker(api_object).max_open_interval = user_cfg[CONF_MAX_BACKOFF].total_seconds()
 
-    try:
-        try:
-            await api_object.async_authenticate()
-
-        except TNSEnergoException as e:
-            _LOGGER.error(
-                log_prefix
-                + ("Невозможно выполнить авторизацию" if IS_IN_RUSSIA else "Error authenticating")
-                + ": "
-                + repr(e)
-            )
-            raise ConfigEntryNotReady
+    snapshot_store = SnapshotStore(hass, entry_id)
+    snapshot = await snapshot_store.async_load(api_object)
 
-        accounts = None
-        for i in range(3):
-            _LOGGER.debug(
-                log_prefix
-                + (
-                    "Ожидание перед запросом лицевых счетов"
-                    if IS_IN_RUSSIA
-                    else "Waiting before requesting accounts"
-                )
-            )
-            await asyncio.sleep(5)
-
-            try:
-                accounts = await api_object.async_get_accounts_list()
-            except EmptyResultException:
-                _LOGGER.warning(
-                    log_prefix
-                    + (
-                        "Получен пустой ответ на запрос лицевых счетов"
-                        if IS_IN_RUSSIA
-                        else "Received empty response to accounts request"
-                    )
-                )
-            except TNSEnergoException:
-                log_message = (
-                    (
-                        "Ошибка получения данных о лицевых счетах"
-                        if IS_IN_RUSSIA
-                        else "Error retrieving account information"
-                    )
-                    + ": "
-                    + str(e)
-                )
-                _LOGGER.error(log_prefix + log_message)
-                raise ConfigEntryNotReady(log_message)
-            else:
-                break
-
-        if accounts is None:
-            log_message = (
-                "Невозможно получить данные о лицевых счетах"
+    if snapshot is not None:
+        _LOGGER.debug(
+            log_prefix
+            + (
+                f"Восстановление данных из сохранённого снимка ({len(snapshot[0])} лицевых счетов)"
                 if IS_IN_RUSSIA
-                else "Unable to fetch accounts data"
+                else f"Restoring data from stored snapshot ({len(snapshot[0])} accounts)"
             )
-            _LOGGER.error(log_prefix + log_message)
-            raise ConfigEntryNotReady(log_message)
-
-    except BaseException:
-        await api_object.async_close()
-        raise
-
-    if not accounts:
-        # Cancel setup because no accounts provided
-        _LOGGER.warning(
-            log_prefix + ("Лицевые счета не найдены" if IS_IN_RUSSIA else "No accounts found")
-        )
-        await api_object.async_close()
-        return False
-
-    _LOGGER.debug(
-        log_prefix
-        + (
-            f"Найдено {len(accounts)} лицевых счетов"
-            if IS_IN_RUSSIA
-            else f"Found {len(accounts)} accounts"
         )
-    )
 
     api_objects: Dict[str, "TNSEnergoAPI"] = hass_data.setdefault(DATA_API_OBJECTS, {})
 
     # Create placeholders
     api_objects[entry_id] = api_object
+    coordinator = TNSEnergoCoordinator(hass, config_entry, api_object, user_cfg, snapshot_store)
+    if snapshot is not None:
+        coordinator.async_restore(snapshot)
+    hass_data.setdefault(DATA_COORDINATORS, {})[entry_id] = coordinator
+    backfill_job = BackfillJob(coordinator)
+    hass_data.setdefault(DATA_BACKFILL_JOBS, {})[entry_id] = backfill_job
+    submission_queue = SubmissionQueue(coordinator)
+    hass_data.setdefault(DATA_SUBMISSION_QUEUES, {})[entry_id] = submission_queue
     hass_data.setdefault(DATA_ENTITIES, {})[entry_id] = {}
     hass_data.setdefault(DATA_FINAL_CONFIG, {})[entry_id] = user_cfg
     hass.data.setdefault(DATA_UPDATE_DELEGATORS, {})[entry_id] = {}
+    async_update_rate_limits(hass)
 
     # Forward entry setup to sensor platform
     for domain in SUPPORTED_PLATFORMS:
@@ -330,6 +393,12 @@ async def async_setup_entry(hass: HomeAssistantType, config_entry: config_entrie
     update_listener = config_entry.add_update_listener(async_reload_entry)
     hass_data.setdefault(DATA_UPDATE_LISTENERS, {})[entry_id] = update_listener
 
+    # Continue backfill interrupted by restart
+    await backfill_job.async_resume()
+
+    # Deliver indications queued before restart
+    await submission_queue.async_resume()
+
     _LOGGER.debug(
         log_prefix + ("Применение конфигурации успешно" if IS_IN_RUSSIA else "Setup successful")
     )
@@ -349,6 +418,16 @@ async def async_reload_entry(
     await hass.config_entries.async_reload(config_entry.entry_id)
 
 
+async def async_remove_entry(
+    hass: HomeAssistantType,
+    config_entry: config_entries.ConfigEntry,
+) -> None:
+    """Remove stored data of Lkcomu TNS Energo entry"""
+    await SnapshotStore(hass, config_entry.entry_id).async_remove()
+    await async_remove_backfill_state(hass, config_entry.entry_id)
+    await async_remove_queue_state(hass, config_entry.entry_id)
+
+
 async def async_unload_entry(
     hass: HomeAssistantType,
     config_entry: config_entries.ConfigEntry,
@@ -367,8 +446,12 @@ async def async_unload_entry(
     unload_ok = all(await asyncio.gather(*tasks))
 
     if unload_ok:
-        hass.data[DATA_API_OBJECTS].pop(entry_id)
+        hass.data[DATA_COORDINATORS].pop(entry_id).async_stop(cancel_background_tasks=True)
+        hass.data[DATA_BACKFILL_JOBS].pop(entry_id)
+        hass.data[DATA_SUBMISSION_QUEUES].pop(entry_id).async_stop()
+        await hass.data[DATA_API_OBJECTS].pop(entry_id).async_close()
         hass.data[DATA_FINAL_CONFIG].pop(entry_id)
+        async_update_rate_limits(hass)
 
         cancel_listener = hass.data[DATA_UPDATE_LISTENERS].pop(entry_id)
         cancel_listener()
@@ -0,0 +1,205 @@
+__all__ = (
+    "BACKFILL_KINDS",
+    "BackfillJob",
+    "EVENT_BACKFILL_PROGRESS",
+    "SERVICE_BACKFILL",
+    "SERVICE_BACKFILL_SCHEMA",
+    "async_remove_backfill_state",
+)
+
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+import voluptuous as vol
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import HomeAssistantType
+
+from custom_components.tns_energo._history import (
+    async_get_history_store,
+    async_sync_indications,
+    async_sync_payments,
+)
+from custom_components.tns_energo._util import IS_IN_RUSSIA, PRIORITY_BACKFILL, request_priority
+from custom_components.tns_energo.const import ATTR_ACCOUNT_CODE, CONF_ACCOUNTS, DOMAIN
+from tns_energo_api.exceptions import TNSEnergoException
+
+if TYPE_CHECKING:
+    from custom_components.tns_energo._coordinator import TNSEnergoCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+EVENT_BACKFILL_PROGRESS = DOMAIN + "_backfill_progress"
+
+BACKFILL_KIND_INDICATIONS = "indications"
+BACKFILL_KIND_PAYMENTS = "payments"
+BACKFILL_KINDS = (BACKFILL_KIND_INDICATIONS, BACKFILL_KIND_PAYMENTS)
+
+ATTR_KINDS = "kinds"
+
+SERVICE_BACKFILL = "backfill"
+SERVICE_BACKFILL_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_ACCOUNTS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_KINDS, default=list(BACKFILL_KINDS)): vol.All(
+            cv.ensure_list, [vol.In(BACKFILL_KINDS)]
+        ),
+    }
+)
+
+# Pause between consecutive chunks, on top of the host rate limiter
+BACKFILL_CHUNK_DELAY = 1.0
+
+# Delay before retrying a chunk which failed due to portal errors
+BACKFILL_RETRY_DELAY = 60.0
+
+
+def _make_store(hass: HomeAssistantType, entry_id: str) -> Store:
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.backfill.{entry_id}")
+
+
+async def async_remove_backfill_state(hass: HomeAssistantType, entry_id: str) -> None:
+    await _make_store(hass, entry_id).async_remove()
+
+
+class BackfillJob:
+    """Checkpointed historical backfill of a single config entry.
+
+    The job is split into chunks of one data kind of one account. The portal
+    only serves whole-history responses per account, hence every chunk fetches
+    and stores the complete history, marking it as synchronized (see
+    `async_sync_indications` and `async_sync_payments`). Chunks are fetched
+    sequentially with backfill priority, and the list of pending chunks is
+    persisted after every chunk, so the job resumes after a restart."""
+
+    def __init__(self, coordinator: "TNSEnergoCoordinator") -> None:
+        self.coordinator = coordinator
+        self.hass = coordinator.hass
+        self._store = _make_store(self.hass, coordinator.config_entry.entry_id)
+        self._state: Optional[Dict[str, Any]] = None
+        self._task: Optional["asyncio.Task"] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def async_start(
+        self,
+        account_codes: Optional[Iterable[str]] = None,
+        kinds: Iterable[str] = BACKFILL_KINDS,
+    ) -> None:
+        """Replace any pending job with a new one and run it in background"""
+        if self._task is not None:
+            self._task.cancel()
+
+        if account_codes is None:
+            account_codes = self.coordinator.accounts.keys()
+
+        chunks = [
+            [account_code, kind]
+            for account_code in account_codes
+            if account_code in self.coordinator.accounts
+            for kind in kinds
+        ]
+
+        self._state = {
+            "total": len(chunks),
+            "pending": chunks,
+        }
+        await self._store.async_save(self._state)
+
+        self._task = self.coordinator.async_create_background_task(self._async_run())
+
+    async def async_resume(self) -> None:
+        """Continue job left unfinished before restart (if any)"""
+        state = await self._store.async_load()
+        if not state or not state.get("pending"):
+            return
+
+        _LOGGER.info(
+            self.coordinator.log_prefix
+            + (
+                f"Продолжение загрузки истории ({len(state['pending'])} из {state['total']})"
+                if IS_IN_RUSSIA
+                else f"Resuming history backfill ({len(state['pending'])} of {state['total']})"
+            )
+        )
+
+        self._state = state
+        self._task = self.coordinator.async_create_background_task(self._async_run())
+
+    async def _async_fetch_chunk(self, account_code: str, kind: str) -> int:
+        account = self.coordinator.accounts[account_code]
+        history_store = async_get_history_store(self.hass)
+
+        if kind == BACKFILL_KIND_INDICATIONS:
+            return await async_sync_indications(history_store, account, full=True)
+
+        return await async_sync_payments(history_store, account, full=True)
+
+    async def _async_run(self) -> None:
+        state = self._state
+        pending: List[List[str]] = state["pending"]
+        total = state["total"]
+
+        while pending:
+            account_code, kind = pending[0]
+
+            if not self.coordinator.accounts:
+                # Accounts are not discovered yet after restart
+                await asyncio.sleep(BACKFILL_RETRY_DELAY)
+                continue
+
+            if account_code not in self.coordinator.accounts:
+                stored = 0
+            else:
+                try:
+                    with request_priority(PRIORITY_BACKFILL):
+                        stored = await self._async_fetch_chunk(account_code, kind)
+                except TNSEnergoException as e:
+                    _LOGGER.warning(
+                        self.coordinator.log_prefix
+                        + (
+                            f"Ошибка загрузки истории, повтор через {BACKFILL_RETRY_DELAY:.0f} сек."
+                            if IS_IN_RUSSIA
+                            else f"Error backfilling history, "
+                            f"retrying in {BACKFILL_RETRY_DELAY:.0f} seconds"
+                        )
+                        + ": "
+                        + repr(e)
+                    )
+                    await asyncio.sleep(BACKFILL_RETRY_DELAY)
+                    continue
+
+            pending.pop(0)
+            await self._store.async_save(state)
+
+            completed = total - len(pending)
+            self.hass.bus.async_fire(
+                EVENT_BACKFILL_PROGRESS,
+                {
+                    "entry_id": self.coordinator.config_entry.entry_id,
+                    ATTR_ACCOUNT_CODE: account_code,
+                    "kind": kind,
+                    "stored": stored,
+                    "completed": completed,
+                    "total": total,
+                    "finished": not pending,
+                },
+            )
+
+            _LOGGER.debug(
+                self.coordinator.log_prefix
+                + f"Backfill progress: {completed}/{total} ({kind}: {stored} rows)"
+            )
+
+            if pending:
+                await asyncio.sleep(BACKFILL_CHUNK_DELAY)
+
+        _LOGGER.info(
+            self.coordinator.log_prefix
+            + ("Загрузка истории завершена" if IS_IN_RUSSIA else "History backfill finished")
+        )
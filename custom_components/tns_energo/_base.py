@@ -36,23 +36,23 @@ from typing import (
 from urllib.parse import urlparse
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import ATTR_ATTRIBUTION, CONF_DEFAULT, CONF_SCAN_INTERVAL, CONF_USERNAME
+from homeassistant.const import ATTR_ATTRIBUTION, CONF_SCAN_INTERVAL, CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.helpers import entity_platform
 from homeassistant.helpers.entity import Entity
-from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.typing import ConfigType, HomeAssistantType, StateType
-from homeassistant.util import as_local, utcnow
 
-from custom_components.tns_energo._util import IS_IN_RUSSIA, mask_username, with_auto_auth
+from custom_components.tns_energo._util import IS_IN_RUSSIA, mask_username
 from custom_components.tns_energo.const import (
     ATTRIBUTION_EN,
     ATTRIBUTION_RU,
     ATTR_ACCOUNT_CODE,
     ATTR_ACCOUNT_ID,
-    CONF_ACCOUNTS,
+    ATTR_STALE,
+    ATTR_STALE_SINCE,
     CONF_DEV_PRESENTATION,
     CONF_NAME_FORMAT,
-    DATA_API_OBJECTS,
+    DATA_COORDINATORS,
     DATA_ENTITIES,
     DATA_FINAL_CONFIG,
     DATA_UPDATE_DELEGATORS,
@@ -65,10 +65,12 @@ from custom_components.tns_energo.const import (
 )
 
 if TYPE_CHECKING:
-    from tns_energo_api import Account, TNSEnergoAPI
+    from tns_energo_api import Account
 
     from homeassistant.helpers.entity_registry import RegistryEntry
 
+    from custom_components.tns_energo._coordinator import DataSignatureType, TNSEnergoCoordinator
+
 _LOGGER = logging.getLogger(__name__)
 
 _TTNSEnergoEntity = TypeVar("_TTNSEnergoEntity", bound="TNSEnergoEntity")
@@ -175,8 +177,6 @@ async def async_refresh_api_data(hass: HomeAssistantType, config_entry: ConfigEn
             + pformat(final_config)
         )
 
-    tasks = []
-
     async def _wrap_update_task(update_task):
         try:
             return await update_task
@@ -187,105 +187,143 @@ async def async_refresh_api_data(hass: HomeAssistantType, config_entry: ConfigEn
             )
             return None
 
-    accounts_config = final_config.get(CONF_ACCOUNTS) or {}
-    account_default_config = final_config[CONF_DEFAULT]
-
-    api: "TNSEnergoAPI" = hass.data[DATA_API_OBJECTS][entry_id]
-    accounts = await with_auto_auth(api, api.async_get_accounts_list)
+    coordinator: "TNSEnergoCoordinator" = hass.data[DATA_COORDINATORS][entry_id]
 
-    for account in accounts:
-        account_config = accounts_config.get(account.code)
-        account_log_prefix_base = refresh_log_prefix + f"[{mask_username(account.code)}]"
+    for platform, (async_add_entities, entity_classes) in update_delegators.items():
+        for entity_cls in entity_classes:
+            coordinator.register_fetcher(
+                entity_cls.config_key,
+                entity_cls.async_fetch_account_data,
+                entity_cls.is_refresh_due,
+            )
+            for upstream_key, signature in entity_cls.refresh_depends_on.items():
+                coordinator.register_dependency(upstream_key, entity_cls.config_key, signature)
 
-        if account_config is None:
-            account_config = account_default_config
+    async def _async_add_entities() -> None:
+        tasks = []
 
-        if account_config is False:
-            continue
+        for account in coordinator.accounts.values():
+            account_config = coordinator.get_account_config(account.code)
+            account_log_prefix_base = refresh_log_prefix + f"[{mask_username(account.code)}]"
 
-        for platform, (async_add_entities, entity_classes) in update_delegators.items():
-            platform_log_prefix_base = account_log_prefix_base + f"[{platform}]"
-            for entity_cls in entity_classes:
-                cls_log_prefix_base = platform_log_prefix_base + f"[{entity_cls.__name__}]"
-                if account_config[entity_cls.config_key] is False:
-                    _LOGGER.debug(
-                        log_prefix_base
-                        + " "
-                        + (
-                            f"Лицевой счёт пропущен согласно фильтрации"
-                            if IS_IN_RUSSIA
-                            else f"Account skipped due to filtering"
-                        )
-                    )
-                    continue
+            if account_config is False:
+                continue
 
-                if dev_presentation:
-                    dev_key = (entity_cls, account.provider_type)
-                    if dev_key in DEV_CLASSES_PROCESSED:
+            for platform, (async_add_entities, entity_classes) in update_delegators.items():
+                platform_log_prefix_base = account_log_prefix_base + f"[{platform}]"
+                for entity_cls in entity_classes:
+                    cls_log_prefix_base = platform_log_prefix_base + f"[{entity_cls.__name__}]"
+                    if account_config[entity_cls.config_key] is False:
                         _LOGGER.debug(
-                            cls_log_prefix_base
-                            + "[dev] "
+                            log_prefix_base
+                            + " "
                             + (
-                                f"Пропущен лицевой счёт ({mask_username(account.code)}) "
-                                f"по уникальности типа"
+                                f"Лицевой счёт пропущен согласно фильтрации"
                                 if IS_IN_RUSSIA
-                                else f"Account skipped ({mask_username(account.code)}) "
-                                f"due to type uniqueness"
+                                else f"Account skipped due to filtering"
                             )
                         )
                         continue
 
-                    DEV_CLASSES_PROCESSED.add(dev_key)
+                    if dev_presentation:
+                        dev_key = (entity_cls, account.provider_type)
+                        if dev_key in DEV_CLASSES_PROCESSED:
+                            _LOGGER.debug(
+                                cls_log_prefix_base
+                                + "[dev] "
+                                + (
+                                    f"Пропущен лицевой счёт ({mask_username(account.code)}) "
+                                    f"по уникальности типа"
+                                    if IS_IN_RUSSIA
+                                    else f"Account skipped ({mask_username(account.code)}) "
+                                    f"due to type uniqueness"
+                                )
+                            )
+                            continue
 
-                current_entities = entities.setdefault(entity_cls, {})
+                        DEV_CLASSES_PROCESSED.add(dev_key)
 
-                _LOGGER.debug(
-                    cls_log_prefix_base
-                    + "[update] "
-                    + (
-                        "Планирование процедуры обновления"
-                        if IS_IN_RUSSIA
-                        else "Planning update procedure"
+                    current_entities = entities.setdefault(entity_cls, {})
+
+                    _LOGGER.debug(
+                        cls_log_prefix_base
+                        + "[update] "
+                        + (
+                            "Планирование процедуры обновления"
+                            if IS_IN_RUSSIA
+                            else "Planning update procedure"
+                        )
                     )
-                )
 
-                tasks.append(
-                    hass.async_create_task(
-                        _wrap_update_task(
-                            entity_cls.async_refresh_accounts(
-                                current_entities,
-                                account,
-                                config_entry,
-                                account_config,
-                                async_add_entities,
+                    tasks.append(
+                        hass.async_create_task(
+                            _wrap_update_task(
+                                entity_cls.async_refresh_accounts(
+                                    current_entities,
+                                    account,
+                                    coordinator,
+                                    account_config,
+                                    async_add_entities,
+                                )
                             )
                         )
                     )
+
+        if tasks:
+            _LOGGER.info(
+                refresh_log_prefix
+                + (
+                    "Выполняется действий по обновлению"
+                    if IS_IN_RUSSIA
+                    else "Performing update operations"
                 )
+                + ": "
+                + str(len(tasks))
+            )
+            await asyncio.wait(tasks, return_when=asyncio.ALL_COMPLETED)
 
-    if tasks:
-        _LOGGER.info(
-            refresh_log_prefix
-            + (
-                "Выполняется действий по обновлению"
-                if IS_IN_RUSSIA
-                else "Performing update operations"
+        else:
+            _LOGGER.warning(
+                refresh_log_prefix
+                + (
+                    "Отсутствуют подходящие платформы для конфигурации"
+                    if IS_IN_RUSSIA
+                    else "Missing suitable platforms for configuration"
+                )
             )
-            + ": "
-            + str(len(tasks))
-        )
-        await asyncio.wait(tasks, return_when=asyncio.ALL_COMPLETED)
 
-    else:
-        _LOGGER.warning(
+    if coordinator.restored:
+        # Entities are created from the stored snapshot, and revalidated afterwards
+        await _async_add_entities()
+
+    async def _async_discover() -> None:
+        _LOGGER.debug(
             refresh_log_prefix
             + (
-                "Отсутствуют подходящие платформы для конфигурации"
+                "Фоновое получение данных лицевых счетов"
                 if IS_IN_RUSSIA
-                else "Missing suitable platforms for configuration"
+                else "Discovering accounts data in background"
             )
         )
 
+        await coordinator.async_refresh_all_with_backoff()
+
+        if coordinator.auth_failed:
+            return
+
+        if not coordinator.accounts:
+            _LOGGER.warning(
+                refresh_log_prefix
+                + ("Лицевые счета не найдены" if IS_IN_RUSSIA else "No accounts found")
+            )
+            return
+
+        await _async_add_entities()
+
+    # Setup does not wait for the portal; entities appear once discovery completes
+    coordinator.async_create_background_task(_async_discover())
+    coordinator.async_start()
+
 
 class NameFormatDict(dict):
     def __missing__(self, key: str):
@@ -312,6 +350,9 @@ class TNSEnergoEntity(Entity, Generic[_TAccount]):
 
     _supported_services: ClassVar[SupportedServicesType] = {}
 
+    # Upstream data kinds (and their signatures) changes of which trigger a refresh
+    refresh_depends_on: ClassVar[Mapping[str, "DataSignatureType"]] = {}
+
     _attr_should_poll = False
 
     @property
@@ -322,11 +363,30 @@ class TNSEnergoEntity(Entity, Generic[_TAccount]):
         self,
         account: _TAccount,
         account_config: ConfigType,
+        coordinator: "TNSEnergoCoordinator",
     ) -> None:
         self._account: _TAccount = account
         self._account_config: ConfigType = account_config
+        self._coordinator = coordinator
         self._entity_updater = None
 
+        # Fingerprint of the last state written to the state machine
+        self._state_fingerprint: Optional[Tuple[Any, ...]] = None
+        self.suppressed_writes = 0
+
+    @property
+    def account_code(self) -> str:
+        return self._account.code
+
+    @property
+    def coordinator(self) -> "TNSEnergoCoordinator":
+        return self._coordinator
+
+    @property
+    def available(self) -> bool:
+        # Unavailable until the coordinator has data for the account (fetched or restored)
+        return self._account.code in (self._coordinator.data.get(self.config_key) or {})
+
     @property
     def api_hostname(self) -> str:
         return urlparse(self._account.api.lk_region_url).netloc
@@ -393,7 +453,7 @@ class TNSEnergoEntity(Entity, Generic[_TAccount]):
     #################################################################################
 
     @property
-    def device_state_attributes(self):
+    def extra_state_attributes(self):
         """Return the attribute(s) of the sensor"""
 
         attributes = {
@@ -406,6 +466,12 @@ class TNSEnergoEntity(Entity, Generic[_TAccount]):
         if ATTR_ACCOUNT_CODE not in attributes:
             attributes[ATTR_ACCOUNT_CODE] = self._account.code
 
+        # Last known data is kept while the portal is unavailable
+        stale_since = self._coordinator.get_stale_since(self.config_key, self._account.code)
+        attributes[ATTR_STALE] = stale_since is not None
+        if stale_since is not None:
+            attributes[ATTR_STALE_SINCE] = stale_since.isoformat()
+
         self._handle_dev_presentation(
             attributes,
             (ATTR_ACCOUNT_CODE, ATTR_ACCOUNT_ID),
@@ -440,6 +506,8 @@ class TNSEnergoEntity(Entity, Generic[_TAccount]):
 
     async def async_added_to_hass(self) -> None:
         _LOGGER.info(self.log_prefix + "Adding to HomeAssistant")
+        # Platform writes the initial state right after this hook
+        self._state_fingerprint = self.compute_state_fingerprint()
         self.updater_restart()
         self.register_supported_services()
 
@@ -480,45 +548,74 @@ class TNSEnergoEntity(Entity, Generic[_TAccount]):
 
     def updater_restart(self) -> None:
         log_prefix = self.log_prefix
-        scan_interval = self.scan_interval
 
         self.updater_stop()
 
-        async def _update_entity(*_):
-            nonlocal self
+        _LOGGER.debug(
+            log_prefix
+            + (
+                "Подписка на обновления координатора"
+                if IS_IN_RUSSIA
+                else "Subscribing to coordinator updates"
+            )
+        )
+        self._entity_updater = self._coordinator.async_add_listener(
+            self.config_key,
+            self._handle_coordinator_update,
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        coordinator = self._coordinator
+        account_code = self._account.code
+
+        self._account = coordinator.accounts.get(account_code, self._account)
+
+        kind_data = coordinator.data.get(self.config_key) or {}
+        if account_code in kind_data:
+            self.update_from_data(kind_data[account_code])
+
+        self.async_write_ha_state_if_changed()
+
+    def compute_state_fingerprint(self) -> Tuple[Any, ...]:
+        """Fingerprint of everything the entity writes to the state machine"""
+        return (
+            self.available,
+            self.state,
+            self.name,
+            self.icon,
+            self.unit_of_measurement,
+            repr(self.extra_state_attributes),
+        )
+
+    @callback
+    def async_write_ha_state_if_changed(self) -> bool:
+        """Write state only when its fingerprint changed since the last write"""
+        fingerprint = self.compute_state_fingerprint()
+
+        if fingerprint == self._state_fingerprint:
+            self.suppressed_writes += 1
+            self._coordinator.suppressed_writes += 1
             _LOGGER.debug(
-                log_prefix
+                self.log_prefix
                 + (
-                    "Выполнение запланированной задачи обновления"
+                    f"Состояние не изменилось, запись пропущена (всего: {self.suppressed_writes})"
                     if IS_IN_RUSSIA
-                    else "Executing planned update task"
+                    else f"State unchanged, write suppressed (total: {self.suppressed_writes})"
                 )
             )
-            await self.async_update_ha_state(force_refresh=True)
+            return False
 
-        _LOGGER.debug(
-            log_prefix + f"Starting updater "
-            f"(interval: {scan_interval.total_seconds()} seconds, "
-            f"next call: {as_local(utcnow()) + scan_interval})"
-        )
-        self._entity_updater = async_track_time_interval(
-            self.hass,
-            _update_entity,
-            scan_interval,
-        )
+        self._state_fingerprint = fingerprint
+        self.async_write_ha_state()
+        return True
 
     async def updater_execute(self) -> None:
-        self.updater_stop()
-        try:
-            await self.async_update_ha_state(force_refresh=True)
-        finally:
-            self.updater_restart()
+        # Coordinator notifies subscribed entities, which write state only when changed
+        await self.async_update()
 
     async def async_update(self) -> None:
-        await with_auto_auth(
-            self._account.api,
-            self.async_update_internal,
-        )
+        await self._coordinator.async_refresh(self.config_key, (self._account.code,))
 
     #################################################################################
     # Functional base for inherent classes
@@ -530,18 +627,29 @@ class TNSEnergoEntity(Entity, Generic[_TAccount]):
         cls: Type[_TTNSEnergoEntity],
         entities: Dict[Hashable, _TTNSEnergoEntity],
         account: "Account",
-        config_entry: ConfigEntry,
+        coordinator: "TNSEnergoCoordinator",
         account_config: ConfigType,
         async_add_entities: Callable[[List[_TTNSEnergoEntity], bool], Any],
     ):
         raise NotImplementedError
 
+    @classmethod
+    @abstractmethod
+    async def async_fetch_account_data(cls, account: "Account") -> Any:
+        """Fetch data for all entities of the class tied to account (once per cycle)"""
+        raise NotImplementedError
+
+    @classmethod
+    def is_refresh_due(cls, coordinator: "TNSEnergoCoordinator", account_code: str) -> bool:
+        """Whether scheduled refresh should fetch data of the account (always by default)"""
+        return True
+
     #################################################################################
     # Data-oriented base for inherent classes
     #################################################################################
 
     @abstractmethod
-    async def async_update_internal(self) -> None:
+    def update_from_data(self, data: Any) -> None:
         raise NotImplementedError
 
     @property
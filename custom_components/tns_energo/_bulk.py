@@ -0,0 +1,187 @@
+__all__ = (
+    "EVENT_PUSH_INDICATIONS_BULK",
+    "SERVICE_PUSH_INDICATIONS_BULK",
+    "SERVICE_PUSH_INDICATIONS_BULK_SCHEMA",
+    "async_push_indications_bulk",
+)
+
+import asyncio
+import logging
+from time import monotonic
+from typing import Any, Dict, List, Mapping, Set, TYPE_CHECKING, Union
+
+import voluptuous as vol
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import HomeAssistantType
+
+from custom_components.tns_energo._util import IS_IN_RUSSIA
+from custom_components.tns_energo._validation import IndicationsValidationError
+from custom_components.tns_energo.const import (
+    ATTR_ACCOUNT_CODE,
+    ATTR_COMMENT,
+    ATTR_IGNORE_INDICATIONS,
+    ATTR_INCREMENTAL,
+    ATTR_INDICATIONS,
+    ATTR_METER_CODE,
+    ATTR_REASONS,
+    ATTR_RESULT,
+    ATTR_SUCCESS,
+    CONF_MAX_CONCURRENCY,
+    CONF_METERS,
+    DATA_ENTITIES,
+    DEFAULT_MAX_CONCURRENCY,
+    DOMAIN,
+)
+from tns_energo_api.exceptions import TNSEnergoException
+
+if TYPE_CHECKING:
+    from custom_components.tns_energo._coordinator import TNSEnergoCoordinator
+    from custom_components.tns_energo.sensor import TNSEnergoMeter
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_DURATION = "duration"
+ATTR_SUCCEEDED = "succeeded"
+ATTR_FAILED = "failed"
+
+SERVICE_PUSH_INDICATIONS_BULK = "push_indications_bulk"
+EVENT_PUSH_INDICATIONS_BULK = DOMAIN + "_" + SERVICE_PUSH_INDICATIONS_BULK
+
+
+def _indications_validator(value: Any) -> Mapping[str, float]:
+    # Imported lazily, as sensor platform imports are heavier than component ones
+    from custom_components.tns_energo.sensor import INDICATIONS_SCHEMA
+
+    return INDICATIONS_SCHEMA(value)
+
+
+SERVICE_PUSH_INDICATIONS_BULK_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_METERS): vol.All({cv.string: _indications_validator}, vol.Length(min=1)),
+        vol.Optional(ATTR_INCREMENTAL, default=False): cv.boolean,
+        vol.Optional(ATTR_IGNORE_INDICATIONS, default=False): cv.boolean,
+        vol.Optional(CONF_MAX_CONCURRENCY, default=DEFAULT_MAX_CONCURRENCY): cv.positive_int,
+    }
+)
+
+
+def _find_meter_entities(hass: HomeAssistantType) -> Dict[str, "TNSEnergoMeter"]:
+    """Index loaded meter entities by entity ID and by meter code"""
+    from custom_components.tns_energo.sensor import TNSEnergoMeter
+
+    meter_entities = {}
+
+    for entities in hass.data.get(DATA_ENTITIES, {}).values():
+        for entity_cls, cls_entities in entities.items():
+            if not issubclass(entity_cls, TNSEnergoMeter):
+                continue
+            for entity in cls_entities.values():
+                meter_entities.setdefault(entity.code, entity)
+                if entity.entity_id:
+                    meter_entities[entity.entity_id] = entity
+
+    return meter_entities
+
+
+async def async_push_indications_bulk(
+    hass: HomeAssistantType,
+    indications_by_meter: Mapping[str, Mapping[str, Union[int, float]]],
+    incremental: bool = False,
+    ignore_indications: bool = False,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> Dict[str, Any]:
+    """Submit indications for multiple meters at once.
+
+    :param indications_by_meter: Indications by meter entity ID or meter code
+    :return: Aggregated result (per-meter statuses are keyed the same way as input)
+    """
+    meter_entities = _find_meter_entities(hass)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    refresh_accounts: Dict["TNSEnergoCoordinator", Set[str]] = {}
+
+    async def _async_push(key: str, indications: Mapping[str, Union[int, float]]) -> Dict[str, Any]:
+        result = {
+            ATTR_ENTITY_ID: None,
+            ATTR_ACCOUNT_CODE: None,
+            ATTR_METER_CODE: None,
+            ATTR_SUCCESS: False,
+            ATTR_INDICATIONS: None,
+            ATTR_COMMENT: None,
+            ATTR_REASONS: None,
+            ATTR_DURATION: 0.0,
+        }
+
+        entity = meter_entities.get(key)
+        if entity is None:
+            result[ATTR_COMMENT] = "Meter not found"
+            return result
+
+        result[ATTR_ENTITY_ID] = entity.entity_id
+        result[ATTR_ACCOUNT_CODE] = entity.account_code
+        result[ATTR_METER_CODE] = entity.code
+
+        async with semaphore:
+            started_at = monotonic()
+            try:
+                result[ATTR_INDICATIONS] = await entity.async_push_indications(
+                    indications,
+                    incremental=incremental,
+                    ignore_values=ignore_indications,
+                )
+
+            except TNSEnergoException as e:
+                result[ATTR_COMMENT] = "API error: %s" % e
+
+            except (ValueError, TypeError) as e:
+                result[ATTR_COMMENT] = "Invalid indications: %s" % e
+                if isinstance(e, IndicationsValidationError):
+                    result[ATTR_REASONS] = e.reasons
+
+            else:
+                result[ATTR_COMMENT] = "Indications submitted successfully"
+                result[ATTR_SUCCESS] = True
+                refresh_accounts.setdefault(entity.coordinator, set()).add(entity.account_code)
+
+            finally:
+                result[ATTR_DURATION] = round(monotonic() - started_at, 3)
+
+        return result
+
+    started_at = monotonic()
+    keys = list(indications_by_meter)
+    results: List[Dict[str, Any]] = await asyncio.gather(
+        *(_async_push(key, indications_by_meter[key]) for key in keys)
+    )
+
+    # Refresh meters once per account instead of once per meter
+    for coordinator, account_codes in refresh_accounts.items():
+        coordinator.async_create_background_task(
+            coordinator.async_refresh(CONF_METERS, account_codes)
+        )
+
+    succeeded = sum(1 for result in results if result[ATTR_SUCCESS])
+    duration = monotonic() - started_at
+
+    _LOGGER.info(
+        (
+            f"Пакетная передача показаний завершена: успешно {succeeded}, "
+            f"с ошибками {len(results) - succeeded}"
+            if IS_IN_RUSSIA
+            else f"Bulk indications submission finished: {succeeded} succeeded, "
+            f"{len(results) - succeeded} failed"
+        )
+        + f" ({duration:.3f}s)"
+    )
+
+    for key, result in zip(keys, results):
+        if not result[ATTR_SUCCESS]:
+            _LOGGER.warning(f"[{key}] {result[ATTR_COMMENT]}")
+
+    return {
+        ATTR_SUCCESS: succeeded == len(results),
+        ATTR_SUCCEEDED: succeeded,
+        ATTR_FAILED: len(results) - succeeded,
+        ATTR_DURATION: round(duration, 3),
+        ATTR_RESULT: dict(zip(keys, results)),
+    }
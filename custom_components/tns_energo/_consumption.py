@@ -0,0 +1,193 @@
+__all__ = (
+    "CONSUMPTION_PERIODS",
+    "ConsumptionSeries",
+    "PERIOD_DAY",
+    "PERIOD_MONTH",
+    "async_derive_consumption",
+    "derive_consumption",
+)
+
+import logging
+from datetime import date
+from time import monotonic
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from homeassistant.helpers.typing import HomeAssistantType
+
+from custom_components.tns_energo._history import async_get_history_store
+
+_LOGGER = logging.getLogger(__name__)
+
+PERIOD_DAY = "day"
+PERIOD_MONTH = "month"
+CONSUMPTION_PERIODS = (PERIOD_DAY, PERIOD_MONTH)
+
+# (account_code, meter_code, zone)
+SeriesKey = Tuple[str, str, str]
+
+
+class ConsumptionSeries(NamedTuple):
+    """Consumption of a single meter zone.
+
+    Days with unknown consumption (gaps around meter replacements or resets)
+    are absent from `days`; months only sum up days with known consumption."""
+
+    days: np.ndarray  # datetime64[D]
+    daily: np.ndarray  # float64
+    months: np.ndarray  # datetime64[M]
+    monthly: np.ndarray  # float64
+
+    def to_list(
+        self,
+        period: str = PERIOD_MONTH,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> List[Tuple[str, float]]:
+        """Convert consumption to `(ISO period, value)` pairs within optional bounds"""
+        if period == PERIOD_DAY:
+            dates, values = self.days, self.daily
+            unit = "D"
+        else:
+            dates, values = self.months, self.monthly
+            unit = "M"
+
+        mask = np.ones(len(dates), dtype=bool)
+        if start is not None:
+            mask &= dates >= np.datetime64(start, unit)
+        if end is not None:
+            mask &= dates <= np.datetime64(end, unit)
+
+        return list(
+            zip(
+                np.datetime_as_string(dates[mask], unit=unit).tolist(),
+                np.round(values[mask], 3).tolist(),
+            )
+        )
+
+
+_EMPTY_SERIES = ConsumptionSeries(
+    days=np.empty(0, dtype="datetime64[D]"),
+    daily=np.empty(0, dtype=np.float64),
+    months=np.empty(0, dtype="datetime64[M]"),
+    monthly=np.empty(0, dtype=np.float64),
+)
+
+
+def derive_consumption(
+    keys: Sequence[SeriesKey],
+    rows: Sequence[Tuple[int, int, int, Optional[float]]],
+    transmission_coefficients: Optional[Mapping[Tuple[str, str], float]] = None,
+) -> Dict[SeriesKey, ConsumptionSeries]:
+    """Derive daily and monthly consumption from cumulative indications.
+
+    Every series is computed in a single batch of array operations:
+
+    - consumption between two consecutive readings is spread evenly over the
+      days after the earlier reading up to (and including) the later one;
+    - intervals over which the meter identifier changes (meter replacement) or
+      the reading decreases (reset) are treated as gaps, as consumption for them
+      is unknown;
+    - deltas are scaled by the meter's transmission coefficient (current
+      coefficient is applied to whole history, as portal does not track changes).
+
+    :param keys: Series keys, as returned by `HistoryStore.async_get_indication_series`
+    :param rows: Series rows, as returned by `HistoryStore.async_get_indication_series`
+    :param transmission_coefficients: Coefficients by `(account_code, meter_code)`
+    :return: Consumption series by `(account_code, meter_code, zone)`
+    """
+    if not rows:
+        return {key: _EMPTY_SERIES for key in keys}
+
+    columns = np.array(rows, dtype=np.float64)  # `None` values become NaN
+    series = columns[:, 0].astype(np.intp)
+    device = columns[:, 1].astype(np.intp)
+    days = columns[:, 2].astype("datetime64[D]")
+    readings = columns[:, 3]
+
+    coefficients = np.ones(len(keys), dtype=np.float64)
+    if transmission_coefficients:
+        for i, (account_code, meter_code, _) in enumerate(keys):
+            coefficient = transmission_coefficients.get((account_code, meter_code))
+            if coefficient:
+                coefficients[i] = coefficient
+
+    order = np.lexsort((days, series))
+    series, days, readings, device = series[order], days[order], readings[order], device[order]
+
+    # Intervals between consecutive readings of the same series
+    delta = readings[1:] - readings[:-1]
+    span = (days[1:] - days[:-1]).astype(np.int64)
+    valid = (
+        (series[1:] == series[:-1])
+        & (device[1:] == device[:-1])
+        & (span > 0)
+        & (delta >= 0)  # false for NaN as well
+    )
+
+    interval_series = series[1:][valid]
+    span = span[valid]
+    rate = delta[valid] * coefficients[interval_series] / span
+    first_day = days[:-1][valid] + 1
+
+    # Expand intervals into days
+    total = int(span.sum())
+    interval_offsets = np.cumsum(span) - span
+    day_series = np.repeat(interval_series, span)
+    day_values = np.repeat(rate, span)
+    day_dates = np.repeat(first_day, span) + (np.arange(total) - np.repeat(interval_offsets, span))
+
+    # Aggregate days into months (days are already ordered by series and date)
+    day_months = day_dates.astype("datetime64[M]")
+    if total:
+        boundaries = np.empty(total, dtype=bool)
+        boundaries[0] = True
+        boundaries[1:] = (day_series[1:] != day_series[:-1]) | (day_months[1:] != day_months[:-1])
+        month_starts = np.flatnonzero(boundaries)
+        month_values = np.add.reduceat(day_values, month_starts)
+    else:
+        month_starts = np.empty(0, dtype=np.intp)
+        month_values = np.empty(0, dtype=np.float64)
+    month_series = day_series[month_starts]
+    month_dates = day_months[month_starts]
+
+    # Split batch into separate series
+    series_range = np.arange(len(keys) + 1)
+    day_bounds = np.searchsorted(day_series, series_range)
+    month_bounds = np.searchsorted(month_series, series_range)
+
+    return {
+        key: ConsumptionSeries(
+            days=day_dates[day_bounds[i] : day_bounds[i + 1]],
+            daily=day_values[day_bounds[i] : day_bounds[i + 1]],
+            months=month_dates[month_bounds[i] : month_bounds[i + 1]],
+            monthly=month_values[month_bounds[i] : month_bounds[i + 1]],
+        )
+        for i, key in enumerate(keys)
+    }
+
+
+async def async_derive_consumption(
+    hass: HomeAssistantType,
+    account_code: Optional[str] = None,
+    meter_code: Optional[str] = None,
+    transmission_coefficients: Optional[Mapping[Tuple[str, str], float]] = None,
+) -> Dict[SeriesKey, ConsumptionSeries]:
+    """Derive consumption from indications stored in local history"""
+    keys, rows = await async_get_history_store(hass).async_get_indication_series(
+        account_code, meter_code
+    )
+
+    started_at = monotonic()
+    result = await hass.async_add_executor_job(
+        derive_consumption, keys, rows, transmission_coefficients
+    )
+
+    _LOGGER.debug(
+        "Derived consumption for %d series from %d rows in %.3f seconds",
+        len(result),
+        len(rows),
+        monotonic() - started_at,
+    )
+
+    return result
@@ -0,0 +1,583 @@
+__all__ = (
+    "TNSEnergoCoordinator",
+    "AccountDataFetcherType",
+    "DataSignatureType",
+    "RefreshDueCheckerType",
+    "CoordinatorsDataType",
+)
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    TYPE_CHECKING,
+    Tuple,
+    Union,
+)
+
+from homeassistant.config_entries import ConfigEntry, SOURCE_REAUTH
+from homeassistant.const import CONF_DEFAULT, CONF_SCAN_INTERVAL, CONF_USERNAME
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType, HomeAssistantType
+from homeassistant.util import dt as dt_util
+
+from custom_components.tns_energo._util import (
+    AuthenticationException,
+    CircuitOpenException,
+    IS_IN_RUSSIA,
+    mask_username,
+    with_auto_auth,
+)
+from custom_components.tns_energo.const import (
+    CONF_ACCOUNTS,
+    CONF_MAX_BACKOFF,
+    CONF_MAX_CONCURRENCY,
+    DOMAIN,
+)
+from tns_energo_api.exceptions import TNSEnergoException
+
+if TYPE_CHECKING:
+    from tns_energo_api import Account, TNSEnergoAPI
+
+    from custom_components.tns_energo._store import SnapshotStore, SnapshotType
+
+_LOGGER = logging.getLogger(__name__)
+
+AccountDataFetcherType = Callable[["Account"], Awaitable[Any]]
+RefreshDueCheckerType = Callable[["TNSEnergoCoordinator", str], bool]
+DataSignatureType = Callable[[Any], Hashable]
+CoordinatorsDataType = Dict[str, "TNSEnergoCoordinator"]
+
+# Delay before the first retry of a failed background refresh
+BACKOFF_BASE = 5.0
+
+
+class TNSEnergoCoordinator:
+    """Shared data snapshot of a single config entry.
+
+    Every data kind (keyed by entity class `config_key`) is fetched once per
+    cycle for every enabled account, after which all entities subscribed to
+    the data kind are notified and read their data from the snapshot."""
+
+    def __init__(
+        self,
+        hass: HomeAssistantType,
+        config_entry: ConfigEntry,
+        api: "TNSEnergoAPI",
+        final_config: ConfigType,
+        snapshot_store: Optional["SnapshotStore"] = None,
+    ) -> None:
+        self.hass = hass
+        self.config_entry = config_entry
+        self.api = api
+        self.final_config = final_config
+        self.snapshot_store = snapshot_store
+
+        self.accounts: Dict[str, "Account"] = {}
+        self.data: Dict[str, Dict[str, Any]] = {}
+        self.restored = False
+        self.auth_failed = False
+        self.stale_since: Dict[str, Dict[str, datetime]] = {}
+        self.fetched_at: Dict[str, Dict[str, datetime]] = {}
+        self.boosted_until: Dict[str, Dict[str, datetime]] = {}
+
+        # Wall time and size of the most recent refresh cycle
+        self.last_cycle_duration: Optional[float] = None
+        self.last_cycle_jobs = 0
+
+        # State writes skipped by entities because nothing changed
+        self.suppressed_writes = 0
+
+        self._fetchers: Dict[str, AccountDataFetcherType] = {}
+        self._due_checkers: Dict[str, RefreshDueCheckerType] = {}
+        self._dependencies: Dict[str, Dict[str, DataSignatureType]] = {}
+        self._listeners: Dict[str, List[CALLBACK_TYPE]] = {}
+        self._refresh_locks: Dict[str, asyncio.Lock] = {}
+        self._unsub_refresh: Dict[str, CALLBACK_TYPE] = {}
+        self._background_tasks: Set["asyncio.Task"] = set()
+
+        self.log_prefix = f"[{mask_username(config_entry.data[CONF_USERNAME])}][coordinator] "
+
+    #################################################################################
+    # Configuration helpers
+    #################################################################################
+
+    def get_account_config(self, account_code: str) -> Union[ConfigType, bool]:
+        account_config = (self.final_config.get(CONF_ACCOUNTS) or {}).get(account_code)
+        if account_config is None:
+            account_config = self.final_config[CONF_DEFAULT]
+        return account_config
+
+    def is_enabled(self, account_code: str, config_key: str) -> bool:
+        account_config = self.get_account_config(account_code)
+        return account_config is not False and account_config[config_key] is not False
+
+    def get_scan_interval(self, config_key: str) -> Optional[timedelta]:
+        """Shortest scan interval configured for the data kind among enabled accounts"""
+        account_configs = [self.final_config[CONF_DEFAULT]]
+        account_configs.extend((self.final_config.get(CONF_ACCOUNTS) or {}).values())
+
+        intervals = [
+            account_config[CONF_SCAN_INTERVAL][config_key]
+            for account_config in account_configs
+            if account_config is not False and account_config[config_key] is not False
+        ]
+
+        return min(intervals) if intervals else None
+
+    @callback
+    def async_restore(self, snapshot: "SnapshotType") -> None:
+        """Seed coordinator with a previously stored snapshot"""
+        self.accounts, self.data = snapshot
+        self.restored = True
+
+    #################################################################################
+    # Subscription management
+    #################################################################################
+
+    def register_fetcher(
+        self,
+        config_key: str,
+        fetcher: AccountDataFetcherType,
+        is_refresh_due: Optional[RefreshDueCheckerType] = None,
+    ) -> None:
+        """Register data kind fetcher.
+
+        Scheduled refreshes only fetch accounts for which `is_refresh_due` returns
+        true (every account when not provided); explicit refreshes fetch all."""
+        self._fetchers[config_key] = fetcher
+        if is_refresh_due is None:
+            self._due_checkers.pop(config_key, None)
+        else:
+            self._due_checkers[config_key] = is_refresh_due
+
+    def register_dependency(
+        self,
+        upstream_key: str,
+        downstream_key: str,
+        signature: DataSignatureType,
+    ) -> None:
+        """Refresh downstream data kind for accounts whose upstream data signature changed"""
+        self._dependencies.setdefault(upstream_key, {})[downstream_key] = signature
+
+    @callback
+    def async_add_listener(self, config_key: str, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        listeners = self._listeners.setdefault(config_key, [])
+        listeners.append(update_callback)
+
+        @callback
+        def _remove_listener() -> None:
+            if update_callback in listeners:
+                listeners.remove(update_callback)
+
+        return _remove_listener
+
+    @callback
+    def async_notify_listeners(self, config_key: str) -> None:
+        for update_callback in list(self._listeners.get(config_key, ())):
+            update_callback()
+
+    #################################################################################
+    # Data retrieval
+    #################################################################################
+
+    async def async_refresh_accounts(self) -> List["Account"]:
+        accounts = await with_auto_auth(self.api, self.api.async_get_accounts_list)
+        self.accounts = {account.code: account for account in accounts}
+        return accounts
+
+    def get_fetched_at(self, config_key: str, account_code: str) -> Optional[datetime]:
+        """Time of the last successful fetch of account data (not restored from snapshot)"""
+        return (self.fetched_at.get(config_key) or {}).get(account_code)
+
+    def is_boosted(self, config_key: str, account_code: str) -> bool:
+        boosted_until = (self.boosted_until.get(config_key) or {}).get(account_code)
+        return boosted_until is not None and dt_util.utcnow() < boosted_until
+
+    @callback
+    def async_boost(self, config_key: str, account_code: str, duration: timedelta) -> None:
+        """Make every scheduled refresh of account data kind due for a while"""
+        self.boosted_until.setdefault(config_key, {})[account_code] = dt_util.utcnow() + duration
+
+    def is_refresh_due(self, config_key: str, account_code: str) -> bool:
+        is_refresh_due = self._due_checkers.get(config_key)
+        return is_refresh_due is None or is_refresh_due(self, account_code)
+
+    def get_stale_since(self, config_key: str, account_code: str) -> Optional[datetime]:
+        """Time of the first failed refresh since data was last fetched successfully"""
+        return (self.stale_since.get(config_key) or {}).get(account_code)
+
+    @callback
+    def _async_mark_stale(self, config_keys: Iterable[str], account_codes: Iterable[str]) -> None:
+        now = dt_util.utcnow()
+        for config_key in config_keys:
+            kind_stale_since = self.stale_since.setdefault(config_key, {})
+            for account_code in account_codes:
+                kind_stale_since.setdefault(account_code, now)
+
+    async def _async_fetch_account_data(
+        self, config_key: str, fetcher: AccountDataFetcherType, account: "Account"
+    ) -> None:
+        try:
+            self.data.setdefault(config_key, {})[account.code] = await with_auto_auth(
+                self.api, fetcher, account
+            )
+        except CircuitOpenException as e:
+            # Outage has already been reported by the circuit breaker
+            self._async_mark_stale((config_key,), (account.code,))
+            _LOGGER.debug(
+                self.log_prefix
+                + f"[{config_key}][{mask_username(account.code)}] "
+                + ("Запрос данных отложен" if IS_IN_RUSSIA else "Data request deferred")
+                + ": "
+                + str(e)
+            )
+        except AuthenticationException as e:
+            self._async_mark_stale((config_key,), (account.code,))
+            self.async_handle_auth_failure(e)
+        except Exception as e:
+            self._async_mark_stale((config_key,), (account.code,))
+            _LOGGER.error(
+                self.log_prefix
+                + f"[{config_key}][{mask_username(account.code)}] "
+                + ("Ошибка получения данных" if IS_IN_RUSSIA else "Error fetching data")
+                + ": "
+                + repr(e)
+            )
+        else:
+            (self.stale_since.get(config_key) or {}).pop(account.code, None)
+            self.fetched_at.setdefault(config_key, {})[account.code] = dt_util.utcnow()
+
+    async def _async_run_jobs(self, jobs: List[Tuple[str, "Account"]]) -> None:
+        """Run fetch jobs in order with at most `max_concurrency` of them in flight"""
+        queue = deque(jobs)
+
+        async def _worker() -> None:
+            while queue:
+                config_key, account = queue.popleft()
+                await self._async_fetch_account_data(
+                    config_key, self._fetchers[config_key], account
+                )
+
+        max_concurrency = self.final_config[CONF_MAX_CONCURRENCY]
+        await asyncio.gather(*(_worker() for _ in range(min(max_concurrency, len(jobs)))))
+
+    def _make_jobs(
+        self, config_keys: Iterable[str], account_codes: Iterable[str]
+    ) -> List[Tuple[str, "Account"]]:
+        """Interleave fetch jobs round-robin across accounts.
+
+        Every account gets one job scheduled before any account gets its next
+        one, so a handful of accounts with many data kinds can not starve the rest."""
+        per_account = [
+            deque(
+                (config_key, self.accounts[account_code])
+                for config_key in config_keys
+                if self.is_enabled(account_code, config_key)
+            )
+            for account_code in account_codes
+            if account_code in self.accounts
+        ]
+
+        jobs = []
+        while per_account:
+            for account_jobs in per_account:
+                if account_jobs:
+                    jobs.append(account_jobs.popleft())
+            per_account = [account_jobs for account_jobs in per_account if account_jobs]
+
+        return jobs
+
+    async def async_refresh_kinds(
+        self,
+        config_keys: Iterable[str],
+        account_codes: Optional[Iterable[str]] = None,
+        refresh_accounts: bool = False,
+    ) -> None:
+        """Fetch data kinds once for every (or every given) enabled account"""
+        config_keys = sorted(
+            config_key for config_key in config_keys if config_key in self._fetchers
+        )
+        if not config_keys:
+            if refresh_accounts:
+                await self.async_refresh_accounts()
+            return
+
+        started_at = time.monotonic()
+
+        async with AsyncExitStack() as stack:
+            # Locks are always taken in sorted order to avoid deadlocks between cycles
+            for config_key in config_keys:
+                await stack.enter_async_context(
+                    self._refresh_locks.setdefault(config_key, asyncio.Lock())
+                )
+
+            if refresh_accounts or CONF_ACCOUNTS in config_keys or not self.accounts:
+                try:
+                    await self.async_refresh_accounts()
+                except TNSEnergoException:
+                    # Entities keep showing last known data, marked as stale
+                    self._async_mark_stale(config_keys, self.accounts.keys())
+                    for config_key in config_keys:
+                        self.async_notify_listeners(config_key)
+                    raise
+
+            if account_codes is None:
+                account_codes = self.accounts.keys()
+
+            jobs = self._make_jobs(config_keys, account_codes)
+            previous_data = {
+                config_key: dict(self.data.get(config_key) or {})
+                for config_key in config_keys
+                if config_key in self._dependencies
+            }
+            await self._async_run_jobs(jobs)
+
+        self.last_cycle_duration = time.monotonic() - started_at
+        self.last_cycle_jobs = len(jobs)
+
+        _LOGGER.debug(
+            self.log_prefix
+            + f"[{', '.join(config_keys)}] "
+            + (
+                f"Обновление {len(jobs)} наборов данных завершено "
+                f"за {self.last_cycle_duration:.3f} сек."
+                if IS_IN_RUSSIA
+                else f"Refreshed {len(jobs)} data sets "
+                f"in {self.last_cycle_duration:.3f} seconds"
+            )
+            + f" (max_concurrency: {self.final_config[CONF_MAX_CONCURRENCY]})"
+        )
+
+        if self.snapshot_store is not None:
+            self.snapshot_store.async_schedule_save(self)
+
+        for config_key in config_keys:
+            self.async_notify_listeners(config_key)
+
+        self._async_refresh_dependents(config_keys, previous_data)
+
+    @callback
+    def _async_refresh_dependents(
+        self, config_keys: List[str], previous_data: Dict[str, Dict[str, Any]]
+    ) -> None:
+        """Schedule refresh of dependent data kinds for accounts whose data changed"""
+        for upstream_key, kind_previous_data in previous_data.items():
+            kind_data = self.data.get(upstream_key) or {}
+
+            for downstream_key, signature in self._dependencies[upstream_key].items():
+                if downstream_key in config_keys or downstream_key not in self._fetchers:
+                    # Already refreshed within the same cycle
+                    continue
+
+                changed_codes = [
+                    account_code
+                    for account_code, previous in kind_previous_data.items()
+                    if account_code in kind_data
+                    and self.is_enabled(account_code, downstream_key)
+                    and signature(previous) != signature(kind_data[account_code])
+                ]
+
+                if not changed_codes:
+                    continue
+
+                _LOGGER.debug(
+                    self.log_prefix
+                    + f"[{upstream_key} -> {downstream_key}] "
+                    + (
+                        f"Изменение данных, обновление {len(changed_codes)} лицевых счетов"
+                        if IS_IN_RUSSIA
+                        else f"Data changed, refreshing {len(changed_codes)} accounts"
+                    )
+                )
+
+                self.async_create_background_task(self.async_refresh(downstream_key, changed_codes))
+
+    async def async_refresh(
+        self,
+        config_key: str,
+        account_codes: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Fetch data kind once for every (or every given) enabled account"""
+        await self.async_refresh_kinds((config_key,), account_codes)
+
+    async def async_refresh_due(self, config_key: str) -> None:
+        """Scheduled refresh of data kind for accounts which are due"""
+        account_codes = None
+
+        if self.accounts and config_key != CONF_ACCOUNTS:
+            account_codes = [
+                account_code
+                for account_code in self.accounts
+                if self.is_refresh_due(config_key, account_code)
+            ]
+
+            if not account_codes:
+                _LOGGER.debug(
+                    self.log_prefix
+                    + f"[{config_key}] "
+                    + (
+                        "Обновление не требуется ни для одного лицевого счёта"
+                        if IS_IN_RUSSIA
+                        else "Refresh is not due for any account"
+                    )
+                )
+                return
+
+        await self.async_refresh(config_key, account_codes)
+
+    async def async_refresh_all(self) -> None:
+        await self.async_refresh_kinds(list(self._fetchers), refresh_accounts=True)
+
+    @callback
+    def async_handle_auth_failure(self, exception: AuthenticationException) -> None:
+        """Stop refreshing data once the portal rejects credentials, and request re-authentication.
+
+        Every further request would be rejected as well (and might get the portal
+        account locked), hence data is not refreshed until the entry is reloaded."""
+        if self.auth_failed:
+            return
+
+        self.auth_failed = True
+        self.async_stop()
+
+        _LOGGER.error(
+            self.log_prefix
+            + (
+                "Ошибка авторизации, обновление данных остановлено до повторной авторизации"
+                if IS_IN_RUSSIA
+                else "Authentication failed, data refresh stopped until re-authentication"
+            )
+            + ": "
+            + repr(exception)
+        )
+
+        config_entry = self.config_entry
+        self.hass.async_create_task(
+            self.hass.config_entries.flow.async_init(
+                DOMAIN,
+                context={
+                    "source": SOURCE_REAUTH,
+                    "entry_id": config_entry.entry_id,
+                    "unique_id": config_entry.unique_id,
+                },
+                data=config_entry.data,
+            )
+        )
+
+    async def async_refresh_all_with_backoff(self) -> None:
+        """Refresh all data kinds, retrying with jittered exponential backoff until success.
+
+        Retries stop when the portal rejects credentials (see `async_handle_auth_failure`)."""
+        max_backoff: timedelta = self.final_config[CONF_MAX_BACKOFF]
+        attempt = 0
+
+        while True:
+            try:
+                await self.async_refresh_all()
+            except AuthenticationException as e:
+                self.async_handle_auth_failure(e)
+                return
+            except TNSEnergoException as e:
+                delay = min(BACKOFF_BASE * 2**attempt, max_backoff.total_seconds())
+                delay *= random.uniform(0.5, 1.0)
+                attempt += 1
+
+                _LOGGER.warning(
+                    self.log_prefix
+                    + (
+                        f"Ошибка обновления данных (попытка {attempt}, "
+                        f"повтор через {delay:.0f} сек.)"
+                        if IS_IN_RUSSIA
+                        else f"Error refreshing data (attempt {attempt}, "
+                        f"retrying in {delay:.0f} seconds)"
+                    )
+                    + ": "
+                    + repr(e)
+                )
+
+                await asyncio.sleep(delay)
+            else:
+                return
+
+    #################################################################################
+    # Scheduling
+    #################################################################################
+
+    @callback
+    def async_create_background_task(self, target: Coroutine[Any, Any, Any]) -> "asyncio.Task":
+        """Create task which is cancelled when the coordinator stops"""
+        task = self.hass.async_create_task(target)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    @callback
+    def async_start(self) -> None:
+        self.async_stop()
+
+        for config_key in self._fetchers:
+            scan_interval = self.get_scan_interval(config_key)
+            if scan_interval is None:
+                continue
+
+            _LOGGER.debug(
+                self.log_prefix
+                + f"[{config_key}] "
+                + (
+                    f"Запуск планировщика обновлений (интервал: {scan_interval})"
+                    if IS_IN_RUSSIA
+                    else f"Starting updater (interval: {scan_interval})"
+                )
+            )
+
+            async def _refresh(*_, _config_key: str = config_key) -> None:
+                try:
+                    await self.async_refresh_due(_config_key)
+                except CircuitOpenException as e:
+                    _LOGGER.debug(
+                        self.log_prefix
+                        + f"[{_config_key}] "
+                        + ("Обновление отложено" if IS_IN_RUSSIA else "Refresh deferred")
+                        + ": "
+                        + str(e)
+                    )
+                except AuthenticationException as e:
+                    self.async_handle_auth_failure(e)
+                except TNSEnergoException as e:
+                    _LOGGER.error(
+                        self.log_prefix
+                        + f"[{_config_key}] "
+                        + ("Ошибка обновления данных" if IS_IN_RUSSIA else "Error refreshing data")
+                        + ": "
+                        + repr(e)
+                    )
+
+            self._unsub_refresh[config_key] = async_track_time_interval(
+                self.hass, _refresh, scan_interval
+            )
+
+    @callback
+    def async_stop(self, cancel_background_tasks: bool = False) -> None:
+        for unsub_refresh in self._unsub_refresh.values():
+            unsub_refresh()
+        self._unsub_refresh.clear()
+
+        if cancel_background_tasks:
+            for task in self._background_tasks:
+                task.cancel()
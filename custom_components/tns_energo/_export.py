@@ -0,0 +1,375 @@
+__all__ = (
+    "EVENT_EXPORT_HISTORY",
+    "SERVICE_EXPORT_HISTORY",
+    "SERVICE_EXPORT_HISTORY_SCHEMA",
+    "async_export_history",
+)
+
+import csv
+import importlib.util
+import logging
+import os
+from datetime import date, datetime
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TYPE_CHECKING,
+    Tuple,
+)
+
+import voluptuous as vol
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import HomeAssistantType
+from homeassistant.util import dt as dt_util
+
+from custom_components.tns_energo._history import (
+    HistoryStore,
+    async_get_history_store,
+    async_sync_indications,
+    async_sync_payments,
+)
+from custom_components.tns_energo._util import (
+    IS_IN_RUSSIA,
+    PRIORITY_BACKFILL,
+    mask_username,
+    request_priority,
+)
+from custom_components.tns_energo.const import (
+    ATTR_COMMENT,
+    ATTR_END,
+    ATTR_START,
+    ATTR_SUCCESS,
+    CONF_ACCOUNTS,
+    CONF_LAST_PAYMENT,
+    CONF_METERS,
+    DATA_COORDINATORS,
+    DOMAIN,
+)
+from tns_energo_api import Account
+from tns_energo_api.exceptions import TNSEnergoException
+
+if TYPE_CHECKING:
+    from custom_components.tns_energo._coordinator import TNSEnergoCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+EXPORT_KIND_INDICATIONS = "indications"
+EXPORT_KIND_PAYMENTS = "payments"
+EXPORT_KINDS = (EXPORT_KIND_INDICATIONS, EXPORT_KIND_PAYMENTS)
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_PARQUET = "parquet"
+EXPORT_FORMATS = (EXPORT_FORMAT_CSV, EXPORT_FORMAT_PARQUET)
+
+ATTR_FORMAT = "format"
+ATTR_KIND = "kind"
+ATTR_OVERWRITE = "overwrite"
+ATTR_PATH = "path"
+ATTR_ROWS = "rows"
+ATTR_SYNC = "sync"
+
+# Exported files are written within this directory of the configuration directory
+EXPORT_DIRECTORY = DOMAIN + "_exports"
+
+# Rows read from the store and written to the file at once
+EXPORT_BATCH_SIZE = 5000
+
+EXPORT_COLUMNS = {
+    EXPORT_KIND_INDICATIONS: (
+        "account_code",
+        "meter_code",
+        "taken_on",
+        "zone",
+        "value",
+        "status",
+        "meter_identifier",
+    ),
+    EXPORT_KIND_PAYMENTS: (
+        "account_code",
+        "paid_at",
+        "transaction_id",
+        "source",
+        "amount",
+    ),
+}
+
+SERVICE_EXPORT_HISTORY = "export_history"
+EVENT_EXPORT_HISTORY = DOMAIN + "_" + SERVICE_EXPORT_HISTORY
+
+SERVICE_EXPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_KIND): vol.In(EXPORT_KINDS),
+        vol.Optional(ATTR_FORMAT, default=EXPORT_FORMAT_CSV): vol.In(EXPORT_FORMATS),
+        vol.Optional(ATTR_PATH): cv.string,
+        vol.Optional(ATTR_START, default=None): vol.Any(vol.Equal(None), cv.datetime),
+        vol.Optional(ATTR_END, default=None): vol.Any(vol.Equal(None), cv.datetime),
+        vol.Optional(CONF_ACCOUNTS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_SYNC, default=True): cv.boolean,
+        vol.Optional(ATTR_OVERWRITE, default=False): cv.boolean,
+    }
+)
+
+
+#################################################################################
+# Writers (blocking, run within executor)
+#################################################################################
+
+
+def _write_csv(path: str, columns: Sequence[str], batches: Iterable[List[Tuple]]) -> int:
+    rows = 0
+
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for batch in batches:
+            writer.writerows(batch)
+            rows += len(batch)
+
+    return rows
+
+
+def _make_parquet_converters(kind: str) -> Tuple[Any, Sequence[Callable[[Any], Any]]]:
+    import pyarrow as pa
+
+    if kind == EXPORT_KIND_INDICATIONS:
+        schema = pa.schema(
+            [
+                ("account_code", pa.string()),
+                ("meter_code", pa.string()),
+                ("taken_on", pa.date32()),
+                ("zone", pa.string()),
+                ("value", pa.float64()),
+                ("status", pa.int64()),
+                ("meter_identifier", pa.string()),
+            ]
+        )
+        converters = (None, None, date.fromisoformat, None, None, None, None)
+    else:
+        schema = pa.schema(
+            [
+                ("account_code", pa.string()),
+                ("paid_at", pa.timestamp("us")),
+                ("transaction_id", pa.string()),
+                ("source", pa.string()),
+                ("amount", pa.float64()),
+            ]
+        )
+        converters = (None, datetime.fromisoformat, None, None, None)
+
+    return schema, converters
+
+
+def _write_parquet(path: str, kind: str, batches: Iterable[List[Tuple]]) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema, converters = _make_parquet_converters(kind)
+    rows = 0
+
+    # Every batch becomes a row group of its own
+    with pq.ParquetWriter(path, schema) as writer:
+        for batch in batches:
+            columns = [
+                pa.array(
+                    values if converter is None else [converter(value) for value in values],
+                    type=field.type,
+                )
+                for field, converter, values in zip(schema, converters, zip(*batch))
+            ]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            rows += len(batch)
+
+    return rows
+
+
+def _export(
+    history_store: HistoryStore,
+    path: str,
+    kind: str,
+    export_format: str,
+    account_codes: Optional[Sequence[str]],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    overwrite: bool,
+) -> int:
+    if not overwrite and os.path.exists(path):
+        raise FileExistsError(f"export file already exists: {path}")
+
+    if kind == EXPORT_KIND_INDICATIONS:
+        batches: Iterator[List[Tuple]] = history_store.iter_indication_batches(
+            account_codes,
+            None if start is None else start.date(),
+            None if end is None else end.date(),
+            EXPORT_BATCH_SIZE,
+        )
+    else:
+        batches = history_store.iter_payment_batches(account_codes, start, end, EXPORT_BATCH_SIZE)
+
+    # Write into temporary file first, so that incomplete exports never show up
+    temp_path = path + ".part"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    try:
+        if export_format == EXPORT_FORMAT_PARQUET:
+            rows = _write_parquet(temp_path, kind, batches)
+        else:
+            rows = _write_csv(temp_path, EXPORT_COLUMNS[kind], batches)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return rows
+
+
+#################################################################################
+# Service
+#################################################################################
+
+
+def _resolve_path(
+    hass: HomeAssistantType,
+    path: Optional[str],
+    kind: str,
+    export_format: str,
+    overwrite: bool = False,
+) -> str:
+    if path is None:
+        path = f"{DOMAIN}_{kind}_{dt_util.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+
+    # Exports never touch configuration files, as they are confined to a directory of their own
+    export_dir = os.path.realpath(hass.config.path(EXPORT_DIRECTORY))
+    full_path = os.path.realpath(os.path.join(export_dir, path))
+
+    if full_path == export_dir or os.path.commonpath((export_dir, full_path)) != export_dir:
+        raise ValueError(f"export path must be located within {EXPORT_DIRECTORY} directory: {path}")
+
+    if os.path.splitext(full_path)[1].lower() != "." + export_format:
+        raise ValueError(f"export path must have .{export_format} extension: {path}")
+
+    if not overwrite and os.path.exists(full_path):
+        raise ValueError(
+            f"export file already exists (set `{ATTR_OVERWRITE}` to replace it): {path}"
+        )
+
+    return full_path
+
+
+def _get_accounts(
+    hass: HomeAssistantType, account_codes: Optional[Sequence[str]]
+) -> List[Tuple["TNSEnergoCoordinator", Account]]:
+    accounts = []
+
+    for coordinator in hass.data.get(DATA_COORDINATORS, {}).values():
+        for account_code, account in coordinator.accounts.items():
+            if account_codes is None or account_code in account_codes:
+                accounts.append((coordinator, account))
+
+    return accounts
+
+
+async def _async_sync_account(
+    history_store: HistoryStore, coordinator: "TNSEnergoCoordinator", account: Account, kind: str
+) -> None:
+    # History of every account meter is synchronized at once; known data lets
+    # the portal request be skipped when the account history is up to date
+    if kind == EXPORT_KIND_INDICATIONS:
+        meters = (coordinator.data.get(CONF_METERS) or {}).get(account.code) or {}
+        meter_dates = [
+            meter.last_indications_date
+            for meter in meters.values()
+            if meter.last_indications_date is not None
+        ]
+        await async_sync_indications(
+            history_store, account, known_newest=max(meter_dates) if meter_dates else None
+        )
+    else:
+        await async_sync_payments(
+            history_store,
+            account,
+            (coordinator.data.get(CONF_LAST_PAYMENT) or {}).get(account.code),
+        )
+
+
+async def async_export_history(
+    hass: HomeAssistantType,
+    kind: str,
+    export_format: str = EXPORT_FORMAT_CSV,
+    path: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    account_codes: Optional[Sequence[str]] = None,
+    sync: bool = True,
+    overwrite: bool = False,
+) -> Dict[str, Any]:
+    """Export stored history of accounts of loaded config entries into a file.
+
+    Files are written within `EXPORT_DIRECTORY` of the configuration directory,
+    and existing files are only replaced when `overwrite` is set.
+
+    :return: Export result (absolute file path and count of written rows)
+    """
+    if export_format == EXPORT_FORMAT_PARQUET:
+        if importlib.util.find_spec("pyarrow") is None:
+            raise ValueError("Parquet export requires `pyarrow` package to be installed")
+
+    full_path = _resolve_path(hass, path, kind, export_format, overwrite)
+    accounts = _get_accounts(hass, account_codes)
+    if account_codes is None:
+        # Stored history of accounts which are no longer configured is not exported
+        account_codes = [account.code for _, account in accounts]
+    history_store = async_get_history_store(hass)
+
+    if sync:
+        for coordinator, account in accounts:
+            try:
+                with request_priority(PRIORITY_BACKFILL):
+                    await _async_sync_account(history_store, coordinator, account, kind)
+            except TNSEnergoException as e:
+                # Export whatever is stored already
+                _LOGGER.warning(
+                    f"[{mask_username(account.code)}] "
+                    + (
+                        "Не удалось обновить историю перед экспортом"
+                        if IS_IN_RUSSIA
+                        else "Could not synchronize history before export"
+                    )
+                    + ": "
+                    + repr(e)
+                )
+
+    rows = await hass.async_add_executor_job(
+        _export,
+        history_store,
+        full_path,
+        kind,
+        export_format,
+        account_codes,
+        start,
+        end,
+        overwrite,
+    )
+
+    _LOGGER.info(
+        (
+            f"Экспортировано строк: {rows} ({full_path})"
+            if IS_IN_RUSSIA
+            else f"Exported {rows} rows ({full_path})"
+        )
+    )
+
+    return {
+        ATTR_KIND: kind,
+        ATTR_FORMAT: export_format,
+        ATTR_PATH: full_path,
+        ATTR_ROWS: rows,
+        ATTR_SUCCESS: True,
+        ATTR_COMMENT: None,
+    }
@@ -0,0 +1,651 @@
+__all__ = (
+    "HistoryStore",
+    "async_get_history_store",
+    "async_sync_indications",
+    "async_sync_payments",
+)
+
+import logging
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, callback
+from homeassistant.helpers.typing import HomeAssistantType
+from homeassistant.util import dt as dt_util
+
+from custom_components.tns_energo._range_cache import RangeCache
+from custom_components.tns_energo._util import mask_username, with_auto_auth
+from custom_components.tns_energo.const import DATA_HISTORY_STORE, DOMAIN
+from tns_energo_api import Account, Indication, Payment
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+HISTORY_DATABASE_FILE = DOMAIN + "_history.db"
+
+# Maximum count of indications / payments kept in memory by query caches (each)
+HISTORY_CACHE_MAX_ITEMS = 20000
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS indications (
+        account_code TEXT NOT NULL,
+        meter_code TEXT NOT NULL,
+        taken_on TEXT NOT NULL,
+        zone TEXT NOT NULL,
+        value REAL,
+        status INTEGER NOT NULL,
+        meter_identifier TEXT NOT NULL,
+        PRIMARY KEY (account_code, meter_code, taken_on, zone)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS payments (
+        account_code TEXT NOT NULL,
+        transaction_id TEXT NOT NULL,
+        paid_at TEXT NOT NULL,
+        source TEXT,
+        amount REAL NOT NULL,
+        PRIMARY KEY (account_code, transaction_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS payments_paid_at ON payments (account_code, paid_at)",
+    # Presence of a row means that the complete history of the kind (of a single
+    # meter, or of the whole account for empty `meter_code`) has been fetched,
+    # and only data newer than `synced_until` remains to be synchronized
+    """
+    CREATE TABLE IF NOT EXISTS sync_state (
+        account_code TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        meter_code TEXT NOT NULL,
+        synced_until TEXT NOT NULL,
+        PRIMARY KEY (account_code, kind, meter_code)
+    )
+    """,
+)
+
+SYNC_KIND_INDICATIONS = "indications"
+SYNC_KIND_PAYMENTS = "payments"
+
+
+class HistoryStore:
+    """SQLite-backed local history of portal data.
+
+    All methods not prefixed with `async_` perform blocking I/O and must be run
+    in the executor; `async_` counterparts do exactly that."""
+
+    def __init__(self, hass: HomeAssistantType, path: str) -> None:
+        self.hass = hass
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+        # Caches are invalidated per account whenever new rows get stored
+        self.indications_cache: RangeCache[Indication] = RangeCache(
+            attrgetter("taken_on"), timedelta(days=1), HISTORY_CACHE_MAX_ITEMS
+        )
+        self.payments_cache: RangeCache[Payment] = RangeCache(
+            attrgetter("paid_at"), timedelta(microseconds=1), HISTORY_CACHE_MAX_ITEMS
+        )
+
+    def _execute(self, target: Callable[[sqlite3.Connection], _T]) -> _T:
+        with self._lock:
+            if self._connection is None:
+                _LOGGER.debug("Opening history database %s", self.path)
+                connection = sqlite3.connect(self.path, check_same_thread=False)
+                with connection:
+                    for statement in _SCHEMA:
+                        connection.execute(statement)
+                self._connection = connection
+
+            with self._connection:
+                return target(self._connection)
+
+    async def _async_execute(self, target: Callable[[sqlite3.Connection], _T]) -> _T:
+        return await self.hass.async_add_executor_job(self._execute, target)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    async def async_close(self) -> None:
+        await self.hass.async_add_executor_job(self.close)
+
+    #################################################################################
+    # Indications
+    #################################################################################
+
+    async def async_add_indications(
+        self, account_code: str, indications: Iterable[Indication]
+    ) -> int:
+        """Insert (or update already stored) readings; returns count of affected rows"""
+        rows = [
+            (
+                account_code,
+                indication.meter_code,
+                indication.taken_on.isoformat(),
+                zone_id,
+                value,
+                indication.status,
+                indication.meter_identifier,
+            )
+            for indication in indications
+            for zone_id, value in indication.zones.items()
+        ]
+
+        def _add(connection: sqlite3.Connection) -> int:
+            return connection.executemany(
+                "INSERT OR REPLACE INTO indications VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            ).rowcount
+
+        if not rows:
+            return 0
+
+        stored = await self._async_execute(_add)
+        if stored:
+            self.indications_cache.invalidate_matching(lambda key: key[0] == account_code)
+
+        return stored
+
+    async def async_get_indications(
+        self,
+        account_code: str,
+        meter_code: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> List[Indication]:
+        """Query stored indications, ordered by meter and date"""
+        query = (
+            "SELECT meter_code, taken_on, zone, value, status, meter_identifier "
+            "FROM indications WHERE account_code = ?"
+        )
+        parameters: Tuple[Any, ...] = (account_code,)
+
+        if meter_code is not None:
+            query += " AND meter_code = ?"
+            parameters += (meter_code,)
+        if start is not None:
+            query += " AND taken_on >= ?"
+            parameters += (start.isoformat(),)
+        if end is not None:
+            query += " AND taken_on <= ?"
+            parameters += (end.isoformat(),)
+
+        query += " ORDER BY meter_code, taken_on, zone"
+
+        # Objects are built within executor as well, to keep large queries off the event loop
+        def _get(connection: sqlite3.Connection) -> List[Indication]:
+            rows = connection.execute(query, parameters).fetchall()
+
+            return [
+                Indication(
+                    meter_identifier=zone_rows[0][5],
+                    taken_on=date.fromisoformat(taken_on),
+                    meter_code=row_meter_code,
+                    status=zone_rows[0][4],
+                    zones={row[2]: row[3] for row in zone_rows},
+                )
+                for (row_meter_code, taken_on), zone_rows_iter in groupby(rows, lambda x: x[:2])
+                for zone_rows in (list(zone_rows_iter),)
+            ]
+
+        return await self._async_execute(_get)
+
+    async def async_query_indications(
+        self, account_code: str, meter_code: str, start: date, end: date
+    ) -> List[Indication]:
+        """Query stored indications of a meter within a range, through the range cache"""
+
+        async def _async_fetch(fetch_start: date, fetch_end: date) -> List[Indication]:
+            return await self.async_get_indications(
+                account_code, meter_code, fetch_start, fetch_end
+            )
+
+        return await self.indications_cache.async_get(
+            (account_code, meter_code), start, end, _async_fetch
+        )
+
+    async def async_get_indication_series(
+        self,
+        account_code: Optional[str] = None,
+        meter_code: Optional[str] = None,
+    ) -> Tuple[List[Tuple[str, str, str]], List[Tuple[int, int, int, Optional[float]]]]:
+        """Query stored indications in columnar-friendly numeric form.
+
+        :return: Tuple of series keys (`(account_code, meter_code, zone)`, ordered) and
+                 rows of `(series index, meter identifier index, days since epoch, value)`,
+                 ordered by series and date
+        """
+        where = ""
+        parameters: Tuple[Any, ...] = ()
+        conditions = []
+
+        if account_code is not None:
+            conditions.append("account_code = ?")
+            parameters += (account_code,)
+        if meter_code is not None:
+            conditions.append("meter_code = ?")
+            parameters += (meter_code,)
+        if conditions:
+            where = " WHERE " + " AND ".join(conditions)
+
+        keys_query = (
+            "SELECT DISTINCT account_code, meter_code, zone FROM indications"
+            + where
+            + " ORDER BY account_code, meter_code, zone"
+        )
+        rows_query = (
+            "SELECT DENSE_RANK() OVER (ORDER BY account_code, meter_code, zone) - 1, "
+            "DENSE_RANK() OVER (ORDER BY meter_identifier) - 1, "
+            "CAST(julianday(taken_on) - 2440587.5 AS INTEGER), value FROM indications"
+            + where
+            + " ORDER BY account_code, meter_code, zone, taken_on"
+        )
+
+        def _get(connection: sqlite3.Connection):
+            return (
+                connection.execute(keys_query, parameters).fetchall(),
+                connection.execute(rows_query, parameters).fetchall(),
+            )
+
+        return await self._async_execute(_get)
+
+    #################################################################################
+    # Synchronization state
+    #################################################################################
+
+    async def async_get_synced_until(
+        self, account_code: str, kind: str, meter_code: Optional[str] = None
+    ) -> Optional[str]:
+        """Get ISO timestamp up to which history has been completely synchronized.
+
+        History of a meter is covered by its own synchronization, as well as by
+        synchronization of the whole account.
+
+        :return: `None` when complete history has never been fetched
+        """
+        meter_codes = ("",) if meter_code is None else ("", meter_code)
+
+        def _get(connection: sqlite3.Connection) -> Optional[str]:
+            return connection.execute(
+                "SELECT MAX(synced_until) FROM sync_state WHERE account_code = ? AND kind = ? "
+                f"AND meter_code IN ({', '.join('?' * len(meter_codes))})",
+                (account_code, kind, *meter_codes),
+            ).fetchone()[0]
+
+        return await self._async_execute(_get)
+
+    async def async_set_synced_until(
+        self, account_code: str, kind: str, meter_code: Optional[str], synced_until: str
+    ) -> None:
+        """Mark history as completely synchronized up to ISO timestamp (never moves back)"""
+
+        def _set(connection: sqlite3.Connection) -> None:
+            connection.execute(
+                "INSERT INTO sync_state VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (account_code, kind, meter_code) "
+                "DO UPDATE SET synced_until = MAX(synced_until, excluded.synced_until)",
+                (account_code, kind, meter_code or "", synced_until),
+            )
+
+        await self._async_execute(_set)
+
+    #################################################################################
+    # Payments
+    #################################################################################
+
+    async def async_add_payments(self, account_code: str, payments: Iterable[Payment]) -> int:
+        """Insert payments not yet in the ledger; returns count of new payments"""
+        rows = [
+            (
+                account_code,
+                payment.transaction_id,
+                payment.paid_at.isoformat(),
+                payment.source,
+                payment.amount,
+            )
+            for payment in payments
+        ]
+
+        def _add(connection: sqlite3.Connection) -> int:
+            return connection.executemany(
+                "INSERT OR IGNORE INTO payments VALUES (?, ?, ?, ?, ?)", rows
+            ).rowcount
+
+        if not rows:
+            return 0
+
+        added = await self._async_execute(_add)
+        if added:
+            self.payments_cache.invalidate(account_code)
+
+        return added
+
+    async def async_has_payment(self, account_code: str, transaction_id: str) -> bool:
+        def _has(connection: sqlite3.Connection) -> bool:
+            return (
+                connection.execute(
+                    "SELECT 1 FROM payments WHERE account_code = ? AND transaction_id = ?",
+                    (account_code, transaction_id),
+                ).fetchone()
+                is not None
+            )
+
+        return await self._async_execute(_has)
+
+    async def async_get_payments(
+        self,
+        account_code: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Payment]:
+        """Query ledger payments, ordered by payment time"""
+        query = (
+            "SELECT transaction_id, paid_at, source, amount FROM payments WHERE account_code = ?"
+        )
+        parameters: Tuple[Any, ...] = (account_code,)
+
+        if start is not None:
+            query += " AND paid_at >= ?"
+            parameters += (start.isoformat(),)
+        if end is not None:
+            query += " AND paid_at <= ?"
+            parameters += (end.isoformat(),)
+
+        query += " ORDER BY paid_at"
+
+        def _get(connection: sqlite3.Connection) -> List[Payment]:
+            return [
+                Payment(
+                    transaction_id=transaction_id,
+                    paid_at=datetime.fromisoformat(paid_at),
+                    source=source,
+                    amount=amount,
+                )
+                for transaction_id, paid_at, source, amount in connection.execute(query, parameters)
+            ]
+
+        return await self._async_execute(_get)
+
+    async def async_query_payments(
+        self, account_code: str, start: datetime, end: datetime
+    ) -> List[Payment]:
+        """Query ledger payments within a range, through the range cache"""
+
+        async def _async_fetch(fetch_start: datetime, fetch_end: datetime) -> List[Payment]:
+            return await self.async_get_payments(account_code, fetch_start, fetch_end)
+
+        return await self.payments_cache.async_get(account_code, start, end, _async_fetch)
+
+    #################################################################################
+    # Export
+    #################################################################################
+
+    def _iter_batches(
+        self,
+        query: str,
+        key_columns: str,
+        key_size: int,
+        conditions: List[str],
+        parameters: Tuple[Any, ...],
+        batch_size: int,
+    ) -> Iterator[List[Tuple[Any, ...]]]:
+        # Keyset pagination keeps every batch in a short transaction of its own
+        last_key: Optional[Tuple[Any, ...]] = None
+
+        while True:
+            batch_conditions = list(conditions)
+            batch_parameters = parameters
+
+            if last_key is not None:
+                batch_conditions.append(f"({key_columns}) > ({', '.join('?' * key_size)})")
+                batch_parameters += last_key
+
+            batch_query = query
+            if batch_conditions:
+                batch_query += " WHERE " + " AND ".join(batch_conditions)
+            batch_query += f" ORDER BY {key_columns} LIMIT ?"
+
+            def _get(connection: sqlite3.Connection) -> List[Tuple[Any, ...]]:
+                return connection.execute(batch_query, batch_parameters + (batch_size,)).fetchall()
+
+            batch = self._execute(_get)
+            if not batch:
+                return
+
+            yield batch
+
+            if len(batch) < batch_size:
+                return
+
+            last_key = batch[-1][:key_size]
+
+    @staticmethod
+    def _make_export_conditions(
+        account_codes: Optional[Sequence[str]],
+        column: str,
+        start: Optional[str],
+        end: Optional[str],
+    ) -> Tuple[List[str], Tuple[Any, ...]]:
+        conditions = []
+        parameters: Tuple[Any, ...] = ()
+
+        if account_codes is not None:
+            conditions.append(f"account_code IN ({', '.join('?' * len(account_codes))})")
+            parameters += tuple(account_codes)
+        if start is not None:
+            conditions.append(f"{column} >= ?")
+            parameters += (start,)
+        if end is not None:
+            conditions.append(f"{column} <= ?")
+            parameters += (end,)
+
+        return conditions, parameters
+
+    def iter_indication_batches(
+        self,
+        account_codes: Optional[Sequence[str]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[List[Tuple[Any, ...]]]:
+        """Iterate over stored indication rows in batches (blocking).
+
+        Rows are `(account_code, meter_code, taken_on, zone, value, status,
+        meter_identifier)` tuples, ordered in that sequence."""
+        conditions, parameters = self._make_export_conditions(
+            account_codes,
+            "taken_on",
+            None if start is None else start.isoformat(),
+            None if end is None else end.isoformat(),
+        )
+
+        return self._iter_batches(
+            "SELECT account_code, meter_code, taken_on, zone, value, status, meter_identifier "
+            "FROM indications",
+            "account_code, meter_code, taken_on, zone",
+            4,
+            conditions,
+            parameters,
+            batch_size,
+        )
+
+    def iter_payment_batches(
+        self,
+        account_codes: Optional[Sequence[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[List[Tuple[Any, ...]]]:
+        """Iterate over ledger payment rows in batches (blocking).
+
+        Rows are `(account_code, paid_at, transaction_id, source, amount)` tuples,
+        ordered by account and payment time."""
+        conditions, parameters = self._make_export_conditions(
+            account_codes,
+            "paid_at",
+            None if start is None else start.isoformat(),
+            None if end is None else end.isoformat(),
+        )
+
+        return self._iter_batches(
+            "SELECT account_code, paid_at, transaction_id, source, amount FROM payments",
+            "account_code, paid_at, transaction_id",
+            3,
+            conditions,
+            parameters,
+            batch_size,
+        )
+
+
+@callback
+def async_get_history_store(hass: HomeAssistantType) -> HistoryStore:
+    """Get history store shared by every config entry"""
+    history_store: Optional[HistoryStore] = hass.data.get(DATA_HISTORY_STORE)
+
+    if history_store is None:
+        history_store = HistoryStore(hass, hass.config.path(HISTORY_DATABASE_FILE))
+        hass.data[DATA_HISTORY_STORE] = history_store
+
+        async def _async_close_history_store(_: Event) -> None:
+            hass.data.pop(DATA_HISTORY_STORE, None)
+            await history_store.async_close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_history_store)
+
+    return history_store
+
+
+async def async_sync_indications(
+    history_store: HistoryStore,
+    account: Account,
+    meter_code: Optional[str] = None,
+    known_newest: Optional[date] = None,
+    full: bool = False,
+) -> int:
+    """Fetch readings of a meter (or of every account meter) into the store.
+
+    Complete history is fetched unless it has already been synchronized for the
+    meter (or for the whole account), in which case only readings taken since the
+    newest synchronized date are. When `known_newest` (e.g. meter's
+    `last_indications_date`) is provided and is already synchronized, portal is
+    not queried at all. `full` forces complete history to be fetched again.
+    Synchronization of empty history is recorded as well, so that it is not
+    fetched completely over and over.
+
+    :return: Count of stored rows
+    """
+    synced_until = (
+        None
+        if full
+        else await history_store.async_get_synced_until(
+            account.code, SYNC_KIND_INDICATIONS, meter_code
+        )
+    )
+    newest = None if synced_until is None else date.fromisoformat(synced_until)
+
+    if newest is not None and known_newest is not None and known_newest <= newest:
+        return 0
+
+    # Newest synchronized date is re-fetched, as its readings may still get updated
+    start = None if newest is None else datetime.fromordinal(newest.toordinal())
+
+    indications = await with_auto_auth(
+        account.api,
+        account.async_get_indications,
+        start,
+        None,
+        meter_code,
+    )
+
+    stored = await history_store.async_add_indications(account.code, indications)
+
+    if indications:
+        synced_until = max(indication.taken_on for indication in indications)
+    elif newest is None:
+        # History is empty so far; the day before the fetch is marked, so that
+        # readings taken later on the day of the fetch are not skipped
+        synced_until = dt_util.now().date() - timedelta(days=1)
+    else:
+        synced_until = None
+
+    if synced_until is not None:
+        await history_store.async_set_synced_until(
+            account.code, SYNC_KIND_INDICATIONS, meter_code, synced_until.isoformat()
+        )
+
+    _LOGGER.debug(
+        "[%s] Synchronized %d indication rows since %s",
+        mask_username(account.code),
+        stored,
+        newest or "the beginning",
+    )
+
+    return stored
+
+
+async def async_sync_payments(
+    history_store: HistoryStore,
+    account: Account,
+    known_last_payment: Optional[Payment] = None,
+    full: bool = False,
+) -> int:
+    """Fetch payments of an account into the ledger.
+
+    Complete history is fetched unless it has already been synchronized, in which
+    case only payments made since the newest synchronized one are. When
+    `known_last_payment` (e.g. last payment sensor data) is provided and is
+    already synchronized, portal is not queried at all. `full` forces complete
+    history to be fetched again. Synchronization of empty history is recorded
+    as well, so that it is not fetched completely over and over.
+
+    :return: Count of new payments
+    """
+    synced_until = (
+        None
+        if full
+        else await history_store.async_get_synced_until(account.code, SYNC_KIND_PAYMENTS)
+    )
+    start = None if synced_until is None else datetime.fromisoformat(synced_until)
+
+    if (
+        start is not None
+        and known_last_payment is not None
+        and await history_store.async_has_payment(account.code, known_last_payment.transaction_id)
+    ):
+        return 0
+
+    # Payments made at the same time as the newest one are deduplicated by ledger
+    payments = await with_auto_auth(account.api, account.async_get_payments, start, None)
+
+    added = await history_store.async_add_payments(account.code, payments)
+
+    if payments:
+        synced_until = max(payment.paid_at for payment in payments)
+    elif start is None:
+        # Ledger is empty so far; payments made since the day of the fetch are yet to come
+        synced_until = datetime.fromordinal(dt_util.now().date().toordinal())
+    else:
+        synced_until = None
+
+    if synced_until is not None:
+        await history_store.async_set_synced_until(
+            account.code, SYNC_KIND_PAYMENTS, None, synced_until.isoformat()
+        )
+
+    _LOGGER.debug(
+        "[%s] Synchronized %d new payments since %s",
+        mask_username(account.code),
+        added,
+        start or "the beginning",
+    )
+
+    return added
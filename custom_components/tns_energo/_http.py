@@ -0,0 +1,268 @@
+__all__ = (
+    "LatencyStats",
+    "TokenBucket",
+    "async_attach_shared_connector",
+    "async_get_rate_limiter",
+    "async_get_shared_connector",
+    "async_update_rate_limits",
+)
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Dict, List, Optional, TYPE_CHECKING, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, callback
+from homeassistant.helpers.typing import HomeAssistantType
+
+from custom_components.tns_energo._util import (
+    PRIORITY_NAMES,
+    get_request_priority,
+    register_rate_limiter,
+)
+from custom_components.tns_energo.const import (
+    CONF_BURST,
+    CONF_RATE,
+    CONF_RATE_LIMIT,
+    DATA_API_OBJECTS,
+    DATA_CONNECTORS,
+    DATA_FINAL_CONFIG,
+    DATA_RATE_LIMITERS,
+    DEFAULT_RATE_LIMIT_BURST,
+    DEFAULT_RATE_LIMIT_RATE,
+)
+
+if TYPE_CHECKING:
+    from tns_energo_api import TNSEnergoAPI
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upper bound of simultaneously open connections to a single portal host
+CONNECTOR_LIMIT = 8
+
+# Idle connections are kept open between polls for this many seconds
+CONNECTOR_KEEPALIVE_TIMEOUT = 75
+
+CONNECTOR_DNS_CACHE_TTL = 600
+
+
+class LatencyStats:
+    """Queueing latency of requests of a single priority class"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.count if self.count else 0.0
+
+    def record(self, waited: float) -> None:
+        self.count += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+
+class TokenBucket:
+    """Token bucket limiting request rate towards a single host.
+
+    Up to `burst` requests pass immediately, after which requests are let through
+    at `rate` requests per second. Queued requests are ordered by priority class
+    (see `request_priority`), and in FIFO order within the same class."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+
+        self.latency: Dict[int, LatencyStats] = {
+            priority: LatencyStats() for priority in PRIORITY_NAMES
+        }
+
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._waiters: List[Tuple[int, int, "asyncio.Future"]] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    @property
+    def acquired(self) -> int:
+        return sum(stats.count for stats in self.latency.values())
+
+    @property
+    def average_wait(self) -> float:
+        acquired = self.acquired
+        if not acquired:
+            return 0.0
+        return sum(stats.total_wait for stats in self.latency.values()) / acquired
+
+    def configure(self, rate: float, burst: int) -> None:
+        """Apply new limits (tokens exceeding the new burst are dropped)"""
+        self._refill()
+        self.rate = rate
+        self.burst = burst
+        self._tokens = min(self._tokens, float(burst))
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def _dispatch(self) -> None:
+        """Hand out available tokens to queued requests, highest priority first"""
+        self._wakeup = None
+        self._refill()
+
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                # Waiter got cancelled
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+
+        if self._waiters:
+            self._wakeup = asyncio.get_running_loop().call_later(
+                (1 - self._tokens) / self.rate, self._dispatch
+            )
+
+    async def async_acquire(self, priority: Optional[int] = None) -> float:
+        """Wait for a token; returns seconds spent waiting"""
+        if priority is None:
+            priority = get_request_priority()
+
+        started_at = time.monotonic()
+        self._refill()
+
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+            if self._wakeup is None:
+                self._dispatch()
+            await future
+
+        waited = time.monotonic() - started_at
+        stats = self.latency[priority]
+        stats.record(waited)
+
+        if waited >= 0.001:
+            _LOGGER.debug(
+                "Request (%s) throttled for %.3f seconds (queue depth: %d, average wait: %.3f)",
+                PRIORITY_NAMES[priority],
+                waited,
+                self.queue_depth,
+                stats.average_wait,
+            )
+
+        return waited
+
+
+def _get_host(api: "TNSEnergoAPI") -> str:
+    # All API requests are sent to the REST host, not to the region personal cabinet
+    return urlparse(api.requests_url_base).netloc
+
+
+@callback
+def async_get_rate_limiter(hass: HomeAssistantType, host: str) -> TokenBucket:
+    """Get rate limiter shared by every API object talking to the host.
+
+    Limiters are created with default limits, configured ones are applied by
+    `async_update_rate_limits`."""
+    rate_limiters: Dict[str, TokenBucket] = hass.data.setdefault(DATA_RATE_LIMITERS, {})
+    rate_limiter = rate_limiters.get(host)
+
+    if rate_limiter is None:
+        rate_limiter = TokenBucket(DEFAULT_RATE_LIMIT_RATE, DEFAULT_RATE_LIMIT_BURST)
+        rate_limiters[host] = rate_limiter
+
+    return rate_limiter
+
+
+@callback
+def async_update_rate_limits(hass: HomeAssistantType) -> None:
+    """Recompute limits of shared rate limiters from currently loaded config entries.
+
+    The most restrictive configuration among entries talking to a host wins, and
+    limiters of hosts no loaded entry talks to return to default limits. Must be
+    called whenever a config entry gets set up or unloaded."""
+    final_configs = hass.data.get(DATA_FINAL_CONFIG, {})
+    limits: Dict[str, Tuple[float, int]] = {}
+
+    for entry_id, api in hass.data.get(DATA_API_OBJECTS, {}).items():
+        final_config = final_configs.get(entry_id)
+        if final_config is None:
+            continue
+
+        rate_limit = final_config[CONF_RATE_LIMIT]
+        host = _get_host(api)
+        rate, burst = limits.get(host, (rate_limit[CONF_RATE], rate_limit[CONF_BURST]))
+        limits[host] = (min(rate, rate_limit[CONF_RATE]), min(burst, rate_limit[CONF_BURST]))
+
+    for host, rate_limiter in hass.data.get(DATA_RATE_LIMITERS, {}).items():
+        rate, burst = limits.get(host, (DEFAULT_RATE_LIMIT_RATE, DEFAULT_RATE_LIMIT_BURST))
+        if (rate, burst) != (rate_limiter.rate, rate_limiter.burst):
+            _LOGGER.debug("Rate limit for host %s: %s requests/s, burst %d", host, rate, burst)
+            rate_limiter.configure(rate, burst)
+
+
+@callback
+def async_get_shared_connector(hass: HomeAssistantType, host: str) -> aiohttp.TCPConnector:
+    """Get pooled connector shared by every API object talking to the host"""
+    connectors: Dict[str, aiohttp.TCPConnector] = hass.data.get(DATA_CONNECTORS)
+
+    if connectors is None:
+        connectors = {}
+        hass.data[DATA_CONNECTORS] = connectors
+
+        async def _async_close_connectors(_: Event) -> None:
+            for connector in connectors.values():
+                await connector.close()
+            connectors.clear()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_connectors)
+
+    connector = connectors.get(host)
+
+    if connector is None or connector.closed:
+        _LOGGER.debug("Creating shared connector for host %s", host)
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTOR_LIMIT,
+            keepalive_timeout=CONNECTOR_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=CONNECTOR_DNS_CACHE_TTL,
+        )
+        connectors[host] = connector
+
+    return connector
+
+
+async def async_attach_shared_connector(hass: HomeAssistantType, api: "TNSEnergoAPI") -> None:
+    """Replace API object's private session with one backed by the shared connector.
+
+    Every API object keeps its own cookie jar (sessions of different logins must
+    not mix), while TCP/TLS connections and the request rate limiter are shared
+    per host. Rate limiting is applied per portal call by `with_auto_auth`, so
+    time spent in the queue does not count towards request timeouts."""
+    host = _get_host(api)
+    private_session: aiohttp.ClientSession = api._session
+
+    api._session = aiohttp.ClientSession(
+        connector=async_get_shared_connector(hass, host),
+        connector_owner=False,
+        timeout=private_session.timeout,
+        headers=private_session.headers,
+        cookie_jar=aiohttp.CookieJar(),
+    )
+    register_rate_limiter(api, async_get_rate_limiter(hass, host))
+
+    await private_session.close()
@@ -0,0 +1,445 @@
+__all__ = (
+    "EVENT_QUEUED_INDICATIONS",
+    "SubmissionQueue",
+    "async_remove_queue_state",
+)
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Set, TYPE_CHECKING, Union
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import HomeAssistantType
+from homeassistant.util import dt as dt_util
+from homeassistant.util.uuid import random_uuid_hex
+
+from custom_components.tns_energo._util import (
+    AuthenticationException,
+    CircuitOpenException,
+    IS_IN_RUSSIA,
+    PRIORITY_BACKGROUND,
+    get_submit_period,
+    mask_username,
+    request_priority,
+    with_auto_auth,
+)
+from custom_components.tns_energo._validation import validate_indications
+from custom_components.tns_energo.const import (
+    ATTR_ACCOUNT_CODE,
+    ATTR_ATTEMPTS,
+    ATTR_COMMENT,
+    ATTR_IGNORE_INDICATIONS,
+    ATTR_INDICATIONS,
+    ATTR_METER_CODE,
+    ATTR_QUEUED_AT,
+    ATTR_REASONS,
+    ATTR_STATUS,
+    ATTR_SUBMISSION_ID,
+    ATTR_SUCCESS,
+    CONF_END_DAY,
+    CONF_METERS,
+    CONF_START_DAY,
+    CONF_SUBMIT_PERIOD,
+    DOMAIN,
+)
+from tns_energo_api.exceptions import ResponseResultException, TNSEnergoException
+
+if TYPE_CHECKING:
+    from custom_components.tns_energo._coordinator import TNSEnergoCoordinator
+    from tns_energo_api import Meter
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+EVENT_QUEUED_INDICATIONS = DOMAIN + "_queued_indications"
+
+STATUS_DELIVERED = "delivered"
+STATUS_ALREADY_SUBMITTED = "already_submitted"
+STATUS_REJECTED = "rejected"
+STATUS_FAILED = "failed"
+
+ATTR_NEXT_ATTEMPT_AT = "next_attempt_at"
+ATTR_UNCONFIRMED = "unconfirmed"
+
+# Submissions rejected by the portal this many times are dropped
+QUEUE_MAX_ATTEMPTS = 5
+
+# Delay before retrying a failed submission (doubled after every failure)
+QUEUE_RETRY_DELAY = 60.0
+QUEUE_MAX_RETRY_DELAY = 3600.0
+
+# Pause between consecutive submissions
+QUEUE_SUBMISSION_DELAY = 1.0
+
+
+def _make_store(hass: HomeAssistantType, entry_id: str) -> Store:
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.queue.{entry_id}")
+
+
+async def async_remove_queue_state(hass: HomeAssistantType, entry_id: str) -> None:
+    await _make_store(hass, entry_id).async_remove()
+
+
+def _is_already_submitted(meter: "Meter", indications: Mapping[str, Union[int, float]]) -> bool:
+    meter_zones = meter.zones
+    return all(
+        zone_id in meter_zones and meter_zones[zone_id].last_indication == int(value)
+        for zone_id, value in indications.items()
+    )
+
+
+class SubmissionQueue:
+    """Persistent queue of indications submissions of a single config entry.
+
+    Only the latest queued submission is kept per meter, and queueing the same
+    indications again is a no-op. Submissions are delivered sequentially while
+    the submission period is active, and the queue sleeps until the next period
+    starts otherwise. Before delivery, submissions are checked against cached
+    meter data: ones already accepted by the portal are not sent again, and
+    ones failing local validation are dropped. Meter data is fetched anew before
+    retrying a submission whose previous attempt ended without a response, as
+    the portal may have accepted indications nonetheless. Failed deliveries are
+    retried with exponential backoff; portal outages are retried indefinitely,
+    while submissions rejected by the portal are dropped after
+    `QUEUE_MAX_ATTEMPTS` attempts."""
+
+    def __init__(self, coordinator: "TNSEnergoCoordinator") -> None:
+        self.coordinator = coordinator
+        self.hass = coordinator.hass
+        self._store = _make_store(self.hass, coordinator.config_entry.entry_id)
+        self._submissions: List[Dict[str, Any]] = []
+        self._task: Optional["asyncio.Task"] = None
+        self._unsub_wakeup: Optional[CALLBACK_TYPE] = None
+        self._rerun = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def get_submission(self, account_code: str, meter_code: str) -> Optional[Dict[str, Any]]:
+        for submission in self._submissions:
+            if (
+                submission[ATTR_ACCOUNT_CODE] == account_code
+                and submission[ATTR_METER_CODE] == meter_code
+            ):
+                return submission
+        return None
+
+    def _ensure_running(self) -> None:
+        if self.running:
+            # Process again once current processing finishes
+            self._rerun = True
+        elif self._submissions:
+            self._cancel_wakeup()
+            self._task = self.coordinator.async_create_background_task(self._async_run())
+
+    def _cancel_wakeup(self) -> None:
+        if self._unsub_wakeup is not None:
+            self._unsub_wakeup()
+            self._unsub_wakeup = None
+
+    @callback
+    def _async_notify(self) -> None:
+        # Meter entities render queued submissions, and write their state only when changed
+        self.coordinator.async_notify_listeners(CONF_METERS)
+
+    async def _async_handle_wakeup(self, *_) -> None:
+        self._unsub_wakeup = None
+        self._ensure_running()
+
+    def async_stop(self) -> None:
+        """Stop scheduled processing (submissions stay persisted)"""
+        self._cancel_wakeup()
+
+    async def async_resume(self) -> None:
+        """Load submissions left undelivered before restart (if any)"""
+        submissions = await self._store.async_load()
+        if not submissions:
+            return
+
+        _LOGGER.info(
+            self.coordinator.log_prefix
+            + (
+                f"Восстановлена очередь передачи показаний ({len(submissions)})"
+                if IS_IN_RUSSIA
+                else f"Restored indications submission queue ({len(submissions)})"
+            )
+        )
+
+        self._submissions = submissions
+        self._ensure_running()
+
+    async def async_enqueue(
+        self,
+        account_code: str,
+        meter_code: str,
+        indications: Mapping[str, Union[int, float]],
+        ignore_indications: bool = False,
+    ) -> Dict[str, Any]:
+        """Queue indications for submission, replacing the ones queued for the meter"""
+        indications = dict(indications)
+        submission = self.get_submission(account_code, meter_code)
+
+        if (
+            submission is not None
+            and submission[ATTR_INDICATIONS] == indications
+            and submission[ATTR_IGNORE_INDICATIONS] == ignore_indications
+        ):
+            return submission
+
+        if submission is not None:
+            self._submissions.remove(submission)
+
+        submission = {
+            ATTR_SUBMISSION_ID: random_uuid_hex(),
+            ATTR_ACCOUNT_CODE: account_code,
+            ATTR_METER_CODE: meter_code,
+            ATTR_INDICATIONS: indications,
+            ATTR_IGNORE_INDICATIONS: ignore_indications,
+            ATTR_QUEUED_AT: dt_util.utcnow().isoformat(),
+            ATTR_ATTEMPTS: 0,
+            ATTR_NEXT_ATTEMPT_AT: None,
+            ATTR_UNCONFIRMED: False,
+            ATTR_COMMENT: None,
+        }
+        self._submissions.append(submission)
+        await self._store.async_save(self._submissions)
+
+        self._async_notify()
+        self._ensure_running()
+
+        return submission
+
+    def _finish(
+        self,
+        submission: Dict[str, Any],
+        status: str,
+        comment: str,
+        reasons: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        self._submissions.remove(submission)
+        submission[ATTR_STATUS] = status
+
+        log_message = (
+            f"[{mask_username(submission[ATTR_ACCOUNT_CODE])}][{submission[ATTR_METER_CODE]}] "
+            + (
+                "Обработка показаний из очереди завершена"
+                if IS_IN_RUSSIA
+                else "Queued indications processed"
+            )
+            + f" ({status}): {comment}"
+        )
+        if status in (STATUS_DELIVERED, STATUS_ALREADY_SUBMITTED):
+            _LOGGER.info(log_message)
+        else:
+            _LOGGER.warning(log_message)
+
+        self.hass.bus.async_fire(
+            EVENT_QUEUED_INDICATIONS,
+            {
+                ATTR_SUBMISSION_ID: submission[ATTR_SUBMISSION_ID],
+                ATTR_ACCOUNT_CODE: submission[ATTR_ACCOUNT_CODE],
+                ATTR_METER_CODE: submission[ATTR_METER_CODE],
+                ATTR_INDICATIONS: submission[ATTR_INDICATIONS],
+                ATTR_QUEUED_AT: submission[ATTR_QUEUED_AT],
+                ATTR_ATTEMPTS: submission[ATTR_ATTEMPTS],
+                ATTR_SUCCESS: status in (STATUS_DELIVERED, STATUS_ALREADY_SUBMITTED),
+                ATTR_STATUS: status,
+                ATTR_COMMENT: comment,
+                ATTR_REASONS: reasons,
+            },
+        )
+
+        self._async_notify()
+
+    def _postpone(self, submission: Dict[str, Any], comment: str) -> None:
+        submission[ATTR_ATTEMPTS] += 1
+        submission[ATTR_COMMENT] = comment
+        delay = min(QUEUE_RETRY_DELAY * 2 ** (submission[ATTR_ATTEMPTS] - 1), QUEUE_MAX_RETRY_DELAY)
+        submission[ATTR_NEXT_ATTEMPT_AT] = (dt_util.utcnow() + timedelta(seconds=delay)).isoformat()
+
+        _LOGGER.debug(
+            "[%s][%s] Queued indications submission failed, retrying in %.0f seconds: %s",
+            mask_username(submission[ATTR_ACCOUNT_CODE]),
+            submission[ATTR_METER_CODE],
+            delay,
+            comment,
+        )
+
+        self._async_notify()
+
+    async def _async_deliver(self, submission: Dict[str, Any], meter: "Meter") -> bool:
+        """Deliver a single submission; returns whether portal is reachable"""
+        indications = submission[ATTR_INDICATIONS]
+        ignore_indications = submission[ATTR_IGNORE_INDICATIONS]
+
+        if _is_already_submitted(meter, indications):
+            self._finish(submission, STATUS_ALREADY_SUBMITTED, "Indications were already submitted")
+            return True
+
+        reasons = validate_indications(meter, indications, ignore_indications)
+        if reasons:
+            self._finish(
+                submission,
+                STATUS_REJECTED,
+                "Invalid indications: " + "; ".join(reason[ATTR_COMMENT] for reason in reasons),
+                reasons,
+            )
+            return True
+
+        try:
+            with request_priority(PRIORITY_BACKGROUND):
+                await with_auto_auth(
+                    meter.account.api,
+                    meter.async_send_indications,
+                    **indications,
+                    ignore_values=ignore_indications,
+                )
+
+        except AuthenticationException as e:
+            # Credentials are rejected, hence the rest of submissions would fail as well
+            self._postpone(submission, "Authentication error: %s" % e)
+            return False
+
+        except ResponseResultException as e:
+            if submission[ATTR_ATTEMPTS] + 1 >= QUEUE_MAX_ATTEMPTS:
+                submission[ATTR_ATTEMPTS] += 1
+                self._finish(submission, STATUS_FAILED, "API error: %s" % e)
+            else:
+                self._postpone(submission, "API error: %s" % e)
+            return True
+
+        except TNSEnergoException as e:
+            if not isinstance(e, CircuitOpenException):
+                # Request might have reached the portal
+                submission[ATTR_UNCONFIRMED] = True
+            self._postpone(submission, "API error: %r" % e)
+            return False
+
+        submission[ATTR_ATTEMPTS] += 1
+        self._finish(submission, STATUS_DELIVERED, "Indications submitted successfully")
+        return True
+
+    async def _async_process(self) -> Optional[float]:
+        """Deliver due submissions; returns delay until the next check is due"""
+        coordinator = self.coordinator
+        now = dt_util.now()
+
+        submit_period = coordinator.final_config[CONF_SUBMIT_PERIOD]
+        period_start, period_end, period_active = get_submit_period(
+            now.date(),
+            submit_period[CONF_START_DAY],
+            submit_period[CONF_END_DAY],
+        )
+
+        if not period_active:
+            return (dt_util.start_of_local_day(period_start) - now).total_seconds()
+
+        all_meters = coordinator.data.get(CONF_METERS) or {}
+        if not coordinator.accounts or not all_meters:
+            # Meters are not fetched yet after restart
+            return QUEUE_RETRY_DELAY
+
+        delivered_account_codes: Set[str] = set()
+
+        for submission in list(self._submissions):
+            next_attempt_at = submission[ATTR_NEXT_ATTEMPT_AT]
+            if next_attempt_at is not None and datetime.fromisoformat(next_attempt_at) > now:
+                continue
+
+            account_code = submission[ATTR_ACCOUNT_CODE]
+
+            if submission.get(ATTR_UNCONFIRMED):
+                if not await self._async_refetch_meters(account_code):
+                    self._postpone(submission, "Could not confirm previous attempt")
+                    await self._store.async_save(self._submissions)
+                    break
+                submission[ATTR_UNCONFIRMED] = False
+                all_meters = coordinator.data.get(CONF_METERS) or {}
+
+            meters = all_meters.get(account_code)
+            if meters is None:
+                if account_code not in coordinator.accounts:
+                    self._finish(submission, STATUS_REJECTED, "Account not found")
+                continue
+
+            meter = meters.get(submission[ATTR_METER_CODE])
+            if meter is None:
+                self._finish(submission, STATUS_REJECTED, "Meter not found")
+                continue
+
+            is_reachable = await self._async_deliver(submission, meter)
+            await self._store.async_save(self._submissions)
+
+            if submission.get(ATTR_STATUS) == STATUS_DELIVERED:
+                delivered_account_codes.add(account_code)
+
+            if not is_reachable:
+                # Remaining submissions would fail the same way
+                break
+
+            await asyncio.sleep(QUEUE_SUBMISSION_DELAY)
+
+        await self._store.async_save(self._submissions)
+
+        if delivered_account_codes:
+            self._async_refresh_meters(delivered_account_codes)
+
+        if not self._submissions:
+            return None
+
+        # Wake up for the next retry, or when the period ends; submissions without
+        # scheduled retries were skipped (meters not fetched yet, or portal outage)
+        wakeup_at = dt_util.start_of_local_day(period_end + timedelta(days=1))
+        for submission in self._submissions:
+            next_attempt_at = submission[ATTR_NEXT_ATTEMPT_AT]
+            wakeup_at = min(
+                wakeup_at,
+                (
+                    now + timedelta(seconds=QUEUE_RETRY_DELAY)
+                    if next_attempt_at is None
+                    else datetime.fromisoformat(next_attempt_at)
+                ),
+            )
+
+        return max((wakeup_at - dt_util.now()).total_seconds(), 0.0)
+
+    async def _async_refetch_meters(self, account_code: str) -> bool:
+        """Fetch current meters data of an account; returns whether fetching succeeded"""
+        coordinator = self.coordinator
+        fetched_at = coordinator.get_fetched_at(CONF_METERS, account_code)
+        await coordinator.async_refresh(CONF_METERS, (account_code,))
+        return coordinator.get_fetched_at(CONF_METERS, account_code) != fetched_at
+
+    def _async_refresh_meters(self, account_codes: Set[str]) -> None:
+        from custom_components.tns_energo.sensor import METER_PUSH_BOOST_DURATION
+
+        coordinator = self.coordinator
+        for account_code in account_codes:
+            coordinator.async_boost(CONF_METERS, account_code, METER_PUSH_BOOST_DURATION)
+        coordinator.async_create_background_task(
+            coordinator.async_refresh(CONF_METERS, account_codes)
+        )
+
+    async def _async_run(self) -> None:
+        # Processing is short-lived, waiting for the next check is done via timer
+        delay = None
+        self._rerun = True
+
+        while self._rerun and self._submissions:
+            self._rerun = False
+            delay = await self._async_process()
+
+        if delay is None or not self._submissions:
+            _LOGGER.debug(self.coordinator.log_prefix + "Indications submission queue is empty")
+            return
+
+        _LOGGER.debug(
+            self.coordinator.log_prefix + "Next queued indications check in %.0f seconds",
+            delay,
+        )
+        self._unsub_wakeup = async_call_later(self.hass, delay, self._async_handle_wakeup)
@@ -0,0 +1,173 @@
+__all__ = ("RangeCache",)
+
+import asyncio
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import timedelta
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+_T = TypeVar("_T")
+
+
+class _Interval(Generic[_T]):
+    __slots__ = ("start", "end", "items", "positions")
+
+    def __init__(self, start: Any, end: Any, items: List[_T], positions: List[Any]) -> None:
+        self.start = start
+        self.end = end
+        self.items = items
+        self.positions = positions
+
+
+class RangeCache(Generic[_T]):
+    """In-memory cache of ordered items over covered closed intervals, per key.
+
+    Requests for a range fetch only the parts of it not yet covered; fetched
+    intervals are merged with overlapping and adjacent ones (`step` apart), so
+    repeated overlapping requests are served from memory. Keys are evicted in
+    least-recently-used order once the total count of cached items exceeds
+    `max_items`."""
+
+    def __init__(
+        self,
+        get_position: Callable[[_T], Any],
+        step: timedelta,
+        max_items: int,
+    ) -> None:
+        self.get_position = get_position
+        self.step = step
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[Hashable, List[_Interval[_T]]]" = OrderedDict()
+        self._generations: Dict[Hashable, int] = {}
+        self._lock = asyncio.Lock()
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def _find_gaps(self, intervals: List[_Interval[_T]], start: Any, end: Any) -> List[Tuple]:
+        gaps = []
+        cursor = start
+
+        for interval in intervals:
+            if interval.end < cursor:
+                continue
+            if interval.start > end:
+                break
+            if interval.start > cursor:
+                gaps.append((cursor, interval.start - self.step))
+            cursor = interval.end + self.step
+            if cursor > end:
+                break
+
+        if cursor <= end:
+            gaps.append((cursor, end))
+
+        return gaps
+
+    def _insert(self, intervals: List[_Interval[_T]], new: _Interval[_T]) -> None:
+        """Insert interval (not overlapping any existing one), merging adjacent ones"""
+        index = bisect_left([interval.start for interval in intervals], new.start)
+        intervals.insert(index, new)
+
+        # Merge with the following, then with the preceding interval
+        for index in (index, index - 1):
+            if 0 <= index < len(intervals) - 1:
+                current, following = intervals[index], intervals[index + 1]
+                if following.start - current.end <= self.step:
+                    current.end = following.end
+                    current.items.extend(following.items)
+                    current.positions.extend(following.positions)
+                    del intervals[index + 1]
+
+    def _evict(self, keep: Hashable) -> None:
+        while self._size > self.max_items:
+            key = next((key for key in self._entries if key != keep), None)
+            if key is None:
+                break
+            self.invalidate(key)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop cached intervals for a key (or for every key)"""
+        keys = list(self._entries) if key is None else [key]
+
+        for key in keys:
+            intervals = self._entries.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+            if intervals:
+                self._size -= sum(len(interval.items) for interval in intervals)
+
+    def invalidate_matching(self, predicate: Callable[[Hashable], bool]) -> None:
+        for key in [key for key in self._entries if predicate(key)]:
+            self.invalidate(key)
+
+    async def async_get(
+        self,
+        key: Hashable,
+        start: Any,
+        end: Any,
+        fetch: Callable[[Any, Any], Awaitable[List[_T]]],
+    ) -> List[_T]:
+        """Get items positioned within [start, end], fetching uncovered gaps only.
+
+        :param fetch: Coroutine function returning ordered items within a closed range
+        """
+        async with self._lock:
+            intervals = self._entries.get(key)
+            if intervals is None:
+                intervals = self._entries[key] = []
+            else:
+                self._entries.move_to_end(key)
+
+            gaps = self._find_gaps(intervals, start, end)
+
+            if not gaps:
+                self.hits += 1
+            else:
+                self.misses += 1
+                generation = self._generations.get(key, 0)
+
+                fetched = [(gap, await fetch(*gap)) for gap in gaps]
+
+                if self._generations.get(key, 0) != generation:
+                    # Invalidated while fetching, hence fetched data may be outdated
+                    return await fetch(start, end)
+
+                for (gap_start, gap_end), items in fetched:
+                    self._insert(
+                        intervals,
+                        _Interval(
+                            gap_start,
+                            gap_end,
+                            list(items),
+                            [self.get_position(item) for item in items],
+                        ),
+                    )
+                    self._size += len(items)
+
+                self._evict(key)
+
+            interval = next(
+                interval
+                for interval in intervals
+                if interval.start <= start and interval.end >= end
+            )
+
+            return interval.items[
+                bisect_left(interval.positions, start) : bisect_right(interval.positions, end)
+            ]
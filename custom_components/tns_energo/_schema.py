@@ -14,17 +14,32 @@ from homeassistant.helpers import config_validation as cv
 from custom_components.tns_energo._util import IS_IN_RUSSIA
 from custom_components.tns_energo.const import (
     CONF_ACCOUNTS,
+    CONF_BURST,
     CONF_DEV_PRESENTATION,
+    CONF_END_DAY,
     CONF_LAST_PAYMENT,
+    CONF_MAX_BACKOFF,
+    CONF_MAX_CONCURRENCY,
     CONF_METERS,
     CONF_NAME_FORMAT,
+    CONF_RATE,
+    CONF_RATE_LIMIT,
+    CONF_START_DAY,
+    CONF_SUBMIT_PERIOD,
+    CONF_TARIFFS,
+    DEFAULT_MAX_BACKOFF,
+    DEFAULT_MAX_CONCURRENCY,
     DEFAULT_NAME_FORMAT_EN_ACCOUNTS,
     DEFAULT_NAME_FORMAT_EN_LAST_PAYMENT,
     DEFAULT_NAME_FORMAT_EN_METERS,
     DEFAULT_NAME_FORMAT_RU_ACCOUNTS,
     DEFAULT_NAME_FORMAT_RU_LAST_PAYMENT,
     DEFAULT_NAME_FORMAT_RU_METERS,
+    DEFAULT_RATE_LIMIT_BURST,
+    DEFAULT_RATE_LIMIT_RATE,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SUBMIT_PERIOD_END_DAY,
+    DEFAULT_SUBMIT_PERIOD_START_DAY,
 )
 
 MIN_SCAN_INTERVAL = timedelta(seconds=60)
@@ -64,6 +79,37 @@ SCAN_INTERVAL_SCHEMA = vol.Schema(
 )
 
 
+RATE_LIMIT_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_RATE, default=DEFAULT_RATE_LIMIT_RATE): vol.All(
+            vol.Coerce(float), vol.Range(min=0.01)
+        ),
+        vol.Optional(CONF_BURST, default=DEFAULT_RATE_LIMIT_BURST): cv.positive_int,
+    },
+    extra=vol.PREVENT_EXTRA,
+)
+
+
+SUBMIT_PERIOD_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_START_DAY, default=DEFAULT_SUBMIT_PERIOD_START_DAY): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=31)
+        ),
+        vol.Optional(CONF_END_DAY, default=DEFAULT_SUBMIT_PERIOD_END_DAY): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=31)
+        ),
+    },
+    extra=vol.PREVENT_EXTRA,
+)
+
+
+TARIFFS_SCHEMA = vol.Schema(
+    {
+        vol.Match(r"t\d+"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    }
+)
+
+
 def _validator_name_format_schema(schema):
     return vol.Any(
         vol.All(cv.string, lambda x: {CONF_ACCOUNTS: x}, schema),
@@ -89,6 +135,7 @@ GENERIC_ACCOUNT_SCHEMA = vol.Schema(
             ),
             SCAN_INTERVAL_SCHEMA,
         ),
+        vol.Optional(CONF_TARIFFS, default=dict): TARIFFS_SCHEMA,
     },
     extra=vol.PREVENT_EXTRA,
 )
@@ -111,6 +158,12 @@ CONFIG_ENTRY_SCHEMA = vol.Schema(
         vol.Required(CONF_USERNAME): cv.string,
         vol.Required(CONF_PASSWORD): cv.string,
         vol.Optional(CONF_DEV_PRESENTATION, default=False): cv.boolean,
+        vol.Optional(CONF_MAX_BACKOFF, default=DEFAULT_MAX_BACKOFF): cv.positive_time_period,
+        vol.Optional(CONF_MAX_CONCURRENCY, default=DEFAULT_MAX_CONCURRENCY): cv.positive_int,
+        vol.Optional(CONF_RATE_LIMIT, default=lambda: RATE_LIMIT_SCHEMA({})): RATE_LIMIT_SCHEMA,
+        vol.Optional(
+            CONF_SUBMIT_PERIOD, default=lambda: SUBMIT_PERIOD_SCHEMA({})
+        ): SUBMIT_PERIOD_SCHEMA,
         # Additional API configuration
         vol.Optional(
             CONF_DEFAULT, default=lambda: GENERIC_ACCOUNT_SCHEMA({})
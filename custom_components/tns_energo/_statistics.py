@@ -0,0 +1,254 @@
+__all__ = (
+    "async_import_account_statistics",
+    "async_import_meter_statistics",
+    "async_schedule_statistics_import",
+    "make_statistic_id",
+    "make_statistics_rows",
+)
+
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, List, Mapping, Optional, Sequence, TYPE_CHECKING, Tuple
+
+import numpy as np
+from homeassistant.core import callback
+from homeassistant.helpers.typing import HomeAssistantType
+from homeassistant.util import dt as dt_util, slugify
+
+from custom_components.tns_energo._consumption import ConsumptionSeries, async_derive_consumption
+from custom_components.tns_energo._history import async_get_history_store, async_sync_indications
+from custom_components.tns_energo._util import mask_username
+from custom_components.tns_energo.const import DATA_STATISTICS_IMPORTS, DOMAIN
+from tns_energo_api import Account, Meter
+
+if TYPE_CHECKING:
+    from custom_components.tns_energo._coordinator import TNSEnergoCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Statistics rows are handed over to the recorder in batches of this size
+STATISTICS_IMPORT_BATCH_SIZE = 500
+
+STATISTICS_UNIT_OF_MEASUREMENT = "kWh"
+
+
+def make_statistic_id(account_code: str, meter_code: str, zone_id: str) -> str:
+    return f"{DOMAIN}:" + slugify(f"{account_code}_{meter_code}_{zone_id}")
+
+
+def make_statistics_rows(
+    readings: Sequence[Tuple[date, float]],
+    consumption: ConsumptionSeries,
+    last_day: Optional[date] = None,
+    last_sum: float = 0.0,
+) -> List[Dict[str, Any]]:
+    """Make statistics rows of a meter zone from its readings.
+
+    `state` holds the reading as is, while `sum` accumulates consumption derived
+    from readings (scaled by transmission coefficient, not growing over meter
+    replacements and resets), continuing from `last_sum` of the row for `last_day`.
+
+    :param readings: `(taken_on, value)` pairs, ordered by date
+    :param consumption: Consumption series of the zone
+    :param last_day: Date of the last imported row (older readings are skipped)
+    :param last_sum: Sum of the last imported row
+    """
+    days, daily = consumption.days, consumption.daily
+    if last_day is not None:
+        mask = days > np.datetime64(last_day, "D")
+        days, daily = days[mask], daily[mask]
+    totals = np.cumsum(daily)
+
+    rows = []
+    for taken_on, value in readings:
+        if last_day is not None and taken_on <= last_day:
+            continue
+        index = int(np.searchsorted(days, np.datetime64(taken_on, "D"), side="right"))
+        total = float(totals[index - 1]) if index else 0.0
+        rows.append(
+            {
+                "start": dt_util.start_of_local_day(taken_on),
+                "state": value,
+                "sum": round(last_sum + total, 3),
+            }
+        )
+
+    return rows
+
+
+def _row_start_to_datetime(start) -> datetime:
+    # Recorder versions differ in returning timestamps or datetime objects
+    if isinstance(start, (int, float)):
+        return dt_util.utc_from_timestamp(start)
+    return start
+
+
+async def _async_get_last_row(
+    hass: HomeAssistantType, statistic_id: str
+) -> Tuple[Optional[datetime], float]:
+    from homeassistant.components.recorder import get_instance
+    from homeassistant.components.recorder.statistics import get_last_statistics
+
+    last_statistics = await get_instance(hass).async_add_executor_job(
+        get_last_statistics, hass, 1, statistic_id, False, {"sum"}
+    )
+
+    rows = last_statistics.get(statistic_id)
+    if not rows:
+        return None, 0.0
+    return _row_start_to_datetime(rows[0]["start"]), rows[0].get("sum") or 0.0
+
+
+async def async_import_meter_statistics(hass: HomeAssistantType, meter: Meter) -> int:
+    """Import meter readings history stored locally into long-term statistics.
+
+    Every meter zone gets a series of its own. Only readings taken after the last
+    imported statistics row are added, so the import may be safely repeated or
+    interrupted. History is not synchronized with the portal beforehand.
+
+    :return: Count of imported rows
+    """
+    if "recorder" not in hass.config.components:
+        return 0
+
+    from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+    account = meter.account
+    history_store = async_get_history_store(hass)
+
+    last_rows: Dict[str, Tuple[Optional[datetime], float]] = {
+        zone_id: await _async_get_last_row(
+            hass, make_statistic_id(account.code, meter.code, zone_id)
+        )
+        for zone_id in meter.zones
+    }
+
+    last_days: Dict[str, Optional[date]] = {
+        zone_id: None if last_start is None else dt_util.as_local(last_start).date()
+        for zone_id, (last_start, _) in last_rows.items()
+    }
+
+    known_days = [last_day for last_day in last_days.values() if last_day is not None]
+    query_start = None if len(known_days) < len(last_days) else min(known_days)
+
+    indications = await history_store.async_get_indications(account.code, meter.code, query_start)
+    newest = max((indication.taken_on for indication in indications), default=None)
+    if newest is None or all(
+        last_day is not None and newest <= last_day for last_day in last_days.values()
+    ):
+        return 0
+
+    consumption = await async_derive_consumption(
+        hass,
+        account.code,
+        meter.code,
+        {(account.code, meter.code): meter.transmission_coefficient},
+    )
+
+    imported = 0
+
+    for zone_id, zone in meter.zones.items():
+        zone_consumption = consumption.get((account.code, meter.code, zone_id))
+        if zone_consumption is None:
+            continue
+
+        statistics = make_statistics_rows(
+            [
+                (indication.taken_on, indication.zones[zone_id])
+                for indication in indications
+                if indication.zones.get(zone_id) is not None
+            ],
+            zone_consumption,
+            last_days[zone_id],
+            last_rows[zone_id][1],
+        )
+
+        if not statistics:
+            continue
+
+        metadata = {
+            "has_mean": False,
+            "has_sum": True,
+            "name": f"{account.code} {meter.code} {zone.name or zone_id}",
+            "source": DOMAIN,
+            "statistic_id": make_statistic_id(account.code, meter.code, zone_id),
+            "unit_of_measurement": STATISTICS_UNIT_OF_MEASUREMENT,
+        }
+
+        for offset in range(0, len(statistics), STATISTICS_IMPORT_BATCH_SIZE):
+            async_add_external_statistics(
+                hass, metadata, statistics[offset : offset + STATISTICS_IMPORT_BATCH_SIZE]
+            )
+
+        imported += len(statistics)
+
+    if imported:
+        _LOGGER.debug(
+            "[%s][%s] Imported %d statistics rows",
+            mask_username(account.code),
+            meter.code,
+            imported,
+        )
+
+    return imported
+
+
+async def async_import_account_statistics(
+    hass: HomeAssistantType, account: Account, meters: Mapping[str, Meter]
+) -> int:
+    """Synchronize indications history of an account once, then import every meter of it.
+
+    :return: Count of imported rows
+    """
+    if "recorder" not in hass.config.components:
+        return 0
+
+    meter_dates = [
+        meter.last_indications_date
+        for meter in meters.values()
+        if meter.last_indications_date is not None
+    ]
+
+    # Portal returns history of every account meter at once
+    await async_sync_indications(
+        async_get_history_store(hass),
+        account,
+        known_newest=max(meter_dates) if meter_dates else None,
+    )
+
+    imported = 0
+    for meter in meters.values():
+        imported += await async_import_meter_statistics(hass, meter)
+
+    return imported
+
+
+@callback
+def async_schedule_statistics_import(
+    coordinator: "TNSEnergoCoordinator", account: Account, meters: Mapping[str, Meter]
+) -> None:
+    """Import statistics of account meters in background when their readings change.
+
+    Entities of every account meter call this on updates; the import runs once
+    per change of any meter's last indications date."""
+    hass = coordinator.hass
+    signature = frozenset(
+        (meter_code, meter.last_indications_date) for meter_code, meter in meters.items()
+    )
+    signatures: Dict[str, frozenset] = hass.data.setdefault(DATA_STATISTICS_IMPORTS, {})
+
+    if signatures.get(account.code) == signature:
+        return
+
+    signatures[account.code] = signature
+
+    async def _async_import() -> None:
+        try:
+            await async_import_account_statistics(hass, account, meters)
+        except Exception as e:
+            # Retry on next meter update
+            if signatures.get(account.code) == signature:
+                del signatures[account.code]
+            _LOGGER.warning("[%s] Error importing statistics: %r", mask_username(account.code), e)
+
+    coordinator.async_create_background_task(_async_import())
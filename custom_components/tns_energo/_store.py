@@ -0,0 +1,190 @@
+__all__ = (
+    "SnapshotStore",
+    "SnapshotType",
+)
+
+import logging
+from datetime import date, datetime
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, TYPE_CHECKING, Tuple
+
+import attr
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import HomeAssistantType
+
+from custom_components.tns_energo.const import (
+    CONF_ACCOUNTS,
+    CONF_LAST_PAYMENT,
+    CONF_METERS,
+    DOMAIN,
+)
+from tns_energo_api import Account, Meter, MeterZone, Payment
+
+if TYPE_CHECKING:
+    from tns_energo_api import TNSEnergoAPI
+
+    from custom_components.tns_energo._coordinator import TNSEnergoCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Delay between last data update and snapshot write
+SNAPSHOT_SAVE_DELAY = 10
+
+SnapshotType = Tuple[Dict[str, Account], Dict[str, Dict[str, Any]]]
+
+_METER_DATE_FIELDS = (
+    "checkup_date",
+    "last_checkup_date",
+    "manufactured_date",
+    "last_indications_date",
+)
+
+
+def _encode_date(value: Optional[date]) -> Optional[str]:
+    return None if value is None else value.isoformat()
+
+
+def _decode_date(value: Optional[str]) -> Optional[date]:
+    return None if value is None else date.fromisoformat(value)
+
+
+#################################################################################
+# Per-kind encoders
+#################################################################################
+
+
+def encode_account(account: Account) -> Dict[str, Any]:
+    return attr.asdict(account, recurse=False, filter=lambda a, _: a.name != "api")
+
+
+def decode_account(data: Mapping[str, Any], api: "TNSEnergoAPI") -> Account:
+    return Account(api=api, **data)
+
+
+def encode_meters(meters: Mapping[str, Meter]) -> Dict[str, Any]:
+    encoded = {}
+
+    for meter_code, meter in meters.items():
+        meter_data = attr.asdict(
+            meter, recurse=False, filter=lambda a, _: a.name not in ("account", "zones")
+        )
+        for field in _METER_DATE_FIELDS:
+            meter_data[field] = _encode_date(meter_data[field])
+        meter_data["zones"] = {
+            zone_id: attr.asdict(zone, recurse=False) for zone_id, zone in meter.zones.items()
+        }
+        encoded[meter_code] = meter_data
+
+    return encoded
+
+
+def decode_meters(data: Mapping[str, Any], account: Account) -> Dict[str, Meter]:
+    meters = {}
+
+    for meter_code, meter_data in data.items():
+        meter_data = dict(meter_data)
+        for field in _METER_DATE_FIELDS:
+            meter_data[field] = _decode_date(meter_data[field])
+        meter_data["zones"] = MappingProxyType(
+            {zone_id: MeterZone(**zone_data) for zone_id, zone_data in meter_data["zones"].items()}
+        )
+        meters[meter_code] = Meter(account=account, **meter_data)
+
+    return meters
+
+
+def encode_last_payment(payment: Optional[Payment]) -> Optional[Dict[str, Any]]:
+    if payment is None:
+        return None
+    payment_data = attr.asdict(payment, recurse=False)
+    payment_data["paid_at"] = payment.paid_at.isoformat()
+    return payment_data
+
+
+def decode_last_payment(data: Optional[Mapping[str, Any]], account: Account) -> Optional[Payment]:
+    if data is None:
+        return None
+    payment_data = dict(data)
+    payment_data["paid_at"] = datetime.fromisoformat(payment_data["paid_at"])
+    return Payment(**payment_data)
+
+
+_KIND_ENCODERS: Mapping[str, Callable[[Any], Any]] = {
+    CONF_METERS: encode_meters,
+    CONF_LAST_PAYMENT: encode_last_payment,
+}
+
+_KIND_DECODERS: Mapping[str, Callable[[Any, Account], Any]] = {
+    CONF_METERS: decode_meters,
+    CONF_LAST_PAYMENT: decode_last_payment,
+}
+
+
+#################################################################################
+# Store wrapper
+#################################################################################
+
+
+class SnapshotStore:
+    """Persists last known good coordinator snapshot of a config entry"""
+
+    def __init__(self, hass: HomeAssistantType, entry_id: str) -> None:
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.snapshot.{entry_id}")
+
+    async def async_load(self, api: "TNSEnergoAPI") -> Optional[SnapshotType]:
+        stored = await self._store.async_load()
+        if not stored:
+            return None
+
+        try:
+            accounts = {
+                account_code: decode_account(account_data, api)
+                for account_code, account_data in stored[CONF_ACCOUNTS].items()
+            }
+
+            data: Dict[str, Dict[str, Any]] = {CONF_ACCOUNTS: dict(accounts)}
+            for config_key, kind_data in stored["data"].items():
+                decoder = _KIND_DECODERS.get(config_key)
+                if decoder is None:
+                    continue
+                data[config_key] = {
+                    account_code: decoder(account_data, accounts[account_code])
+                    for account_code, account_data in kind_data.items()
+                    if account_code in accounts
+                }
+
+        except (KeyError, TypeError, ValueError) as e:
+            _LOGGER.warning("Discarding incompatible stored snapshot: %r", e)
+            return None
+
+        return accounts, data
+
+    def _encode_snapshot(self, coordinator: "TNSEnergoCoordinator") -> Dict[str, Any]:
+        encoded_data = {}
+
+        for config_key, kind_data in coordinator.data.items():
+            encoder = _KIND_ENCODERS.get(config_key)
+            if encoder is not None:
+                encoded_data[config_key] = {
+                    account_code: encoder(account_data)
+                    for account_code, account_data in kind_data.items()
+                }
+
+        return {
+            CONF_ACCOUNTS: {
+                account_code: encode_account(account)
+                for account_code, account in coordinator.accounts.items()
+            },
+            "data": encoded_data,
+        }
+
+    def async_schedule_save(self, coordinator: "TNSEnergoCoordinator") -> None:
+        self._store.async_delay_save(
+            lambda: self._encode_snapshot(coordinator),
+            SNAPSHOT_SAVE_DELAY,
+        )
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
@@ -0,0 +1,80 @@
+__all__ = (
+    "calculate_charges",
+    "get_tariffs",
+)
+
+from typing import Any, Dict, Mapping, TYPE_CHECKING, Union
+
+from homeassistant.const import CONF_DEFAULT
+
+from custom_components.tns_energo.const import (
+    ATTR_CHARGE,
+    ATTR_CONSUMPTION,
+    ATTR_PREVIOUS,
+    ATTR_SUM,
+    ATTR_TARIFF,
+    ATTR_ZONES,
+    CONF_TARIFFS,
+)
+
+if TYPE_CHECKING:
+    from custom_components.tns_energo._coordinator import TNSEnergoCoordinator
+    from tns_energo_api import Meter
+
+
+def get_tariffs(coordinator: "TNSEnergoCoordinator", account_code: str) -> Mapping[str, float]:
+    """Get tariff table for account, falling back to the default (region-wide) one"""
+    for account_config in (
+        coordinator.get_account_config(account_code),
+        coordinator.final_config[CONF_DEFAULT],
+    ):
+        if account_config and account_config.get(CONF_TARIFFS):
+            return account_config[CONF_TARIFFS]
+
+    return {}
+
+
+def calculate_charges(
+    meter: "Meter",
+    indications: Mapping[str, Union[int, float]],
+    tariffs: Mapping[str, float],
+    ignore_indications: bool = False,
+) -> Dict[str, Any]:
+    """Calculate expected charges for indications without contacting the portal.
+
+    :param meter: Meter to calculate charges for (last indications are taken from it)
+    :param indications: Indications to calculate charges for, by zone
+    :param tariffs: Tariff table (price per unit by zone)
+    :param ignore_indications: Allow indications lower than the last ones
+    :return: Charges by zone, and their sum
+    """
+    zones = {}
+    total = 0.0
+    coefficient = meter.transmission_coefficient or 1
+
+    for zone_id, value in indications.items():
+        tariff = tariffs.get(zone_id)
+        if tariff is None:
+            raise ValueError(f"tariff for meter zone {zone_id} is not configured")
+
+        previous = meter.zones[zone_id].last_indication or 0
+        if value < previous and not ignore_indications:
+            raise ValueError(
+                f"indication for meter zone {zone_id} is less than the last one ({previous})"
+            )
+
+        consumption = (value - previous) * coefficient
+        charge = round(consumption * tariff, 2)
+        total += charge
+
+        zones[zone_id] = {
+            ATTR_PREVIOUS: previous,
+            ATTR_CONSUMPTION: consumption,
+            ATTR_TARIFF: tariff,
+            ATTR_CHARGE: charge,
+        }
+
+    return {
+        ATTR_ZONES: zones,
+        ATTR_SUM: round(total, 2),
+    }
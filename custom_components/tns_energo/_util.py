@@ -1,7 +1,28 @@
+import asyncio
+import calendar
 import datetime
+import logging
 import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import timedelta
-from typing import Any, Callable, Coroutine, Optional, TypeVar, Union
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    Hashable,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+    TYPE_CHECKING,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from weakref import WeakKeyDictionary
 
 from homeassistant import config_entries
 from homeassistant.config_entries import ConfigEntry
@@ -9,10 +30,26 @@ from homeassistant.const import CONF_USERNAME
 from homeassistant.core import callback
 from homeassistant.helpers.entity_platform import EntityPlatform
 from homeassistant.helpers.typing import HomeAssistantType
+from homeassistant.util.uuid import random_uuid_hex
 
-from custom_components.tns_energo.const import DOMAIN
+from custom_components.tns_energo.const import (
+    ATTR_PAGE,
+    ATTR_PAGES,
+    ATTR_REQUEST_ID,
+    ATTR_RESULT,
+    DOMAIN,
+)
 from tns_energo_api import TNSEnergoAPI
-from tns_energo_api.exceptions import EmptyResultException, TNSEnergoException
+from tns_energo_api.exceptions import (
+    EmptyResultException,
+    ResponseResultException,
+    TNSEnergoException,
+)
+
+if TYPE_CHECKING:
+    from custom_components.tns_energo._http import TokenBucket
+
+_LOGGER = logging.getLogger(__name__)
 
 
 def _make_log_prefix(
@@ -56,18 +93,513 @@ LOCAL_TIMEZONE = datetime.datetime.now(datetime.timezone.utc).astimezone().tzinf
 IS_IN_RUSSIA = timedelta(hours=3) <= LOCAL_TIMEZONE.utcoffset(None) <= timedelta(hours=12)
 
 
+def _clamp_day(year: int, month: int, day: int) -> datetime.date:
+    return datetime.date(year, month, min(day, calendar.monthrange(year, month)[1]))
+
+
+def _shift_month(year: int, month: int, shift: int) -> Tuple[int, int]:
+    month_index = year * 12 + month - 1 + shift
+    return month_index // 12, month_index % 12 + 1
+
+
+def get_submit_period(
+    today: datetime.date, start_day: int, end_day: int
+) -> Tuple[datetime.date, datetime.date, bool]:
+    """Current (or next upcoming) indications submission period.
+
+    Days beyond the end of a month are clamped to its last day. When `start_day`
+    is greater than `end_day`, the period spans two consecutive months.
+
+    :return: Period start date, period end date (inclusive), whether period is active
+    """
+    wraps = start_day > end_day
+
+    # Periods starting in the previous, current and next months
+    for shift in (-1, 0, 1):
+        start_year, start_month = _shift_month(today.year, today.month, shift)
+        end_year, end_month = _shift_month(start_year, start_month, 1 if wraps else 0)
+        period_start = _clamp_day(start_year, start_month, start_day)
+        period_end = _clamp_day(end_year, end_month, end_day)
+
+        if today <= period_end:
+            return period_start, period_end, period_start <= today
+
+    raise RuntimeError("unreachable")
+
+
 _T = TypeVar("_T")
 _RT = TypeVar("_RT")
 
 
-async def with_auto_auth(
+# Only calls with these name prefixes are read-only and safe to coalesce
+SINGLE_FLIGHT_PREFIXES = ("async_get_", "async_fetch_")
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into a single in-flight request.
+
+    A call only joins an in-flight request queued with the same or a more urgent
+    priority (see `request_priority`); otherwise it would wait behind lower
+    priority traffic. A more urgent call is sent on its own instead, and
+    identical calls made afterwards join it."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._in_flight: Dict[Hashable, Tuple[int, "asyncio.Future"]] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def _on_done(self, key: Hashable, future: "asyncio.Future") -> None:
+        if self._in_flight.get(key, (None, None))[1] is future:
+            del self._in_flight[key]
+        if not future.cancelled():
+            # Mark exception as retrieved in case every waiter got cancelled
+            future.exception()
+
+    async def async_call(
+        self,
+        key: Hashable,
+        async_getter: Callable[..., Coroutine[Any, Any, _RT]],
+        *args,
+        **kwargs,
+    ) -> _RT:
+        priority = get_request_priority()
+        in_flight_priority, future = self._in_flight.get(key, (None, None))
+
+        if future is None or in_flight_priority > priority:
+            self.misses += 1
+            future = asyncio.ensure_future(async_getter(*args, **kwargs))
+            self._in_flight[key] = (priority, future)
+            future.add_done_callback(lambda x: self._on_done(key, x))
+        else:
+            self.hits += 1
+            _LOGGER.debug(
+                "Coalesced call to in-flight request (hits: %d, misses: %d)",
+                self.hits,
+                self.misses,
+            )
+
+        # Shield shared future from cancellation of a single waiter
+        return await asyncio.shield(future)
+
+
+_SINGLE_FLIGHTS: "WeakKeyDictionary[TNSEnergoAPI, SingleFlight]" = WeakKeyDictionary()
+
+
+def get_single_flight(api: "TNSEnergoAPI") -> SingleFlight:
+    try:
+        return _SINGLE_FLIGHTS[api]
+    except KeyError:
+        single_flight = SingleFlight()
+        _SINGLE_FLIGHTS[api] = single_flight
+        return single_flight
+
+
+def _make_single_flight_key(
+    async_getter: Callable[..., Any], args: Tuple[Any, ...], kwargs: Mapping[str, Any]
+) -> Optional[Hashable]:
+    func = getattr(async_getter, "__func__", async_getter)
+    if not getattr(func, "__name__", "").startswith(SINGLE_FLIGHT_PREFIXES):
+        return None
+
+    bound_to = getattr(async_getter, "__self__", None)
+    try:
+        hash(bound_to)
+    except TypeError:
+        bound_to = id(bound_to)
+
+    key = (bound_to, func, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+
+    return key
+
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_BACKFILL = 2
+
+PRIORITY_NAMES: Mapping[int, str] = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+    PRIORITY_BACKFILL: "backfill",
+}
+
+_REQUEST_PRIORITY: ContextVar[int] = ContextVar("request_priority", default=PRIORITY_BACKGROUND)
+
+
+def get_request_priority() -> int:
+    return _REQUEST_PRIORITY.get()
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Queue portal calls made within the block (and tasks spawned from it) with priority"""
+    token = _REQUEST_PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _REQUEST_PRIORITY.reset(token)
+
+
+_RATE_LIMITERS: "WeakKeyDictionary[TNSEnergoAPI, TokenBucket]" = WeakKeyDictionary()
+
+
+def register_rate_limiter(api: "TNSEnergoAPI", rate_limiter: "TokenBucket") -> None:
+    """Throttle every portal call of the API object with the rate limiter"""
+    _RATE_LIMITERS[api] = rate_limiter
+
+
+def get_rate_limiter(api: "TNSEnergoAPI") -> Optional["TokenBucket"]:
+    return _RATE_LIMITERS.get(api)
+
+
+async def _async_throttle(api: "TNSEnergoAPI") -> None:
+    rate_limiter = _RATE_LIMITERS.get(api)
+    if rate_limiter is not None:
+        await rate_limiter.async_acquire()
+
+
+# Sessions are never assumed to live shorter than this
+MIN_SESSION_LIFETIME: float = 60.0
+
+# Fraction of observed session lifetime after which re-authentication is performed
+SESSION_LIFETIME_SAFETY_FACTOR: float = 0.9
+
+# Growth of estimated session lifetime whenever a session outlived the estimate
+SESSION_LIFETIME_GROWTH_FACTOR: float = 1.5
+
+
+class AuthenticationException(ResponseResultException):
+    """Portal rejected credentials of the API object"""
+
+
+class AuthState:
+    """Serializes re-authentication of a single API object.
+
+    Every successful login increments `generation`. Callers remember the generation
+    they issued a request under; after a failure only the first caller to acquire
+    the lock logs in again, while the rest see an advanced generation and simply
+    retry on the new session."""
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self.authenticated_at: Optional[float] = None
+        self.session_lifetime: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        if self.authenticated_at is None or self.session_lifetime is None:
+            return None
+        return self.authenticated_at + self.session_lifetime * SESSION_LIFETIME_SAFETY_FACTOR
+
+    @property
+    def is_expired(self) -> bool:
+        expires_at = self.expires_at
+        return expires_at is not None and time.monotonic() >= expires_at
+
+    def observe_session_expiry(self, authenticated_at: Optional[float], failed_at: float) -> None:
+        """Record lifetime of a session that was rejected by the portal"""
+        if authenticated_at is None:
+            return
+
+        # Latest observation replaces the estimate, so that it follows changes
+        # of portal session policy in both directions
+        lifetime = max(failed_at - authenticated_at, MIN_SESSION_LIFETIME)
+        if lifetime != self.session_lifetime:
+            _LOGGER.debug("Estimated session lifetime: %.0f seconds", lifetime)
+            self.session_lifetime = lifetime
+
+    def _extend_session_lifetime(self) -> None:
+        # Session was replaced before the portal rejected it, hence it might
+        # have lived longer than estimated; probe a longer lifetime next time
+        if self.session_lifetime is None:
+            return
+
+        self.session_lifetime *= SESSION_LIFETIME_GROWTH_FACTOR
+        _LOGGER.debug("Estimated session lifetime: %.0f seconds", self.session_lifetime)
+
+    async def async_authenticate(
+        self, api: "TNSEnergoAPI", seen_generation: Optional[int] = None, proactive: bool = False
+    ) -> None:
+        async with self._lock:
+            if seen_generation is not None and seen_generation != self.generation:
+                # Another caller has already logged in while this one waited
+                return
+
+            if proactive and self.authenticated_at is not None:
+                self._extend_session_lifetime()
+
+            await _async_throttle(api)
+            try:
+                await api.async_authenticate()
+            except EmptyResultException:
+                raise
+            except ResponseResultException as e:
+                # Retrying with the same credentials is pointless
+                raise AuthenticationException(*e.args) from e
+
+            self.authenticated_at = time.monotonic()
+            self.generation += 1
+
+
+_AUTH_STATES: "WeakKeyDictionary[TNSEnergoAPI, AuthState]" = WeakKeyDictionary()
+
+
+def get_auth_state(api: "TNSEnergoAPI") -> AuthState:
+    try:
+        return _AUTH_STATES[api]
+    except KeyError:
+        auth_state = AuthState()
+        _AUTH_STATES[api] = auth_state
+        return auth_state
+
+
+async def _async_call_authenticated(
     api: "TNSEnergoAPI", async_getter: Callable[..., Coroutine[Any, Any, _RT]], *args, **kwargs
 ) -> _RT:
+    auth_state = get_auth_state(api)
+    seen_generation = auth_state.generation
+
+    if auth_state.authenticated_at is None or auth_state.is_expired:
+        # Authenticate before the portal starts rejecting requests
+        await auth_state.async_authenticate(api, seen_generation, proactive=True)
+        seen_generation = auth_state.generation
+
     try:
+        await _async_throttle(api)
         return await async_getter(*args, **kwargs)
     except EmptyResultException:
         # Attempt once more
+        await _async_throttle(api)
         return await async_getter(*args, **kwargs)
-    except TNSEnergoException:
-        await api.async_authenticate()
-        return await async_getter(*args, **kwargs)
+    except TNSEnergoException as e:
+        failed_at = time.monotonic()
+        session_started_at = auth_state.authenticated_at
+
+        await auth_state.async_authenticate(api, seen_generation)
+        await _async_throttle(api)
+        result = await async_getter(*args, **kwargs)
+
+        if isinstance(e, ResponseResultException):
+            # Portal rejected the request, yet accepted it on a new session,
+            # hence the previous session had expired (transport errors and
+            # timeouts tell nothing about the session)
+            auth_state.observe_session_expiry(session_started_at, failed_at)
+
+        return result
+
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+# Consecutive outage failures after which the circuit opens
+CIRCUIT_FAILURE_THRESHOLD = 3
+
+# Initial time the circuit stays open before a probe request is let through
+CIRCUIT_OPEN_INTERVAL: float = 30.0
+
+
+class CircuitOpenException(TNSEnergoException):
+    """Portal call rejected without a request while the circuit is open"""
+
+
+def _is_outage(exception: BaseException) -> bool:
+    # Portal answering with a negative result is reachable, only transport
+    # and malformed response errors indicate an outage
+    return isinstance(exception, TNSEnergoException) and not isinstance(
+        exception, (ResponseResultException, CircuitOpenException)
+    )
+
+
+class CircuitBreaker:
+    """Stops calling the portal of a single API object while it is unreachable.
+
+    After `failure_threshold` consecutive outage failures the circuit opens and
+    calls fail fast with `CircuitOpenException`. Once the open interval elapses,
+    the circuit becomes half-open and lets a single probe call through: success
+    closes the circuit, while failure opens it again for twice as long (up to
+    `max_open_interval`)."""
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        open_interval: float = CIRCUIT_OPEN_INTERVAL,
+        max_open_interval: float = 30 * 60.0,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.open_interval = open_interval
+        self.max_open_interval = max_open_interval
+
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self.opened_at: Optional[float] = None
+        self.current_interval = open_interval
+
+        self._probe_in_flight = False
+
+    @property
+    def retry_at(self) -> Optional[float]:
+        if self.opened_at is None:
+            return None
+        return self.opened_at + self.current_interval
+
+    def before_call(self) -> bool:
+        """Check whether a call may proceed; returns whether the call is a probe"""
+        if self.state == CIRCUIT_CLOSED:
+            return False
+
+        if self.state == CIRCUIT_OPEN and time.monotonic() >= self.retry_at:
+            self.state = CIRCUIT_HALF_OPEN
+
+        if self.state == CIRCUIT_HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            _LOGGER.debug("Circuit half-open, sending probe request")
+            return True
+
+        self.rejected += 1
+        raise CircuitOpenException(
+            "Portal is unavailable, next attempt in %.0f seconds"
+            % max(self.retry_at - time.monotonic(), 0)
+        )
+
+    def record_success(self, is_probe: bool) -> None:
+        if is_probe:
+            self._probe_in_flight = False
+
+        if self.state != CIRCUIT_CLOSED:
+            _LOGGER.info(
+                "Portal is available again, circuit closed (%d calls rejected)", self.rejected
+            )
+
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self.opened_at = None
+        self.current_interval = self.open_interval
+
+    def record_failure(self, is_probe: bool, exception: BaseException) -> None:
+        if is_probe:
+            self._probe_in_flight = False
+
+        if not _is_outage(exception):
+            if is_probe:
+                self.record_success(is_probe=False)
+            return
+
+        self.failures += 1
+
+        if self.state == CIRCUIT_OPEN:
+            # Call was sent before the circuit opened
+            return
+
+        if self.state == CIRCUIT_HALF_OPEN:
+            self.current_interval = min(self.current_interval * 2, self.max_open_interval)
+        elif self.failures < self.failure_threshold:
+            return
+
+        if self.state == CIRCUIT_CLOSED:
+            _LOGGER.warning(
+                "Portal is unavailable after %d failures, pausing requests: %r",
+                self.failures,
+                exception,
+            )
+        else:
+            _LOGGER.debug(
+                "Probe request failed, next attempt in %.0f seconds", self.current_interval
+            )
+
+        self.state = CIRCUIT_OPEN
+        self.opened_at = time.monotonic()
+
+    def release_probe(self, is_probe: bool) -> None:
+        """Let another call probe the portal when the current probe got cancelled"""
+        if is_probe:
+            self._probe_in_flight = False
+
+
+_CIRCUIT_BREAKERS: "WeakKeyDictionary[TNSEnergoAPI, CircuitBreaker]" = WeakKeyDictionary()
+
+
+def get_circuit_breaker(api: "TNSEnergoAPI") -> CircuitBreaker:
+    try:
+        return _CIRCUIT_BREAKERS[api]
+    except KeyError:
+        circuit_breaker = CircuitBreaker()
+        _CIRCUIT_BREAKERS[api] = circuit_breaker
+        return circuit_breaker
+
+
+async def _async_call_with_auto_auth(
+    api: "TNSEnergoAPI", async_getter: Callable[..., Coroutine[Any, Any, _RT]], *args, **kwargs
+) -> _RT:
+    circuit_breaker = get_circuit_breaker(api)
+    is_probe = circuit_breaker.before_call()
+
+    try:
+        result = await _async_call_authenticated(api, async_getter, *args, **kwargs)
+    except asyncio.CancelledError:
+        circuit_breaker.release_probe(is_probe)
+        raise
+    except BaseException as e:
+        circuit_breaker.record_failure(is_probe, e)
+        raise
+
+    circuit_breaker.record_success(is_probe)
+    return result
+
+
+async def with_auto_auth(
+    api: "TNSEnergoAPI", async_getter: Callable[..., Coroutine[Any, Any, _RT]], *args, **kwargs
+) -> _RT:
+    key = _make_single_flight_key(async_getter, args, kwargs)
+
+    if key is None:
+        return await _async_call_with_auto_auth(api, async_getter, *args, **kwargs)
+
+    return await get_single_flight(api).async_call(
+        key, _async_call_with_auto_auth, api, async_getter, *args, **kwargs
+    )
+
+
+async def async_fire_paged(
+    hass: HomeAssistantType,
+    event_type: str,
+    event_data: Mapping[str, Any],
+    items: Sequence[_T],
+    encoder: Callable[[_T], Any],
+    page_size: int,
+) -> None:
+    """Fire results as a sequence of events carrying at most `page_size` items each.
+
+    Every event carries `event_data` along with the page of encoded items, the page
+    number, total page count and request ID shared by the whole sequence. Items are
+    encoded page by page, and control is returned to the event loop between pages,
+    so large results do not stall it."""
+    request_id = random_uuid_hex()
+    pages = max(1, -(-len(items) // page_size))
+
+    for page in range(pages):
+        if page:
+            await asyncio.sleep(0)
+
+        hass.bus.async_fire(
+            event_type,
+            {
+                **event_data,
+                ATTR_REQUEST_ID: request_id,
+                ATTR_PAGE: page + 1,
+                ATTR_PAGES: pages,
+                ATTR_RESULT: [
+                    encoder(item) for item in items[page * page_size : (page + 1) * page_size]
+                ],
+            },
+        )
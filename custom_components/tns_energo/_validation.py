@@ -0,0 +1,127 @@
+__all__ = (
+    "IndicationsValidationError",
+    "REASON_ABOVE_MAX_DIFFERENCE",
+    "REASON_NOT_ABOVE_LAST",
+    "REASON_UNKNOWN_ZONE",
+    "check_indications",
+    "validate_indications",
+)
+
+from typing import Any, Dict, List, Mapping, TYPE_CHECKING, Union
+
+from custom_components.tns_energo.const import (
+    ATTR_COMMENT,
+    ATTR_LIMIT,
+    ATTR_REASON,
+    ATTR_VALUE,
+    ATTR_ZONE,
+)
+
+if TYPE_CHECKING:
+    from tns_energo_api import Meter
+
+REASON_UNKNOWN_ZONE = "unknown_zone"
+REASON_NOT_ABOVE_LAST = "not_above_last"
+REASON_ABOVE_MAX_DIFFERENCE = "above_max_difference"
+
+
+class IndicationsValidationError(ValueError):
+    """Indications are rejected locally, before reaching the portal"""
+
+    def __init__(self, reasons: List[Dict[str, Any]]) -> None:
+        super().__init__("; ".join(reason[ATTR_COMMENT] for reason in reasons))
+        self.reasons = reasons
+
+
+def _make_reason(
+    zone_id: str, reason: str, value: Union[int, float], limit: Any, comment: str
+) -> Dict[str, Any]:
+    return {
+        ATTR_ZONE: zone_id,
+        ATTR_REASON: reason,
+        ATTR_VALUE: value,
+        ATTR_LIMIT: limit,
+        ATTR_COMMENT: comment,
+    }
+
+
+def validate_indications(
+    meter: "Meter",
+    indications: Mapping[str, Union[int, float]],
+    ignore_values: bool = False,
+) -> List[Dict[str, Any]]:
+    """Validate indications against cached meter zone definitions.
+
+    Checks mirror the ones performed by the portal, hence indications that fail
+    them are known to be rejected without submitting them:
+
+    - every zone must exist on the meter;
+    - a reading must be greater than the last one (portal accepts integers only,
+      so the fractional part is discarded before comparison);
+    - a reading must not exceed the last one by more than the maximum difference
+      allowed for the zone (when the portal provides one).
+
+    :param meter: Meter to validate indications for
+    :param indications: Indications by zone
+    :param ignore_values: Skip value checks (zone existence is still checked)
+    :return: Reasons for rejection (empty when indications are valid)
+    """
+    meter_zones = meter.zones
+    reasons = []
+
+    for zone_id, value in indications.items():
+        zone = meter_zones.get(zone_id)
+        if zone is None:
+            reasons.append(
+                _make_reason(
+                    zone_id,
+                    REASON_UNKNOWN_ZONE,
+                    value,
+                    sorted(meter_zones),
+                    f"meter zone {zone_id} does not exist",
+                )
+            )
+            continue
+
+        if ignore_values:
+            continue
+
+        last_indication = zone.last_indication or 0
+        if int(value) <= last_indication:
+            reasons.append(
+                _make_reason(
+                    zone_id,
+                    REASON_NOT_ABOVE_LAST,
+                    value,
+                    last_indication,
+                    f"indication for meter zone {zone_id} is not greater "
+                    f"than the last one ({last_indication})",
+                )
+            )
+            continue
+
+        max_difference = zone.max_indication_difference
+        if max_difference and int(value) - last_indication > max_difference:
+            reasons.append(
+                _make_reason(
+                    zone_id,
+                    REASON_ABOVE_MAX_DIFFERENCE,
+                    value,
+                    last_indication + max_difference,
+                    f"indication for meter zone {zone_id} exceeds the last one "
+                    f"({last_indication}) by more than {max_difference}",
+                )
+            )
+
+    return reasons
+
+
+def check_indications(
+    meter: "Meter",
+    indications: Mapping[str, Union[int, float]],
+    ignore_values: bool = False,
+) -> None:
+    """Validate indications, raising `IndicationsValidationError` with all reasons found"""
+    reasons = validate_indications(meter, indications, ignore_values)
+    if reasons:
+        raise IndicationsValidationError(reasons)
@@ -30,6 +30,7 @@ from homeassistant.const import (
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.typing import ConfigType
 
+from custom_components.tns_energo._http import async_attach_shared_connector
 from custom_components.tns_energo.const import (
     CONF_ACCOUNTS,
     CONF_LAST_INVOICE,
@@ -74,6 +75,7 @@ class TNSEnergoConfigFlow(ConfigFlow, domain=DOMAIN):
         self._current_config: Optional[ConfigType] = None
         self._devices_info = None
         self._accounts: Optional[Mapping[int, "Account"]] = None
+        self._reauth_entry: Optional[ConfigEntry] = None
 
         self.schema_user = None
 
@@ -107,6 +109,8 @@ class TNSEnergoConfigFlow(ConfigFlow, domain=DOMAIN):
             username=username,
             password=user_input[CONF_PASSWORD],
         ) as api:
+            await async_attach_shared_connector(self.hass, api)
+
             try:
                 await api.async_authenticate()
 
@@ -175,6 +179,58 @@ class TNSEnergoConfigFlow(ConfigFlow, domain=DOMAIN):
             data={CONF_USERNAME: username},
         )
 
+    async def async_step_reauth(self, user_input: Optional[ConfigType] = None) -> Dict[str, Any]:
+        self._reauth_entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+
+        if self._reauth_entry is None:
+            return self.async_abort(reason="unknown_error")
+
+        if self._reauth_entry.source == config_entries.SOURCE_IMPORT:
+            # Credentials are updated within YAML configuration
+            return self.async_abort(reason="yaml_not_supported")
+
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: Optional[ConfigType] = None
+    ) -> Dict[str, Any]:
+        config_entry = self._reauth_entry
+        username = config_entry.data[CONF_USERNAME]
+        schema_reauth = vol.Schema({vol.Required(CONF_PASSWORD): str})
+
+        if user_input is None:
+            return self.async_show_form(
+                step_id="reauth_confirm",
+                data_schema=schema_reauth,
+                description_placeholders={CONF_USERNAME: username},
+            )
+
+        async with TNSEnergoAPI(
+            username=username,
+            password=user_input[CONF_PASSWORD],
+        ) as api:
+            await async_attach_shared_connector(self.hass, api)
+
+            try:
+                await api.async_authenticate()
+
+            except TNSEnergoException as e:
+                _LOGGER.error(f"Authentication error: {repr(e)}")
+                return self.async_show_form(
+                    step_id="reauth_confirm",
+                    data_schema=schema_reauth,
+                    description_placeholders={CONF_USERNAME: username},
+                    errors={"base": "authentication_error"},
+                )
+
+        self.hass.config_entries.async_update_entry(
+            config_entry,
+            data={**config_entry.data, CONF_PASSWORD: user_input[CONF_PASSWORD]},
+        )
+        self.hass.async_create_task(self.hass.config_entries.async_reload(config_entry.entry_id))
+
+        return self.async_abort(reason="reauth_successful")
+
     # @staticmethod
     # @callback
     # def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
@@ -10,10 +10,13 @@ ATTR_ACCOUNT_CODE: Final = "account_code"
 ATTR_ACCOUNT_ID: Final = "account_id"
 ATTR_ADDRESS: Final = "address"
 ATTR_AMOUNT: Final = "amount"
+ATTR_ATTEMPTS: Final = "attempts"
+ATTR_CHARGE: Final = "charge"
 ATTR_CHECKUP_DATE: Final = "checkup_date"
 ATTR_CHECKUP_STATUS: Final = "checkup_status"
 ATTR_CHECKUP_URL: Final = "checkup_url"
 ATTR_COMMENT: Final = "comment"
+ATTR_CONSUMPTION: Final = "consumption"
 ATTR_CONTROLLED_BY_CODE: Final = "controlled_by_code"
 ATTR_DIGITAL_INVOICES_EMAIL: Final = "digital_invoices_email"
 ATTR_DIGITAL_INVOICES_EMAIL_COMMENT: Final = "digital_invoices_email_comment"
@@ -39,6 +42,7 @@ ATTR_LAST_INDICATIONS_DATE: Final = "last_indications_date"
 ATTR_LAST_PAYMENT_AMOUNT: Final = "last_payment_amount"
 ATTR_LAST_PAYMENT_DATE: Final = "last_payment_date"
 ATTR_LAST_PAYMENT_STATUS: Final = "last_payment_status"
+ATTR_LIMIT: Final = "limit"
 ATTR_LIVING_AREA: Final = "living_area"
 ATTR_METER_CATEGORY: Final = "meter_category"
 ATTR_METER_CODE: Final = "meter_codes"
@@ -46,6 +50,9 @@ ATTR_METER_ID: Final = "meter_id"
 ATTR_METER_MODEL: Final = "meter_model"
 ATTR_MODEL: Final = "model"
 ATTR_PAID: Final = "paid"
+ATTR_PAGE: Final = "page"
+ATTR_PAGES: Final = "pages"
+ATTR_PAGE_SIZE: Final = "page_size"
 ATTR_PAID_AT: Final = "paid_at"
 ATTR_PENALTY: Final = "penalty"
 ATTR_PERIOD: Final = "period"
@@ -53,43 +60,69 @@ ATTR_PRECISION: Final = "precision"
 ATTR_PREVIOUS: Final = "previous"
 ATTR_PROVIDER_NAME: Final = "provider_name"
 ATTR_PROVIDER_TYPE: Final = "provider_type"
+ATTR_QUEUED_AT: Final = "queued_at"
+ATTR_QUEUED_INDICATIONS: Final = "queued_indications"
 ATTR_REASON: Final = "reason"
+ATTR_REASONS: Final = "reasons"
 ATTR_RECALCULATIONS: Final = "recalculations"
 ATTR_REMAINING_DAYS: Final = "remaining_days"
+ATTR_REQUEST_ID: Final = "request_id"
 ATTR_RESULT: Final = "result"
 ATTR_SERVICE_NAME: Final = "service_name"
 ATTR_SERVICE_TYPE: Final = "service_type"
 ATTR_SOURCE: Final = "source"
+ATTR_STALE: Final = "stale"
+ATTR_STALE_SINCE: Final = "stale_since"
 ATTR_START: Final = "start"
 ATTR_STATUS: Final = "status"
+ATTR_SUBMISSION_ID: Final = "submission_id"
 ATTR_SUBMIT_PERIOD_ACTIVE: Final = "submit_period_active"
 ATTR_SUBMIT_PERIOD_END: Final = "submit_period_end"
 ATTR_SUBMIT_PERIOD_START: Final = "submit_period_start"
 ATTR_SUCCESS: Final = "success"
 ATTR_SUM: Final = "sum"
 ATTR_TAKEN_ON: Final = "taken_on"
+ATTR_TARIFF: Final = "tariff"
 ATTR_TOTAL: Final = "total"
 ATTR_TOTAL_AREA: Final = "total_area"
 ATTR_TRANSACTION_ID: Final = "transaction_id"
 ATTR_TRANSMISSION_COEFFICIENT: Final = "transmission_coefficient"
 ATTR_TYPE: Final = "type"
 ATTR_UNIT: Final = "unit"
+ATTR_VALUE: Final = "value"
+ATTR_ZONE: Final = "zone"
 ATTR_ZONES: Final = "zones"
 
 
 CONF_ACCOUNTS: Final = "accounts"
+CONF_BURST: Final = "burst"
 CONF_DEV_PRESENTATION: Final = "dev_presentation"
+CONF_END_DAY: Final = "end_day"
 CONF_LAST_INVOICE: Final = "last_invoice"
 CONF_LAST_PAYMENT: Final = "last_payment"
 CONF_LOGOS: Final = "logos"
+CONF_MAX_BACKOFF: Final = "max_backoff"
+CONF_MAX_CONCURRENCY: Final = "max_concurrency"
 CONF_METERS: Final = "meters"
 CONF_NAME_FORMAT: Final = "name_format"
+CONF_RATE: Final = "rate"
+CONF_RATE_LIMIT: Final = "rate_limit"
+CONF_START_DAY: Final = "start_day"
+CONF_SUBMIT_PERIOD: Final = "submit_period"
+CONF_TARIFFS: Final = "tariffs"
 CONF_USER_AGENT: Final = "user_agent"
 
 DATA_API_OBJECTS: Final = DOMAIN + "_api_objects"
+DATA_BACKFILL_JOBS: Final = DOMAIN + "_backfill_jobs"
+DATA_CONNECTORS: Final = DOMAIN + "_connectors"
+DATA_COORDINATORS: Final = DOMAIN + "_coordinators"
 DATA_ENTITIES: Final = DOMAIN + "_entities"
 DATA_FINAL_CONFIG: Final = DOMAIN + "_final_config"
+DATA_HISTORY_STORE: Final = DOMAIN + "_history_store"
 DATA_PROVIDER_LOGOS: Final = DOMAIN + "_provider_logos"
+DATA_RATE_LIMITERS: Final = DOMAIN + "_rate_limiters"
+DATA_STATISTICS_IMPORTS: Final = DOMAIN + "_statistics_imports"
+DATA_SUBMISSION_QUEUES: Final = DOMAIN + "_submission_queues"
 DATA_UPDATE_DELEGATORS: Final = DOMAIN + "_update_delegators"
 DATA_UPDATE_LISTENERS: Final = DOMAIN + "_update_listeners"
 DATA_YAML_CONFIG: Final = DOMAIN + "_yaml_config"
@@ -106,6 +139,13 @@ DEFAULT_NAME_FORMAT_RU_LAST_PAYMENT: Final = "{account_code} {type_ru_cap}"
 
 DEFAULT_MAX_INDICATIONS: Final = 3
 DEFAULT_SCAN_INTERVAL: Final = 60 * 60  # 1 hour
+DEFAULT_MAX_BACKOFF: Final = 30 * 60  # 30 minutes
+DEFAULT_MAX_CONCURRENCY: Final = 4
+DEFAULT_PAGE_SIZE: Final = 100  # results per history service event
+DEFAULT_RATE_LIMIT_BURST: Final = 10
+DEFAULT_RATE_LIMIT_RATE: Final = 2.0  # requests per second
+DEFAULT_SUBMIT_PERIOD_START_DAY: Final = 15
+DEFAULT_SUBMIT_PERIOD_END_DAY: Final = 25
 
 
 SUPPORTED_PLATFORMS: Final = ("sensor",)
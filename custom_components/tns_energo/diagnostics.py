@@ -0,0 +1,76 @@
+"""TNS Energo integration diagnostics"""
+
+__all__ = ("async_get_config_entry_diagnostics",)
+
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.typing import HomeAssistantType
+
+from custom_components.tns_energo._util import (
+    PRIORITY_NAMES,
+    get_auth_state,
+    get_circuit_breaker,
+    get_rate_limiter,
+    get_single_flight,
+)
+from custom_components.tns_energo.const import DATA_COORDINATORS
+
+if TYPE_CHECKING:
+    from custom_components.tns_energo._coordinator import TNSEnergoCoordinator
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistantType, config_entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Request scheduling metrics of a loaded config entry (no credentials or account data)"""
+    coordinator: Optional["TNSEnergoCoordinator"] = hass.data.get(DATA_COORDINATORS, {}).get(
+        config_entry.entry_id
+    )
+    if coordinator is None:
+        return {}
+
+    api = coordinator.api
+    single_flight = get_single_flight(api)
+    circuit_breaker = get_circuit_breaker(api)
+    rate_limiter = get_rate_limiter(api)
+
+    diagnostics = {
+        "coordinator": {
+            "accounts": len(coordinator.accounts),
+            "auth_failed": coordinator.auth_failed,
+            "last_cycle_duration": coordinator.last_cycle_duration,
+            "last_cycle_jobs": coordinator.last_cycle_jobs,
+            "suppressed_writes": coordinator.suppressed_writes,
+        },
+        "session_lifetime": get_auth_state(api).session_lifetime,
+        "single_flight": {
+            "hits": single_flight.hits,
+            "misses": single_flight.misses,
+            "in_flight": single_flight.in_flight,
+        },
+        "circuit_breaker": {
+            "state": circuit_breaker.state,
+            "failures": circuit_breaker.failures,
+            "rejected": circuit_breaker.rejected,
+        },
+        "rate_limiter": None,
+    }
+
+    if rate_limiter is not None:
+        # Queueing latency per priority class (see `request_priority`)
+        diagnostics["rate_limiter"] = {
+            "rate": rate_limiter.rate,
+            "burst": rate_limiter.burst,
+            "queue_depth": rate_limiter.queue_depth,
+            "latency": {
+                PRIORITY_NAMES[priority]: {
+                    "count": stats.count,
+                    "average_wait": stats.average_wait,
+                    "max_wait": stats.max_wait,
+                }
+                for priority, stats in rate_limiter.latency.items()
+            },
+        }
+
+    return diagnostics
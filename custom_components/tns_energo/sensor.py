@@ -5,7 +5,8 @@ Retrieves indications regarding current state of accounts.
 import logging
 import re
 from abc import ABC
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from operator import attrgetter
 from typing import (
     Any,
     Callable,
@@ -16,6 +17,7 @@ from typing import (
     List,
     Mapping,
     Optional,
+    Tuple,
     Type,
     TypeVar,
     Union,
@@ -24,31 +26,53 @@ from typing import (
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
 from homeassistant.components.sensor import SensorEntity
-from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     ATTR_ENTITY_ID,
     STATE_OK,
     STATE_UNKNOWN,
 )
 from homeassistant.helpers.typing import ConfigType, StateType
+from homeassistant.util import dt as dt_util
 
 from custom_components.tns_energo._base import (
     SupportedServicesType,
     TNSEnergoEntity,
     make_common_async_setup_entry,
 )
+from custom_components.tns_energo._consumption import (
+    CONSUMPTION_PERIODS,
+    PERIOD_MONTH,
+    async_derive_consumption,
+)
+from custom_components.tns_energo._coordinator import TNSEnergoCoordinator
 from custom_components.tns_energo._encoders import (
     account_to_attrs,
     indication_to_attrs,
     meter_to_attrs,
     payment_to_attrs,
 )
-from custom_components.tns_energo._util import with_auto_auth
+from custom_components.tns_energo._history import (
+    async_get_history_store,
+    async_sync_indications,
+    async_sync_payments,
+)
+from custom_components.tns_energo._queue import SubmissionQueue
+from custom_components.tns_energo._statistics import async_schedule_statistics_import
+from custom_components.tns_energo._tariffs import calculate_charges, get_tariffs
+from custom_components.tns_energo._util import (
+    PRIORITY_INTERACTIVE,
+    async_fire_paged,
+    get_submit_period,
+    request_priority,
+    with_auto_auth,
+)
+from custom_components.tns_energo._validation import IndicationsValidationError, check_indications
 from custom_components.tns_energo.const import (
     ATTR_ACCOUNT_CODE,
     ATTR_ADDRESS,
     ATTR_AMOUNT,
     ATTR_COMMENT,
+    ATTR_CONSUMPTION,
     ATTR_END,
     ATTR_FULL_NAME,
     ATTR_IGNORE_INDICATIONS,
@@ -58,16 +82,30 @@ from custom_components.tns_energo.const import (
     ATTR_LIVING_AREA,
     ATTR_METER_CODE,
     ATTR_METER_MODEL,
+    ATTR_PAGE_SIZE,
     ATTR_PAID_AT,
+    ATTR_PERIOD,
+    ATTR_QUEUED_AT,
+    ATTR_QUEUED_INDICATIONS,
+    ATTR_REASONS,
     ATTR_RESULT,
     ATTR_SOURCE,
     ATTR_START,
+    ATTR_SUBMISSION_ID,
+    ATTR_SUBMIT_PERIOD_ACTIVE,
+    ATTR_SUBMIT_PERIOD_END,
+    ATTR_SUBMIT_PERIOD_START,
     ATTR_SUCCESS,
     ATTR_SUM,
     ATTR_TOTAL_AREA,
     CONF_ACCOUNTS,
+    CONF_END_DAY,
     CONF_LAST_PAYMENT,
     CONF_METERS,
+    CONF_START_DAY,
+    CONF_SUBMIT_PERIOD,
+    DATA_SUBMISSION_QUEUES,
+    DEFAULT_PAGE_SIZE,
     DOMAIN,
     FORMAT_VAR_ID,
     FORMAT_VAR_TYPE_EN,
@@ -92,18 +130,20 @@ INDICATIONS_SEQUENCE_SCHEMA = vol.All(
     lambda x: dict(map(lambda y: ("t" + str(y[0]), y[1]), enumerate(x, start=1))),
 )
 
+INDICATIONS_SCHEMA = vol.Any(
+    vol.All(
+        cv.string,
+        lambda x: list(map(str.strip, x.split(","))),
+        INDICATIONS_SEQUENCE_SCHEMA,
+    ),
+    INDICATIONS_MAPPING_SCHEMA,
+    INDICATIONS_SEQUENCE_SCHEMA,
+)
+
 CALCULATE_PUSH_INDICATIONS_SCHEMA = vol.All(
     cv.make_entity_service_schema(
         {
-            vol.Required(ATTR_INDICATIONS): vol.Any(
-                vol.All(
-                    cv.string,
-                    lambda x: list(map(str.strip, x.split(","))),
-                    INDICATIONS_SEQUENCE_SCHEMA,
-                ),
-                INDICATIONS_MAPPING_SCHEMA,
-                INDICATIONS_SEQUENCE_SCHEMA,
-            ),
+            vol.Required(ATTR_INDICATIONS): INDICATIONS_SCHEMA,
             vol.Optional(ATTR_IGNORE_INDICATIONS, default=False): cv.boolean,
             vol.Optional(ATTR_INCREMENTAL, default=False): cv.boolean,
             vol.Optional("notification"): lambda x: x,
@@ -118,14 +158,29 @@ SERVICE_PUSH_INDICATIONS_SCHEMA: Final = CALCULATE_PUSH_INDICATIONS_SCHEMA
 SERVICE_CALCULATE_INDICATIONS: Final = "calculate_indications"
 SERVICE_CALCULATE_INDICATIONS_SCHEMA: Final = CALCULATE_PUSH_INDICATIONS_SCHEMA
 
+SERVICE_QUEUE_INDICATIONS: Final = "queue_indications"
+SERVICE_QUEUE_INDICATIONS_SCHEMA: Final = CALCULATE_PUSH_INDICATIONS_SCHEMA
+
 _SERVICE_SCHEMA_BASE_DATED: Final = {
     vol.Optional(ATTR_START, default=None): vol.Any(vol.Equal(None), cv.datetime),
     vol.Optional(ATTR_END, default=None): vol.Any(vol.Equal(None), cv.datetime),
 }
 
+_SERVICE_SCHEMA_BASE_PAGED: Final = {
+    **_SERVICE_SCHEMA_BASE_DATED,
+    vol.Optional(ATTR_PAGE_SIZE, default=DEFAULT_PAGE_SIZE): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=1000)
+    ),
+}
+
 SERVICE_SET_DESCRIPTION: Final = "set_description"
 SERVICE_GET_PAYMENTS: Final = "get_payments"
 SERVICE_GET_INDICATIONS: Final = "get_indications"
+SERVICE_GET_CONSUMPTION: Final = "get_consumption"
+SERVICE_GET_CONSUMPTION_SCHEMA: Final = {
+    **_SERVICE_SCHEMA_BASE_DATED,
+    vol.Optional(ATTR_PERIOD, default=PERIOD_MONTH): vol.In(CONSUMPTION_PERIODS),
+}
 
 _TTNSEnergoEntity = TypeVar("_TTNSEnergoEntity", bound=TNSEnergoEntity)
 
@@ -144,6 +199,12 @@ def get_supported_features(from_services: SupportedServicesType, for_object: Any
 
 ATTR_METER_CODES: Final = "meter_codes"
 
+# Meters which are not expected to get new indications are refreshed this often
+METER_IDLE_REFRESH_INTERVAL: Final = timedelta(days=1)
+
+# Meters are refreshed on every scheduled update for this long after a submission
+METER_PUSH_BOOST_DURATION: Final = timedelta(hours=6)
+
 
 class TNSEnergoSensor(TNSEnergoEntity, SensorEntity, ABC):
     pass
@@ -160,7 +221,7 @@ class TNSEnergoAccount(TNSEnergoSensor):
 
     _supported_services: ClassVar[SupportedServicesType] = {
         None: {
-            SERVICE_GET_PAYMENTS: _SERVICE_SCHEMA_BASE_DATED,
+            SERVICE_GET_PAYMENTS: _SERVICE_SCHEMA_BASE_PAGED,
         },
     }
 
@@ -228,33 +289,25 @@ class TNSEnergoAccount(TNSEnergoSensor):
         cls,
         entities: Dict[Hashable, "TNSEnergoAccount"],
         account: "Account",
-        config_entry: ConfigEntry,
+        coordinator: "TNSEnergoCoordinator",
         account_config: ConfigType,
         async_add_entities: Callable[[List["TNSEnergoAccount"], bool], Any],
     ) -> None:
         entity_key = account.code
-        try:
-            entity = entities[entity_key]
-        except KeyError:
-            entity = cls(account, account_config)
+        if entity_key not in entities:
+            entity = cls(account, account_config, coordinator)
             entities[entity_key] = entity
 
             async_add_entities([entity], False)
-        else:
-            if entity.enabled:
-                entity.async_schedule_update_ha_state(force_refresh=True)
 
-    async def async_update_internal(self) -> None:
-        account = self._account
-        account_code = account.code
-        accounts = await account.api.async_get_accounts_list(account_code)
-
-        for account in accounts:
-            if account.code == account_code:
-                self._account = account
-                break
+    @classmethod
+    async def async_fetch_account_data(cls, account: "Account") -> "Account":
+        # Accounts list is refreshed by the coordinator itself
+        return account
 
-        self.register_supported_services(account)
+    def update_from_data(self, data: "Account") -> None:
+        self._account = data
+        self.register_supported_services(data)
 
     #################################################################################
     # Services callbacks
@@ -276,7 +329,7 @@ class TNSEnergoAccount(TNSEnergoSensor):
         dt_end: Optional["datetime"] = call_data[ATTR_END]
 
         dt_start, dt_end = process_start_end_arguments(dt_start, dt_end)
-        results = []
+        payments = []
 
         event_data = {
             ATTR_ENTITY_ID: self.entity_id,
@@ -284,22 +337,23 @@ class TNSEnergoAccount(TNSEnergoSensor):
             ATTR_SUCCESS: False,
             ATTR_START: dt_start.isoformat(),
             ATTR_END: dt_end.isoformat(),
-            ATTR_RESULT: results,
             ATTR_COMMENT: None,
             ATTR_SUM: 0.0,
         }
 
         try:
-            payments = await with_auto_auth(
-                account.api,
-                account.async_get_payments,
-                dt_start,
-                dt_end,
-            )
+            history_store = async_get_history_store(self.hass)
+
+            with request_priority(PRIORITY_INTERACTIVE):
+                await async_sync_payments(
+                    history_store,
+                    account,
+                    (self._coordinator.data.get(CONF_LAST_PAYMENT) or {}).get(account.code),
+                )
+
+            payments = await history_store.async_query_payments(account.code, dt_start, dt_end)
 
-            for payment in payments:
-                event_data[ATTR_SUM] += payment.amount
-                results.append(payment_to_attrs(payment))
+            event_data[ATTR_SUM] = sum(payment.amount for payment in payments)
 
         except BaseException as e:
             event_data[ATTR_COMMENT] = "Unknown error: %r" % e
@@ -309,10 +363,17 @@ class TNSEnergoAccount(TNSEnergoSensor):
             event_data[ATTR_SUCCESS] = True
 
         finally:
-            _LOGGER.debug(self.log_prefix + "Payments retrieval event: " + str(event_data))
-            self.hass.bus.async_fire(
-                event_type=DOMAIN + "_" + SERVICE_GET_PAYMENTS,
-                event_data=event_data,
+            _LOGGER.debug(
+                self.log_prefix + f"Payments retrieval events: {len(payments)} results, "
+                f"success: {event_data[ATTR_SUCCESS]}, comment: {event_data[ATTR_COMMENT]}"
+            )
+            await async_fire_paged(
+                self.hass,
+                DOMAIN + "_" + SERVICE_GET_PAYMENTS,
+                event_data,
+                payments,
+                payment_to_attrs,
+                call_data[ATTR_PAGE_SIZE],
             )
 
             _LOGGER.info(self.log_prefix + "Finish handling payments retrieval")
@@ -329,8 +390,10 @@ class TNSEnergoMeter(TNSEnergoSensor):
     _supported_services: ClassVar[SupportedServicesType] = {
         None: {
             SERVICE_PUSH_INDICATIONS: SERVICE_PUSH_INDICATIONS_SCHEMA,
-            SERVICE_CALCULATE_INDICATIONS: SERVICE_PUSH_INDICATIONS_SCHEMA,
-            SERVICE_GET_INDICATIONS: _SERVICE_SCHEMA_BASE_DATED,
+            SERVICE_CALCULATE_INDICATIONS: SERVICE_CALCULATE_INDICATIONS_SCHEMA,
+            SERVICE_QUEUE_INDICATIONS: SERVICE_QUEUE_INDICATIONS_SCHEMA,
+            SERVICE_GET_INDICATIONS: _SERVICE_SCHEMA_BASE_PAGED,
+            SERVICE_GET_CONSUMPTION: SERVICE_GET_CONSUMPTION_SCHEMA,
         },
     }
 
@@ -349,35 +412,63 @@ class TNSEnergoMeter(TNSEnergoSensor):
         cls,
         entities: Dict[Hashable, Optional[_TTNSEnergoEntity]],
         account: "Account",
-        config_entry: ConfigEntry,
+        coordinator: "TNSEnergoCoordinator",
         account_config: ConfigType,
         async_add_entities: Callable[[List[_TTNSEnergoEntity], bool], Any],
     ):
         new_meter_entities = []
-        meters = await account.async_get_meters()
+        meters = (coordinator.data.get(cls.config_key) or {}).get(account.code) or {}
 
         for meter_code, meter in meters.items():
             entity_key = (account.code, meter_code)
-            try:
-                entity = entities[entity_key]
-            except KeyError:
+            if entity_key not in entities:
                 entity = cls(
                     account,
                     account_config,
+                    coordinator,
                     meter=meter,
                 )
                 entities[entity_key] = entity
                 new_meter_entities.append(entity)
-            else:
-                if entity.enabled:
-                    entity.async_schedule_update_ha_state(force_refresh=True)
 
         if new_meter_entities:
             async_add_entities(new_meter_entities, False)
 
-    async def async_update_internal(self) -> None:
-        meters = await self._account.async_get_meters()
-        meter = meters.get(self._meter.code)
+    @classmethod
+    async def async_fetch_account_data(cls, account: "Account") -> Mapping[str, "Meter"]:
+        return await account.async_get_meters()
+
+    @staticmethod
+    def get_submit_period(coordinator: "TNSEnergoCoordinator") -> Tuple[date, date, bool]:
+        submit_period = coordinator.final_config[CONF_SUBMIT_PERIOD]
+        return get_submit_period(
+            dt_util.now().date(),
+            submit_period[CONF_START_DAY],
+            submit_period[CONF_END_DAY],
+        )
+
+    @classmethod
+    def is_refresh_due(cls, coordinator: "TNSEnergoCoordinator", account_code: str) -> bool:
+        if coordinator.is_boosted(cls.config_key, account_code):
+            return True
+
+        fetched_at = coordinator.get_fetched_at(cls.config_key, account_code)
+        if fetched_at is None or dt_util.utcnow() - fetched_at >= METER_IDLE_REFRESH_INTERVAL:
+            return True
+
+        period_start, _, period_active = cls.get_submit_period(coordinator)
+        if not period_active:
+            return False
+
+        # Poll often within submission period until every meter has current indications
+        meters = (coordinator.data.get(cls.config_key) or {}).get(account_code) or {}
+        return any(
+            meter.last_indications_date is None or meter.last_indications_date < period_start
+            for meter in meters.values()
+        )
+
+    def update_from_data(self, data: Mapping[str, "Meter"]) -> None:
+        meter = data.get(self._meter.code)
 
         if meter is None:
             self.hass.async_create_task(self.async_remove())
@@ -385,6 +476,8 @@ class TNSEnergoMeter(TNSEnergoSensor):
             self.register_supported_services(meter)
             self._meter = meter
 
+            async_schedule_statistics_import(self._coordinator, self._account, data)
+
     #################################################################################
     # Data-oriented implementation of inherent class
     #################################################################################
@@ -410,6 +503,16 @@ class TNSEnergoMeter(TNSEnergoSensor):
 
         attributes = meter_to_attrs(meter)
 
+        period_start, period_end, period_active = self.get_submit_period(self._coordinator)
+        attributes[ATTR_SUBMIT_PERIOD_START] = period_start.isoformat()
+        attributes[ATTR_SUBMIT_PERIOD_END] = period_end.isoformat()
+        attributes[ATTR_SUBMIT_PERIOD_ACTIVE] = period_active
+
+        submission = self._get_submission_queue().get_submission(self._account.code, meter.code)
+        attributes[ATTR_QUEUED_INDICATIONS] = (
+            None if submission is None else submission[ATTR_INDICATIONS]
+        )
+
         self._handle_dev_presentation(
             attributes,
             (),
@@ -439,9 +542,8 @@ class TNSEnergoMeter(TNSEnergoSensor):
         indications: Mapping[str, Union[int, float]] = call_data[ATTR_INDICATIONS]
         meter_zones = self._meter.zones
 
-        for zone_id, new_value in indications.items():
-            if zone_id not in meter_zones:
-                raise ValueError(f"meter zone {zone_id} does not exist")
+        # Only zones are checked here, as values may still change
+        check_indications(self._meter, indications, ignore_values=True)
 
         if call_data[ATTR_INCREMENTAL]:
             return {
@@ -451,6 +553,42 @@ class TNSEnergoMeter(TNSEnergoSensor):
 
         return indications
 
+    async def async_submit_indications(
+        self, indications: Mapping[str, Union[int, float]], ignore_values: bool = False
+    ) -> None:
+        """Submit indications to the portal and boost refreshing of the meter.
+
+        Indications are validated locally beforehand, so that the ones portal is
+        known to reject never cause a request (nor a reauthentication)."""
+        meter = self._meter
+
+        check_indications(meter, indications, ignore_values=ignore_values)
+
+        with request_priority(PRIORITY_INTERACTIVE):
+            await with_auto_auth(
+                meter.account.api,
+                meter.async_send_indications,
+                **indications,
+                ignore_values=ignore_values,
+            )
+
+        self._coordinator.async_boost(
+            self.config_key, self._account.code, METER_PUSH_BOOST_DURATION
+        )
+
+    async def async_push_indications(
+        self,
+        indications: Mapping[str, Union[int, float]],
+        incremental: bool = False,
+        ignore_values: bool = False,
+    ) -> Mapping[str, Union[int, float]]:
+        """Submit indications (optionally added to the last ones); returns submitted values"""
+        indications = self._get_real_indications(
+            {ATTR_INDICATIONS: indications, ATTR_INCREMENTAL: incremental}
+        )
+        await self.async_submit_indications(indications, ignore_values=ignore_values)
+        return indications
+
     async def async_service_push_indications(self, **call_data):
         """
         Push indications entity service.
@@ -472,6 +610,7 @@ class TNSEnergoMeter(TNSEnergoSensor):
             ATTR_SUCCESS: False,
             ATTR_INDICATIONS: None,
             ATTR_COMMENT: None,
+            ATTR_REASONS: None,
         }
 
         try:
@@ -479,10 +618,8 @@ class TNSEnergoMeter(TNSEnergoSensor):
 
             event_data[ATTR_INDICATIONS] = indications
 
-            await with_auto_auth(
-                meter.account.api,
-                meter.async_send_indications,
-                **indications,
+            await self.async_submit_indications(
+                indications,
                 ignore_values=call_data.get(ATTR_IGNORE_INDICATIONS, False),
             )
 
@@ -490,6 +627,12 @@ class TNSEnergoMeter(TNSEnergoSensor):
             event_data[ATTR_COMMENT] = "API error: %s" % e
             raise
 
+        except IndicationsValidationError as e:
+            event_data[ATTR_COMMENT] = "Invalid indications: %s" % e
+            event_data[ATTR_REASONS] = e.reasons
+            _LOGGER.warning(self.log_prefix + event_data[ATTR_COMMENT])
+            raise
+
         except BaseException as e:
             event_data[ATTR_COMMENT] = "Unknown error: %r" % e
             _LOGGER.error(event_data[ATTR_COMMENT])
@@ -498,7 +641,7 @@ class TNSEnergoMeter(TNSEnergoSensor):
         else:
             event_data[ATTR_COMMENT] = "Indications submitted successfully"
             event_data[ATTR_SUCCESS] = True
-            self.async_schedule_update_ha_state(force_refresh=True)
+            self.hass.async_create_task(self.updater_execute())
 
         finally:
             _LOGGER.debug(self.log_prefix + "Indications push event: " + str(event_data))
@@ -509,6 +652,127 @@ class TNSEnergoMeter(TNSEnergoSensor):
 
             _LOGGER.info(self.log_prefix + "End handling indications submission")
 
+    def _get_submission_queue(self) -> "SubmissionQueue":
+        return self.hass.data[DATA_SUBMISSION_QUEUES][self._coordinator.config_entry.entry_id]
+
+    async def async_service_queue_indications(self, **call_data):
+        """
+        Queue indications entity service.
+        Queued indications are delivered once submission period is active.
+        :param call_data: Parameters for service call
+        :return:
+        """
+        _LOGGER.info(self.log_prefix + "Begin handling indications queueing")
+
+        meter = self._meter
+
+        if meter is None:
+            raise Exception("Meter is unavailable")
+
+        event_data = {
+            ATTR_ENTITY_ID: self.entity_id,
+            ATTR_METER_CODE: meter.code,
+            ATTR_SUCCESS: False,
+            ATTR_INDICATIONS: None,
+            ATTR_SUBMISSION_ID: None,
+            ATTR_QUEUED_AT: None,
+            ATTR_COMMENT: None,
+            ATTR_REASONS: None,
+        }
+
+        try:
+            indications = self._get_real_indications(call_data)
+            ignore_indications = call_data.get(ATTR_IGNORE_INDICATIONS, False)
+
+            event_data[ATTR_INDICATIONS] = indications
+
+            # Reject indications which would never be accepted right away
+            check_indications(meter, indications, ignore_values=ignore_indications)
+
+            submission = await self._get_submission_queue().async_enqueue(
+                self._account.code, meter.code, indications, ignore_indications
+            )
+
+        except IndicationsValidationError as e:
+            event_data[ATTR_COMMENT] = "Invalid indications: %s" % e
+            event_data[ATTR_REASONS] = e.reasons
+            _LOGGER.warning(self.log_prefix + event_data[ATTR_COMMENT])
+            raise
+
+        except BaseException as e:
+            event_data[ATTR_COMMENT] = "Unknown error: %r" % e
+            _LOGGER.error(event_data[ATTR_COMMENT])
+            raise
+
+        else:
+            event_data[ATTR_SUBMISSION_ID] = submission[ATTR_SUBMISSION_ID]
+            event_data[ATTR_QUEUED_AT] = submission[ATTR_QUEUED_AT]
+            event_data[ATTR_COMMENT] = "Indications queued for submission"
+            event_data[ATTR_SUCCESS] = True
+            self.async_write_ha_state_if_changed()
+
+        finally:
+            _LOGGER.debug(self.log_prefix + "Indications queueing event: " + str(event_data))
+            self.hass.bus.async_fire(
+                event_type=DOMAIN + "_" + SERVICE_QUEUE_INDICATIONS,
+                event_data=event_data,
+            )
+
+            _LOGGER.info(self.log_prefix + "End handling indications queueing")
+
+    async def async_service_calculate_indications(self, **call_data):
+        """
+        Calculate charges for indications entity service.
+        Charges are calculated locally using configured tariffs.
+        :param call_data: Parameters for service call
+        :return:
+        """
+        _LOGGER.info(self.log_prefix + "Begin handling indications calculation")
+
+        meter = self._meter
+
+        if meter is None:
+            raise Exception("Meter is unavailable")
+
+        event_data = {
+            ATTR_ENTITY_ID: self.entity_id,
+            ATTR_METER_CODE: meter.code,
+            ATTR_SUCCESS: False,
+            ATTR_INDICATIONS: None,
+            ATTR_RESULT: None,
+            ATTR_COMMENT: None,
+        }
+
+        try:
+            indications = self._get_real_indications(call_data)
+
+            event_data[ATTR_INDICATIONS] = indications
+
+            event_data[ATTR_RESULT] = calculate_charges(
+                meter,
+                indications,
+                get_tariffs(self._coordinator, self._account.code),
+                ignore_indications=call_data.get(ATTR_IGNORE_INDICATIONS, False),
+            )
+
+        except BaseException as e:
+            event_data[ATTR_COMMENT] = "Error: %s" % e
+            _LOGGER.error(event_data[ATTR_COMMENT])
+            raise
+
+        else:
+            event_data[ATTR_COMMENT] = "Charges calculated successfully"
+            event_data[ATTR_SUCCESS] = True
+
+        finally:
+            _LOGGER.debug(self.log_prefix + "Indications calculation event: " + str(event_data))
+            self.hass.bus.async_fire(
+                event_type=DOMAIN + "_" + SERVICE_CALCULATE_INDICATIONS,
+                event_data=event_data,
+            )
+
+            _LOGGER.info(self.log_prefix + "End handling indications calculation")
+
     async def async_service_get_indications(self, **call_data):
         account = self._account
         meter = self._meter
@@ -519,7 +783,7 @@ class TNSEnergoMeter(TNSEnergoSensor):
         dt_end: Optional["datetime"] = call_data[ATTR_END]
 
         dt_start, dt_end = process_start_end_arguments(dt_start, dt_end)
-        results = []
+        indications = []
 
         event_data = {
             ATTR_ENTITY_ID: self.entity_id,
@@ -528,20 +792,98 @@ class TNSEnergoMeter(TNSEnergoSensor):
             ATTR_SUCCESS: False,
             ATTR_START: dt_start.isoformat(),
             ATTR_END: dt_end.isoformat(),
+            ATTR_COMMENT: None,
+        }
+
+        try:
+            history_store = async_get_history_store(self.hass)
+
+            with request_priority(PRIORITY_INTERACTIVE):
+                await async_sync_indications(
+                    history_store,
+                    account,
+                    meter.code,
+                    known_newest=meter.last_indications_date,
+                )
+
+            indications = await history_store.async_query_indications(
+                account.code,
+                meter.code,
+                dt_start.date(),
+                dt_end.date(),
+            )
+
+        except BaseException as e:
+            event_data[ATTR_COMMENT] = "Unknown error: %r" % e
+            _LOGGER.exception(event_data[ATTR_COMMENT])
+            raise
+        else:
+            event_data[ATTR_SUCCESS] = True
+
+        finally:
+            _LOGGER.debug(
+                self.log_prefix + f"Indications retrieval events: {len(indications)} results, "
+                f"success: {event_data[ATTR_SUCCESS]}, comment: {event_data[ATTR_COMMENT]}"
+            )
+            await async_fire_paged(
+                self.hass,
+                DOMAIN + "_" + SERVICE_GET_INDICATIONS,
+                event_data,
+                indications,
+                indication_to_attrs,
+                call_data[ATTR_PAGE_SIZE],
+            )
+
+            _LOGGER.info(self.log_prefix + "Finish handling indications retrieval")
+
+    async def async_service_get_consumption(self, **call_data):
+        account = self._account
+        meter = self._meter
+
+        _LOGGER.info(self.log_prefix + "Begin handling consumption retrieval")
+
+        dt_start: Optional["datetime"] = call_data[ATTR_START]
+        dt_end: Optional["datetime"] = call_data[ATTR_END]
+        period: str = call_data[ATTR_PERIOD]
+
+        dt_start, dt_end = process_start_end_arguments(dt_start, dt_end)
+        results = {}
+
+        event_data = {
+            ATTR_ENTITY_ID: self.entity_id,
+            ATTR_ACCOUNT_CODE: account.code,
+            ATTR_METER_CODE: meter.code,
+            ATTR_SUCCESS: False,
+            ATTR_START: dt_start.isoformat(),
+            ATTR_END: dt_end.isoformat(),
+            ATTR_PERIOD: period,
             ATTR_RESULT: results,
             ATTR_COMMENT: None,
         }
 
         try:
-            indications = await with_auto_auth(
-                account.api,
-                meter.async_get_indications,
-                dt_start,
-                dt_end,
+            with request_priority(PRIORITY_INTERACTIVE):
+                await async_sync_indications(
+                    async_get_history_store(self.hass),
+                    account,
+                    meter.code,
+                    known_newest=meter.last_indications_date,
+                )
+
+            consumption = await async_derive_consumption(
+                self.hass,
+                account.code,
+                meter.code,
+                {(account.code, meter.code): meter.transmission_coefficient},
             )
 
-            for indication in indications:
-                results.append(indication_to_attrs(indication))
+            for (_, _, zone_id), series in consumption.items():
+                results[zone_id] = [
+                    {ATTR_PERIOD: series_period, ATTR_CONSUMPTION: value}
+                    for series_period, value in series.to_list(
+                        period, dt_start.date(), dt_end.date()
+                    )
+                ]
 
         except BaseException as e:
             event_data[ATTR_COMMENT] = "Unknown error: %r" % e
@@ -551,18 +893,23 @@ class TNSEnergoMeter(TNSEnergoSensor):
             event_data[ATTR_SUCCESS] = True
 
         finally:
-            _LOGGER.debug(self.log_prefix + "Indications retrieval event: " + str(event_data))
+            _LOGGER.debug(self.log_prefix + "Consumption retrieval event: " + str(event_data))
             self.hass.bus.async_fire(
-                event_type=DOMAIN + "_" + SERVICE_GET_INDICATIONS,
+                event_type=DOMAIN + "_" + SERVICE_GET_CONSUMPTION,
                 event_data=event_data,
             )
 
-            _LOGGER.info(self.log_prefix + "Finish handling indications retrieval")
+            _LOGGER.info(self.log_prefix + "Finish handling consumption retrieval")
 
 
 class TNSEnergoLastPayment(TNSEnergoSensor):
     config_key: ClassVar[str] = CONF_LAST_PAYMENT
 
+    # New payments always show up as balance changes
+    refresh_depends_on: ClassVar[Mapping[str, Callable[[Any], Hashable]]] = {
+        CONF_ACCOUNTS: attrgetter("balance"),
+    }
+
     _attr_unit_of_measurement = "руб."
     _attr_icon = "mdi:cash-multiple"
     _attr_device_class = DOMAIN + "_payment"
@@ -581,25 +928,36 @@ class TNSEnergoLastPayment(TNSEnergoSensor):
         cls: Type[_TTNSEnergoEntity],
         entities: Dict[Hashable, _TTNSEnergoEntity],
         account: "Account",
-        config_entry: ConfigEntry,
+        coordinator: "TNSEnergoCoordinator",
         account_config: ConfigType,
         async_add_entities: Callable[[List[_TTNSEnergoEntity], bool], Any],
     ) -> None:
         entity_key = account.code
 
-        try:
-            entity = entities[entity_key]
-        except KeyError:
-            entity = cls(account, account_config)
+        if entity_key not in entities:
+            entity = cls(
+                account,
+                account_config,
+                coordinator,
+                last_payment=(coordinator.data.get(cls.config_key) or {}).get(account.code),
+            )
             entities[entity_key] = entity
-            async_add_entities([entity], True)
+            async_add_entities([entity], False)
 
-        else:
-            if entity.enabled:
-                await entity.async_update_ha_state(force_refresh=True)
+    @classmethod
+    async def async_fetch_account_data(cls, account: "Account") -> Optional[Payment]:
+        return await account.async_get_last_payment()
+
+    @classmethod
+    def is_refresh_due(cls, coordinator: "TNSEnergoCoordinator", account_code: str) -> bool:
+        # Otherwise refreshed only once account balance changes
+        return (
+            coordinator.get_fetched_at(cls.config_key, account_code) is None
+            or coordinator.get_stale_since(cls.config_key, account_code) is not None
+        )
 
-    async def async_update_internal(self) -> None:
-        self._last_payment = await self._account.async_get_last_payment()
+    def update_from_data(self, data: Optional[Payment]) -> None:
+        self._last_payment = data
 
     #################################################################################
     # Data-oriented implementation of inherent class
@@ -0,0 +1,144 @@
+import pytest
+
+from custom_components.tns_energo._util import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    CircuitBreaker,
+    CircuitOpenException,
+)
+from tns_energo_api.exceptions import RequestTimeoutException, ResponseResultException
+
+
+def _outage() -> RequestTimeoutException:
+    return RequestTimeoutException("timed out")
+
+
+def _make_open_breaker(**kwargs) -> CircuitBreaker:
+    circuit_breaker = CircuitBreaker(failure_threshold=2, open_interval=10.0, **kwargs)
+    for _ in range(2):
+        circuit_breaker.record_failure(circuit_breaker.before_call(), _outage())
+    return circuit_breaker
+
+
+def _elapse_open_interval(circuit_breaker: CircuitBreaker) -> None:
+    circuit_breaker.opened_at -= circuit_breaker.current_interval
+
+
+def test_stays_closed_below_threshold():
+    circuit_breaker = CircuitBreaker(failure_threshold=3)
+
+    for _ in range(2):
+        assert circuit_breaker.before_call() is False
+        circuit_breaker.record_failure(False, _outage())
+
+    assert circuit_breaker.state == CIRCUIT_CLOSED
+    assert circuit_breaker.failures == 2
+
+
+def test_success_resets_failure_count():
+    circuit_breaker = CircuitBreaker(failure_threshold=2)
+
+    circuit_breaker.record_failure(False, _outage())
+    circuit_breaker.record_success(False)
+    circuit_breaker.record_failure(False, _outage())
+
+    assert circuit_breaker.state == CIRCUIT_CLOSED
+    assert circuit_breaker.failures == 1
+
+
+def test_opens_at_threshold_and_rejects_calls():
+    circuit_breaker = _make_open_breaker()
+
+    assert circuit_breaker.state == CIRCUIT_OPEN
+    assert circuit_breaker.retry_at == circuit_breaker.opened_at + 10.0
+
+    for _ in range(3):
+        with pytest.raises(CircuitOpenException):
+            circuit_breaker.before_call()
+
+    assert circuit_breaker.rejected == 3
+
+
+def test_result_failures_do_not_open_circuit():
+    circuit_breaker = CircuitBreaker(failure_threshold=1)
+
+    circuit_breaker.record_failure(False, ResponseResultException("wrong password"))
+    circuit_breaker.record_failure(False, CircuitOpenException("rejected"))
+
+    assert circuit_breaker.state == CIRCUIT_CLOSED
+    assert circuit_breaker.failures == 0
+
+
+def test_half_open_lets_single_probe_through():
+    circuit_breaker = _make_open_breaker()
+    _elapse_open_interval(circuit_breaker)
+
+    assert circuit_breaker.before_call() is True
+    assert circuit_breaker.state == CIRCUIT_HALF_OPEN
+
+    with pytest.raises(CircuitOpenException):
+        circuit_breaker.before_call()
+
+
+def test_probe_success_closes_circuit():
+    circuit_breaker = _make_open_breaker()
+    _elapse_open_interval(circuit_breaker)
+
+    circuit_breaker.record_success(circuit_breaker.before_call())
+
+    assert circuit_breaker.state == CIRCUIT_CLOSED
+    assert circuit_breaker.failures == 0
+    assert circuit_breaker.rejected == 0
+    assert circuit_breaker.retry_at is None
+    assert circuit_breaker.current_interval == 10.0
+    assert circuit_breaker.before_call() is False
+
+
+def test_probe_result_failure_closes_circuit():
+    circuit_breaker = _make_open_breaker()
+    _elapse_open_interval(circuit_breaker)
+
+    # Portal answering at all means it is reachable again
+    circuit_breaker.record_failure(
+        circuit_breaker.before_call(), ResponseResultException("no data")
+    )
+
+    assert circuit_breaker.state == CIRCUIT_CLOSED
+
+
+def test_probe_failure_doubles_open_interval_up_to_max():
+    circuit_breaker = _make_open_breaker(max_open_interval=25.0)
+
+    expected_intervals = (20.0, 25.0, 25.0)
+    for expected_interval in expected_intervals:
+        _elapse_open_interval(circuit_breaker)
+        circuit_breaker.record_failure(circuit_breaker.before_call(), _outage())
+
+        assert circuit_breaker.state == CIRCUIT_OPEN
+        assert circuit_breaker.current_interval == expected_interval
+
+        with pytest.raises(CircuitOpenException):
+            circuit_breaker.before_call()
+
+
+def test_failure_of_call_sent_before_opening_is_ignored():
+    circuit_breaker = _make_open_breaker()
+    opened_at = circuit_breaker.opened_at
+
+    circuit_breaker.record_failure(False, _outage())
+
+    assert circuit_breaker.state == CIRCUIT_OPEN
+    assert circuit_breaker.opened_at == opened_at
+    assert circuit_breaker.current_interval == 10.0
+
+
+def test_released_probe_lets_another_call_probe():
+    circuit_breaker = _make_open_breaker()
+    _elapse_open_interval(circuit_breaker)
+
+    is_probe = circuit_breaker.before_call()
+    circuit_breaker.release_probe(is_probe)
+
+    assert circuit_breaker.state == CIRCUIT_HALF_OPEN
+    assert circuit_breaker.before_call() is True
@@ -0,0 +1,143 @@
+from datetime import date
+
+import numpy as np
+
+from custom_components.tns_energo._consumption import PERIOD_DAY, derive_consumption
+
+KEY = ("580000000000", "M1", "t1")
+OTHER_KEY = ("580000000000", "M1", "t2")
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _day(year: int, month: int, day: int) -> int:
+    return date(year, month, day).toordinal() - _EPOCH
+
+
+def test_spreads_delta_evenly_over_days_after_earlier_reading():
+    rows = [(0, 0, _day(2021, 1, 1), 100.0), (0, 0, _day(2021, 1, 4), 130.0)]
+
+    series = derive_consumption([KEY], rows)[KEY]
+
+    assert series.to_list(PERIOD_DAY) == [
+        ("2021-01-02", 10.0),
+        ("2021-01-03", 10.0),
+        ("2021-01-04", 10.0),
+    ]
+    assert series.to_list() == [("2021-01", 30.0)]
+
+
+def test_splits_interval_across_months():
+    rows = [(0, 0, _day(2021, 1, 30), 100.0), (0, 0, _day(2021, 2, 3), 140.0)]
+
+    series = derive_consumption([KEY], rows)[KEY]
+
+    assert series.to_list() == [("2021-01", 10.0), ("2021-02", 30.0)]
+
+
+def test_unordered_rows_are_sorted():
+    rows = [(0, 0, _day(2021, 1, 3), 120.0), (0, 0, _day(2021, 1, 1), 100.0)]
+
+    series = derive_consumption([KEY], rows)[KEY]
+
+    assert series.to_list(PERIOD_DAY) == [("2021-01-02", 10.0), ("2021-01-03", 10.0)]
+
+
+def test_decreasing_reading_is_a_gap():
+    rows = [
+        (0, 0, _day(2021, 1, 1), 100.0),
+        (0, 0, _day(2021, 1, 2), 110.0),
+        (0, 0, _day(2021, 1, 5), 5.0),  # Reset
+        (0, 0, _day(2021, 1, 6), 8.0),
+    ]
+
+    series = derive_consumption([KEY], rows)[KEY]
+
+    assert series.to_list(PERIOD_DAY) == [("2021-01-02", 10.0), ("2021-01-06", 3.0)]
+    assert series.to_list() == [("2021-01", 13.0)]
+
+
+def test_missing_reading_is_a_gap():
+    rows = [
+        (0, 0, _day(2021, 1, 1), 100.0),
+        (0, 0, _day(2021, 1, 2), None),
+        (0, 0, _day(2021, 1, 3), 130.0),
+        (0, 0, _day(2021, 1, 4), 135.0),
+    ]
+
+    series = derive_consumption([KEY], rows)[KEY]
+
+    assert series.to_list(PERIOD_DAY) == [("2021-01-04", 5.0)]
+
+
+def test_meter_replacement_is_a_gap():
+    rows = [
+        (0, 0, _day(2021, 1, 1), 9000.0),
+        (0, 0, _day(2021, 1, 2), 9010.0),
+        # New meter installed with its own readings, which may even be greater
+        (0, 1, _day(2021, 1, 4), 9500.0),
+        (0, 1, _day(2021, 1, 5), 9507.0),
+    ]
+
+    series = derive_consumption([KEY], rows)[KEY]
+
+    assert series.to_list(PERIOD_DAY) == [("2021-01-02", 10.0), ("2021-01-05", 7.0)]
+
+
+def test_same_day_readings_are_skipped():
+    rows = [(0, 0, _day(2021, 1, 1), 100.0), (0, 0, _day(2021, 1, 1), 100.0)]
+
+    series = derive_consumption([KEY], rows)[KEY]
+
+    assert series.to_list(PERIOD_DAY) == []
+
+
+def test_transmission_coefficient_scales_deltas():
+    rows = [(0, 0, _day(2021, 1, 1), 100.0), (0, 0, _day(2021, 1, 3), 104.0)]
+
+    series = derive_consumption([KEY], rows, {("580000000000", "M1"): 40.0})[KEY]
+
+    assert series.to_list(PERIOD_DAY) == [("2021-01-02", 80.0), ("2021-01-03", 80.0)]
+
+
+def test_missing_or_zero_coefficient_is_ignored():
+    rows = [(0, 0, _day(2021, 1, 1), 100.0), (0, 0, _day(2021, 1, 2), 101.0)]
+
+    assert derive_consumption([KEY], rows, {("580000000000", "M1"): 0.0})[KEY].to_list() == [
+        ("2021-01", 1.0)
+    ]
+    assert derive_consumption([KEY], rows, {("other", "M1"): 2.0})[KEY].to_list() == [
+        ("2021-01", 1.0)
+    ]
+
+
+def test_series_are_not_mixed():
+    rows = [
+        (0, 0, _day(2021, 1, 1), 100.0),
+        (1, 0, _day(2021, 1, 2), 10.0),
+        (0, 0, _day(2021, 1, 2), 103.0),
+        (1, 0, _day(2021, 1, 3), 11.0),
+    ]
+
+    result = derive_consumption([KEY, OTHER_KEY], rows)
+
+    assert result[KEY].to_list(PERIOD_DAY) == [("2021-01-02", 3.0)]
+    assert result[OTHER_KEY].to_list(PERIOD_DAY) == [("2021-01-03", 1.0)]
+
+
+def test_bounds_filter_periods():
+    rows = [(0, 0, _day(2021, 1, 31), 0.0), (0, 0, _day(2021, 3, 31), 59.0)]
+
+    series = derive_consumption([KEY], rows)[KEY]
+
+    assert series.to_list(start=date(2021, 2, 1), end=date(2021, 2, 28)) == [("2021-02", 28.0)]
+    assert len(series.to_list(PERIOD_DAY, start=date(2021, 3, 1))) == 31
+
+
+def test_no_rows():
+    result = derive_consumption([KEY, OTHER_KEY], [])
+
+    assert set(result) == {KEY, OTHER_KEY}
+    for series in result.values():
+        assert len(series.days) == 0 and len(series.months) == 0
+        assert series.daily.dtype == np.float64
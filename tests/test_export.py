@@ -0,0 +1,60 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.tns_energo._export import EXPORT_DIRECTORY, _resolve_path
+
+
+def _make_hass(config_dir: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        config=SimpleNamespace(path=lambda *parts: os.path.join(config_dir, *parts))
+    )
+
+
+def test_default_path_is_within_export_directory(tmp_path):
+    path = _resolve_path(_make_hass(str(tmp_path)), None, "indications", "csv")
+
+    assert os.path.dirname(path) == str(tmp_path / EXPORT_DIRECTORY)
+    assert path.endswith(".csv")
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "../configuration.yaml",
+        "../secrets.csv",
+        "../.storage/core.config_entries.csv",
+        "/etc/passwd.csv",
+        ".",
+    ],
+)
+def test_paths_outside_export_directory_are_rejected(tmp_path, path):
+    with pytest.raises(ValueError):
+        _resolve_path(_make_hass(str(tmp_path)), path, "indications", "csv")
+
+
+def test_extension_must_match_format(tmp_path):
+    hass = _make_hass(str(tmp_path))
+
+    with pytest.raises(ValueError):
+        _resolve_path(hass, "history.yaml", "indications", "csv")
+    with pytest.raises(ValueError):
+        _resolve_path(hass, "history.csv", "indications", "parquet")
+
+    assert _resolve_path(hass, "nested/history.parquet", "payments", "parquet") == str(
+        tmp_path / EXPORT_DIRECTORY / "nested" / "history.parquet"
+    )
+
+
+def test_existing_file_is_replaced_only_when_allowed(tmp_path):
+    hass = _make_hass(str(tmp_path))
+    (tmp_path / EXPORT_DIRECTORY).mkdir()
+    (tmp_path / EXPORT_DIRECTORY / "history.csv").write_text("")
+
+    with pytest.raises(ValueError):
+        _resolve_path(hass, "history.csv", "indications", "csv")
+
+    assert _resolve_path(hass, "history.csv", "indications", "csv", overwrite=True) == str(
+        tmp_path / EXPORT_DIRECTORY / "history.csv"
+    )
@@ -0,0 +1,104 @@
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Any, List, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.tns_energo import _history
+from custom_components.tns_energo._history import (
+    HistoryStore,
+    async_sync_indications,
+    async_sync_payments,
+)
+from tns_energo_api import Indication, Payment
+
+ACCOUNT_CODE = "580000000000"
+
+
+class _FakeAccount:
+    """Account serving portal history, recording start of every request"""
+
+    def __init__(self, indications: List[Indication], payments: List[Payment]) -> None:
+        self.code = ACCOUNT_CODE
+        self.api = None
+        self.indications = indications
+        self.payments = payments
+        self.requests: List[Optional[datetime]] = []
+
+    async def async_get_indications(self, start=None, end=None, meter_code=None):
+        self.requests.append(start)
+        return [
+            indication
+            for indication in self.indications
+            if start is None or indication.taken_on >= start.date()
+        ]
+
+    async def async_get_payments(self, start=None, end=None):
+        self.requests.append(start)
+        return [payment for payment in self.payments if start is None or payment.paid_at >= start]
+
+
+def _make_indication(taken_on: date, value: float) -> Indication:
+    return Indication(
+        meter_identifier="1",
+        taken_on=taken_on,
+        meter_code="M1",
+        status=0,
+        zones={"t1": value},
+    )
+
+
+def _sync_twice(tmp_path, monkeypatch, account: _FakeAccount, sync) -> List[Any]:
+    async def _with_auto_auth(api, method, *args, **kwargs):
+        return await method(*args, **kwargs)
+
+    monkeypatch.setattr(_history, "with_auto_auth", _with_auto_auth)
+
+    async def _run() -> List[Any]:
+        hass = HomeAssistant()
+        history_store = HistoryStore(hass, str(tmp_path / "history.db"))
+        try:
+            return [await sync(history_store, account) for _ in range(2)]
+        finally:
+            await history_store.async_close()
+            await hass.async_stop(force=True)
+
+    return asyncio.run(_run())
+
+
+def test_indications_are_fetched_since_newest_synchronized_date(tmp_path, monkeypatch):
+    account = _FakeAccount(
+        [_make_indication(date(2021, 1, 20), 100), _make_indication(date(2021, 2, 20), 200)], []
+    )
+
+    assert _sync_twice(tmp_path, monkeypatch, account, async_sync_indications) == [2, 1]
+    assert account.requests == [None, datetime(2021, 2, 20)]
+
+
+def test_empty_indications_history_is_not_fetched_completely_again(tmp_path, monkeypatch):
+    account = _FakeAccount([], [])
+
+    assert _sync_twice(tmp_path, monkeypatch, account, async_sync_indications) == [0, 0]
+    assert account.requests[0] is None
+    assert account.requests[1] == datetime.fromordinal(
+        (dt_util.now().date() - timedelta(days=1)).toordinal()
+    )
+
+
+def test_payments_are_fetched_since_newest_synchronized_payment(tmp_path, monkeypatch):
+    paid_at = datetime(2021, 1, 20, 10, 30)
+    account = _FakeAccount(
+        [], [Payment(transaction_id="1", paid_at=paid_at, source="bank", amount=100.0)]
+    )
+
+    assert _sync_twice(tmp_path, monkeypatch, account, async_sync_payments) == [1, 0]
+    assert account.requests == [None, paid_at]
+
+
+def test_empty_payments_history_is_not_fetched_completely_again(tmp_path, monkeypatch):
+    account = _FakeAccount([], [])
+
+    assert _sync_twice(tmp_path, monkeypatch, account, async_sync_payments) == [0, 0]
+    assert account.requests[0] is None
+    assert account.requests[1] == datetime.fromordinal(dt_util.now().date().toordinal())
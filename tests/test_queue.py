@@ -0,0 +1,178 @@
+import asyncio
+from datetime import date
+from types import MappingProxyType, SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.tns_energo import _queue
+from custom_components.tns_energo._queue import (
+    ATTR_NEXT_ATTEMPT_AT,
+    ATTR_UNCONFIRMED,
+    EVENT_QUEUED_INDICATIONS,
+    STATUS_ALREADY_SUBMITTED,
+    STATUS_DELIVERED,
+    SubmissionQueue,
+)
+from custom_components.tns_energo.const import (
+    ATTR_ATTEMPTS,
+    ATTR_STATUS,
+    CONF_END_DAY,
+    CONF_METERS,
+    CONF_START_DAY,
+    CONF_SUBMIT_PERIOD,
+)
+from tns_energo_api import Meter, MeterZone
+from tns_energo_api.exceptions import RequestTimeoutException
+
+ACCOUNT_CODE = "580000000000"
+
+
+def _make_meter(last_indication: int) -> Meter:
+    return Meter(
+        account=SimpleNamespace(api=None),
+        code="M1",
+        can_delete=False,
+        checkup_date=date(2030, 1, 1),
+        checkup_status=0,
+        checkup_url=None,
+        last_checkup_date=None,
+        manufactured_date=None,
+        identifier="1",
+        transmission_coefficient=1.0,
+        last_indications_date=date(2021, 1, 20),
+        install_location="",
+        model="",
+        precision=0,
+        status=None,
+        service_name="",
+        service_number="",
+        tariff_count=1,
+        type=1,
+        zones=MappingProxyType(
+            {
+                "t1": MeterZone(
+                    identifier="1",
+                    index=0,
+                    name="T1",
+                    last_indication=last_indication,
+                    max_indication_difference=None,
+                    closing_indication=None,
+                    label="t1",
+                )
+            }
+        ),
+    )
+
+
+class _FakeCoordinator:
+    """Coordinator serving meters data as currently known to the portal"""
+
+    def __init__(self, hass: HomeAssistant, meter: Meter) -> None:
+        self.hass = hass
+        self.config_entry = SimpleNamespace(entry_id="test")
+        self.final_config = {CONF_SUBMIT_PERIOD: {CONF_START_DAY: 1, CONF_END_DAY: 31}}
+        self.log_prefix = ""
+        self.accounts = {ACCOUNT_CODE: None}
+        self.data = {CONF_METERS: {ACCOUNT_CODE: {meter.code: meter}}}
+        self.fetched_at: Dict[str, Any] = {}
+        self.portal_meter = meter
+        self.portal_reachable = True
+        self.refreshes = 0
+
+    def get_fetched_at(self, config_key: str, account_code: str):
+        return self.fetched_at.get((config_key, account_code))
+
+    async def async_refresh(self, config_key: str, account_codes=None) -> None:
+        self.refreshes += 1
+        if self.portal_reachable:
+            self.data[CONF_METERS][ACCOUNT_CODE] = {self.portal_meter.code: self.portal_meter}
+            self.fetched_at[(config_key, ACCOUNT_CODE)] = dt_util.utcnow()
+
+    def async_notify_listeners(self, config_key: str) -> None:
+        pass
+
+    def async_boost(self, *args) -> None:
+        pass
+
+    def async_create_background_task(self, target):
+        return self.hass.async_create_task(target)
+
+
+def _patch_portal(monkeypatch, errors: List[Exception]) -> List[Dict[str, Any]]:
+    sent = []
+
+    async def _with_auto_auth(api, method, *args, **kwargs):
+        sent.append(kwargs)
+        if errors:
+            raise errors.pop(0)
+
+    monkeypatch.setattr(_queue, "with_auto_auth", _with_auto_auth)
+    monkeypatch.setattr(_queue, "QUEUE_SUBMISSION_DELAY", 0)
+    return sent
+
+
+async def _async_run_twice(
+    tmp_path, coordinator_setup
+) -> Tuple[SubmissionQueue, _FakeCoordinator, List[str]]:
+    hass = HomeAssistant()
+    hass.config.config_dir = str(tmp_path)
+    statuses = []
+    hass.bus.async_listen(EVENT_QUEUED_INDICATIONS, lambda event: statuses.append(event.data))
+
+    coordinator = _FakeCoordinator(hass, _make_meter(100))
+    coordinator_setup(coordinator)
+    queue = SubmissionQueue(coordinator)
+    queue._ensure_running = lambda: None
+
+    submission = await queue.async_enqueue(ACCOUNT_CODE, "M1", {"t1": 150})
+    await queue._async_process()
+
+    # Retry right away
+    submission[ATTR_NEXT_ATTEMPT_AT] = None
+    await queue._async_process()
+
+    await hass.async_block_till_done()
+    await hass.async_stop(force=True)
+    return queue, coordinator, [data[ATTR_STATUS] for data in statuses]
+
+
+def test_timed_out_submission_accepted_by_portal_is_not_sent_again(tmp_path, monkeypatch):
+    sent = _patch_portal(monkeypatch, [RequestTimeoutException("timed out")])
+
+    def _setup(coordinator: _FakeCoordinator) -> None:
+        # Portal accepted indications, but the response got lost
+        coordinator.portal_meter = _make_meter(150)
+
+    queue, coordinator, statuses = asyncio.run(_async_run_twice(tmp_path, _setup))
+
+    assert len(sent) == 1
+    assert coordinator.refreshes == 1
+    assert statuses == [STATUS_ALREADY_SUBMITTED]
+    assert queue.get_submission(ACCOUNT_CODE, "M1") is None
+
+
+def test_timed_out_submission_is_retried_once_meters_are_refreshed(tmp_path, monkeypatch):
+    sent = _patch_portal(monkeypatch, [RequestTimeoutException("timed out")])
+
+    queue, coordinator, statuses = asyncio.run(_async_run_twice(tmp_path, lambda _: None))
+
+    assert len(sent) == 2
+    assert coordinator.refreshes >= 1
+    assert statuses == [STATUS_DELIVERED]
+
+
+def test_timed_out_submission_is_not_retried_while_meters_are_unavailable(tmp_path, monkeypatch):
+    sent = _patch_portal(monkeypatch, [RequestTimeoutException("timed out")])
+
+    def _setup(coordinator: _FakeCoordinator) -> None:
+        coordinator.portal_reachable = False
+
+    queue, coordinator, statuses = asyncio.run(_async_run_twice(tmp_path, _setup))
+
+    assert len(sent) == 1
+    assert statuses == []
+    submission = queue.get_submission(ACCOUNT_CODE, "M1")
+    assert submission[ATTR_ATTEMPTS] == 2
+    assert submission[ATTR_UNCONFIRMED] is True
@@ -0,0 +1,159 @@
+import asyncio
+from datetime import date, timedelta
+from typing import List, Tuple
+
+from custom_components.tns_energo._range_cache import RangeCache
+
+SOURCE = [date(2021, 1, 1) + timedelta(days=i) for i in range(365)]
+
+
+class Fetcher:
+    def __init__(self) -> None:
+        self.calls: List[Tuple[date, date]] = []
+
+    async def __call__(self, start: date, end: date) -> List[date]:
+        self.calls.append((start, end))
+        return [item for item in SOURCE if start <= item <= end]
+
+
+def _make_cache(max_items: int = 1000) -> RangeCache[date]:
+    return RangeCache(lambda item: item, timedelta(days=1), max_items)
+
+
+def _covered(cache: RangeCache, key) -> List[Tuple[date, date]]:
+    return [(interval.start, interval.end) for interval in cache._entries[key]]
+
+
+def test_repeated_request_is_served_from_memory():
+    cache, fetch = _make_cache(), Fetcher()
+
+    async def _run():
+        first = await cache.async_get("a", date(2021, 1, 10), date(2021, 1, 20), fetch)
+        second = await cache.async_get("a", date(2021, 1, 12), date(2021, 1, 15), fetch)
+        return first, second
+
+    first, second = asyncio.run(_run())
+
+    assert first == SOURCE[9:20]
+    assert second == SOURCE[11:15]
+    assert fetch.calls == [(date(2021, 1, 10), date(2021, 1, 20))]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_overlapping_request_fetches_uncovered_gaps_only():
+    cache, fetch = _make_cache(), Fetcher()
+
+    async def _run():
+        await cache.async_get("a", date(2021, 1, 10), date(2021, 1, 20), fetch)
+        await cache.async_get("a", date(2021, 2, 1), date(2021, 2, 10), fetch)
+        return await cache.async_get("a", date(2021, 1, 5), date(2021, 2, 15), fetch)
+
+    result = asyncio.run(_run())
+
+    assert result == SOURCE[4:46]
+    assert fetch.calls[2:] == [
+        (date(2021, 1, 5), date(2021, 1, 9)),
+        (date(2021, 1, 21), date(2021, 1, 31)),
+        (date(2021, 2, 11), date(2021, 2, 15)),
+    ]
+    assert _covered(cache, "a") == [(date(2021, 1, 5), date(2021, 2, 15))]
+    assert cache.size == 42
+
+
+def test_adjacent_intervals_are_merged():
+    cache, fetch = _make_cache(), Fetcher()
+
+    async def _run():
+        await cache.async_get("a", date(2021, 1, 1), date(2021, 1, 10), fetch)
+        await cache.async_get("a", date(2021, 1, 20), date(2021, 1, 31), fetch)
+        assert len(_covered(cache, "a")) == 2
+        await cache.async_get("a", date(2021, 1, 11), date(2021, 1, 19), fetch)
+        return await cache.async_get("a", date(2021, 1, 1), date(2021, 1, 31), fetch)
+
+    result = asyncio.run(_run())
+
+    assert result == SOURCE[:31]
+    assert _covered(cache, "a") == [(date(2021, 1, 1), date(2021, 1, 31))]
+    assert len(fetch.calls) == 3
+
+
+def test_keys_are_cached_separately():
+    cache, fetch = _make_cache(), Fetcher()
+
+    async def _run():
+        await cache.async_get("a", date(2021, 1, 1), date(2021, 1, 10), fetch)
+        await cache.async_get("b", date(2021, 1, 1), date(2021, 1, 10), fetch)
+
+    asyncio.run(_run())
+
+    assert len(fetch.calls) == 2
+
+
+def test_least_recently_used_keys_are_evicted():
+    cache, fetch = _make_cache(max_items=25), Fetcher()
+
+    async def _run():
+        await cache.async_get("a", date(2021, 1, 1), date(2021, 1, 10), fetch)
+        await cache.async_get("b", date(2021, 1, 1), date(2021, 1, 10), fetch)
+        # Key "a" becomes the most recently used one
+        await cache.async_get("a", date(2021, 1, 1), date(2021, 1, 5), fetch)
+        await cache.async_get("c", date(2021, 1, 1), date(2021, 1, 10), fetch)
+
+    asyncio.run(_run())
+
+    assert list(cache._entries) == ["a", "c"]
+    assert cache.size == 20
+
+
+def test_key_being_requested_is_never_evicted():
+    cache, fetch = _make_cache(max_items=5), Fetcher()
+
+    async def _run():
+        await cache.async_get("a", date(2021, 1, 1), date(2021, 1, 3), fetch)
+        return await cache.async_get("b", date(2021, 1, 1), date(2021, 1, 10), fetch)
+
+    result = asyncio.run(_run())
+
+    assert result == SOURCE[:10]
+    assert list(cache._entries) == ["b"]
+    assert cache.size == 10
+
+
+def test_invalidation():
+    cache, fetch = _make_cache(), Fetcher()
+
+    async def _run():
+        await cache.async_get(("a", "1"), date(2021, 1, 1), date(2021, 1, 10), fetch)
+        await cache.async_get(("b", "1"), date(2021, 1, 1), date(2021, 1, 10), fetch)
+        cache.invalidate_matching(lambda key: key[0] == "a")
+        assert list(cache._entries) == [("b", "1")]
+        assert cache.size == 10
+        cache.invalidate()
+        assert cache.size == 0
+        await cache.async_get(("b", "1"), date(2021, 1, 1), date(2021, 1, 10), fetch)
+
+    asyncio.run(_run())
+
+    assert len(fetch.calls) == 3
+
+
+def test_invalidation_while_fetching_discards_fetched_data():
+    cache = _make_cache()
+    calls = []
+
+    async def _fetch(start: date, end: date) -> List[date]:
+        calls.append((start, end))
+        if len(calls) == 1:
+            # New rows got stored while the first fetch was running
+            cache.invalidate("a")
+        return [item for item in SOURCE if start <= item <= end]
+
+    async def _run():
+        result = await cache.async_get("a", date(2021, 1, 1), date(2021, 1, 10), _fetch)
+        assert cache.size == 0
+        return result
+
+    result = asyncio.run(_run())
+
+    assert result == SOURCE[:10]
+    assert len(calls) == 2
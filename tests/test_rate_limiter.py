@@ -0,0 +1,162 @@
+import asyncio
+from types import SimpleNamespace
+from typing import List
+
+from custom_components.tns_energo._http import TokenBucket, async_update_rate_limits
+from custom_components.tns_energo._util import (
+    PRIORITY_BACKFILL,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    request_priority,
+)
+from custom_components.tns_energo.const import (
+    DATA_API_OBJECTS,
+    DATA_FINAL_CONFIG,
+    DATA_RATE_LIMITERS,
+    DEFAULT_RATE_LIMIT_BURST,
+    DEFAULT_RATE_LIMIT_RATE,
+)
+
+
+async def _acquire_in_order(bucket: TokenBucket, requests) -> List[str]:
+    order = []
+
+    async def _acquire(name: str, priority: int) -> None:
+        with request_priority(priority):
+            await bucket.async_acquire()
+        order.append(name)
+
+    # Drain the bucket, so that every request below gets queued
+    while bucket._tokens >= 1:
+        await bucket.async_acquire()
+
+    await asyncio.gather(*(_acquire(name, priority) for name, priority in requests))
+    return order
+
+
+def test_burst_passes_immediately():
+    async def _run():
+        bucket = TokenBucket(rate=0.001, burst=3)
+        waited = [await bucket.async_acquire() for _ in range(3)]
+        return bucket, waited
+
+    bucket, waited = asyncio.run(_run())
+
+    assert max(waited) < 0.01
+    assert bucket.acquired == 3
+    assert bucket.queue_depth == 0
+
+
+def test_queued_requests_are_ordered_by_priority():
+    async def _run():
+        bucket = TokenBucket(rate=200, burst=1)
+        return await _acquire_in_order(
+            bucket,
+            [
+                ("backfill", PRIORITY_BACKFILL),
+                ("background", PRIORITY_BACKGROUND),
+                ("interactive", PRIORITY_INTERACTIVE),
+            ],
+        )
+
+    assert asyncio.run(_run()) == ["interactive", "background", "backfill"]
+
+
+def test_same_priority_requests_are_fifo():
+    async def _run():
+        bucket = TokenBucket(rate=200, burst=1)
+        return await _acquire_in_order(
+            bucket,
+            [
+                ("background-1", PRIORITY_BACKGROUND),
+                ("interactive-1", PRIORITY_INTERACTIVE),
+                ("background-2", PRIORITY_BACKGROUND),
+                ("interactive-2", PRIORITY_INTERACTIVE),
+            ],
+        )
+
+    assert asyncio.run(_run()) == [
+        "interactive-1",
+        "interactive-2",
+        "background-1",
+        "background-2",
+    ]
+
+
+def test_latency_is_recorded_per_priority():
+    async def _run():
+        bucket = TokenBucket(rate=100, burst=1)
+        await _acquire_in_order(
+            bucket,
+            [("interactive", PRIORITY_INTERACTIVE), ("backfill", PRIORITY_BACKFILL)],
+        )
+        return bucket
+
+    bucket = asyncio.run(_run())
+
+    assert bucket.latency[PRIORITY_INTERACTIVE].count == 1
+    assert bucket.latency[PRIORITY_BACKFILL].count == 1
+    assert (
+        bucket.latency[PRIORITY_BACKFILL].max_wait > bucket.latency[PRIORITY_INTERACTIVE].max_wait
+    )
+
+
+def test_cancelled_waiter_does_not_consume_token():
+    async def _run():
+        bucket = TokenBucket(rate=100, burst=1)
+        await bucket.async_acquire()
+
+        cancelled = asyncio.ensure_future(bucket.async_acquire())
+        waiting = asyncio.ensure_future(bucket.async_acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        await asyncio.wait_for(waiting, 1)
+        return bucket
+
+    bucket = asyncio.run(_run())
+
+    assert bucket.acquired == 2
+    assert bucket.queue_depth == 0
+
+
+def test_configure_applies_looser_and_stricter_limits():
+    bucket = TokenBucket(rate=1, burst=2)
+
+    bucket.configure(10, 20)
+    assert (bucket.rate, bucket.burst) == (10, 20)
+
+    bucket.configure(0.5, 1)
+    assert (bucket.rate, bucket.burst) == (0.5, 1)
+    assert bucket._tokens <= 1
+
+
+def _make_api() -> SimpleNamespace:
+    return SimpleNamespace(requests_url_base="https://rest.example.com/version/1/mobile")
+
+
+def test_update_rate_limits_follows_loaded_entries():
+    bucket = TokenBucket(DEFAULT_RATE_LIMIT_RATE, DEFAULT_RATE_LIMIT_BURST)
+    hass = SimpleNamespace(
+        data={
+            DATA_RATE_LIMITERS: {"rest.example.com": bucket},
+            DATA_API_OBJECTS: {"strict": _make_api(), "loose": _make_api()},
+            DATA_FINAL_CONFIG: {
+                "strict": {"rate_limit": {"rate": 0.5, "burst": 30}},
+                "loose": {"rate_limit": {"rate": 5.0, "burst": 3}},
+            },
+        }
+    )
+
+    async_update_rate_limits(hass)
+    assert (bucket.rate, bucket.burst) == (0.5, 3)
+
+    # Unloading the strict entry loosens limits again
+    del hass.data[DATA_API_OBJECTS]["strict"], hass.data[DATA_FINAL_CONFIG]["strict"]
+    async_update_rate_limits(hass)
+    assert (bucket.rate, bucket.burst) == (5.0, 3)
+
+    hass.data[DATA_API_OBJECTS].clear()
+    hass.data[DATA_FINAL_CONFIG].clear()
+    async_update_rate_limits(hass)
+    assert (bucket.rate, bucket.burst) == (DEFAULT_RATE_LIMIT_RATE, DEFAULT_RATE_LIMIT_BURST)
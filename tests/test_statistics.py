@@ -0,0 +1,85 @@
+from datetime import date
+from typing import List, Optional, Tuple
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.tns_energo._consumption import derive_consumption
+from custom_components.tns_energo._statistics import make_statistics_rows
+
+KEY = ("580000000000", "M1", "t1")
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _make_rows(
+    readings: List[Tuple[date, float, int]],
+    coefficient: Optional[float] = None,
+    last_day: Optional[date] = None,
+    last_sum: float = 0.0,
+):
+    series_rows = [
+        (0, device, taken_on.toordinal() - _EPOCH, value) for taken_on, value, device in readings
+    ]
+    coefficients = None if coefficient is None else {KEY[:2]: coefficient}
+    consumption = derive_consumption([KEY], series_rows, coefficients)[KEY]
+
+    return make_statistics_rows(
+        [(taken_on, value) for taken_on, value, _ in readings], consumption, last_day, last_sum
+    )
+
+
+def test_state_is_reading_and_sum_accumulates_consumption():
+    rows = _make_rows(
+        [(date(2021, 1, 1), 100.0, 0), (date(2021, 1, 3), 130.0, 0), (date(2021, 2, 1), 150.0, 0)]
+    )
+
+    assert [(row["state"], row["sum"]) for row in rows] == [
+        (100.0, 0.0),
+        (130.0, 30.0),
+        (150.0, 50.0),
+    ]
+    assert rows[1]["start"] == dt_util.start_of_local_day(date(2021, 1, 3))
+
+
+def test_sum_does_not_drop_over_meter_replacement():
+    rows = _make_rows(
+        [
+            (date(2021, 1, 1), 9000.0, 0),
+            (date(2021, 1, 2), 9010.0, 0),
+            # New meter starts counting from zero
+            (date(2021, 1, 4), 3.0, 1),
+            (date(2021, 1, 5), 10.0, 1),
+        ]
+    )
+
+    assert [(row["state"], row["sum"]) for row in rows] == [
+        (9000.0, 0.0),
+        (9010.0, 10.0),
+        (3.0, 10.0),
+        (10.0, 17.0),
+    ]
+
+
+def test_sum_is_scaled_by_transmission_coefficient():
+    rows = _make_rows(
+        [(date(2021, 1, 1), 100.0, 0), (date(2021, 1, 3), 104.0, 0)],
+        coefficient=40.0,
+    )
+
+    assert [(row["state"], row["sum"]) for row in rows] == [(100.0, 0.0), (104.0, 160.0)]
+
+
+def test_sum_continues_from_last_imported_row():
+    rows = _make_rows(
+        [
+            (date(2021, 1, 1), 100.0, 0),
+            (date(2021, 1, 3), 130.0, 0),
+            (date(2021, 1, 4), 135.0, 0),
+            (date(2021, 1, 6), 145.0, 0),
+        ],
+        coefficient=2.0,
+        last_day=date(2021, 1, 3),
+        last_sum=1000.0,
+    )
+
+    assert [(row["state"], row["sum"]) for row in rows] == [(135.0, 1010.0), (145.0, 1030.0)]
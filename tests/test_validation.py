@@ -0,0 +1,133 @@
+from datetime import date
+from types import MappingProxyType
+
+import pytest
+
+from custom_components.tns_energo._validation import (
+    IndicationsValidationError,
+    REASON_ABOVE_MAX_DIFFERENCE,
+    REASON_NOT_ABOVE_LAST,
+    REASON_UNKNOWN_ZONE,
+    check_indications,
+    validate_indications,
+)
+from tns_energo_api import Meter, MeterZone
+
+
+def _make_zone(last_indication, max_indication_difference=None) -> MeterZone:
+    return MeterZone(
+        identifier="1",
+        index=0,
+        name="T1",
+        last_indication=last_indication,
+        max_indication_difference=max_indication_difference,
+        closing_indication=None,
+        label="t1",
+    )
+
+
+def _make_meter(**zones: MeterZone) -> Meter:
+    return Meter(
+        account=None,
+        code="M1",
+        can_delete=False,
+        checkup_date=date(2030, 1, 1),
+        checkup_status=0,
+        checkup_url=None,
+        last_checkup_date=None,
+        manufactured_date=None,
+        identifier="1",
+        transmission_coefficient=1.0,
+        last_indications_date=date(2021, 1, 20),
+        install_location="",
+        model="",
+        precision=0,
+        status=None,
+        service_name="",
+        service_number="",
+        tariff_count=len(zones),
+        type=1,
+        zones=MappingProxyType(zones),
+    )
+
+
+def _reasons(meter: Meter, indications, ignore_values: bool = False):
+    return [
+        (reason["zone"], reason["reason"], reason["limit"])
+        for reason in validate_indications(meter, indications, ignore_values)
+    ]
+
+
+def test_valid_indications():
+    meter = _make_meter(t1=_make_zone(100, 500.0), t2=_make_zone(50))
+
+    assert validate_indications(meter, {"t1": 150, "t2": 51.5}) == []
+    check_indications(meter, {"t1": 600})
+
+
+def test_unknown_zone():
+    meter = _make_meter(t1=_make_zone(100), t2=_make_zone(50))
+
+    assert _reasons(meter, {"t3": 10}) == [("t3", REASON_UNKNOWN_ZONE, ["t1", "t2"])]
+
+
+def test_not_above_last():
+    meter = _make_meter(t1=_make_zone(100))
+
+    assert _reasons(meter, {"t1": 100}) == [("t1", REASON_NOT_ABOVE_LAST, 100)]
+    assert _reasons(meter, {"t1": 90}) == [("t1", REASON_NOT_ABOVE_LAST, 100)]
+
+
+def test_fractional_part_is_discarded():
+    # Portal accepts integers only
+    meter = _make_meter(t1=_make_zone(100))
+
+    assert _reasons(meter, {"t1": 100.9}) == [("t1", REASON_NOT_ABOVE_LAST, 100)]
+
+
+def test_missing_last_indication_counts_as_zero():
+    meter = _make_meter(t1=_make_zone(None))
+
+    assert _reasons(meter, {"t1": 1}) == []
+    assert _reasons(meter, {"t1": 0}) == [("t1", REASON_NOT_ABOVE_LAST, 0)]
+
+
+def test_above_max_difference():
+    meter = _make_meter(t1=_make_zone(100, 500.0))
+
+    assert _reasons(meter, {"t1": 600}) == []
+    assert _reasons(meter, {"t1": 601}) == [("t1", REASON_ABOVE_MAX_DIFFERENCE, 600.0)]
+
+
+def test_max_difference_is_not_checked_when_absent():
+    meter = _make_meter(t1=_make_zone(100, 0.0), t2=_make_zone(100, None))
+
+    assert _reasons(meter, {"t1": 100000, "t2": 100000}) == []
+
+
+def test_every_zone_is_reported():
+    meter = _make_meter(t1=_make_zone(100, 10.0), t2=_make_zone(100))
+
+    assert _reasons(meter, {"t1": 200, "t2": 50, "t9": 1}) == [
+        ("t1", REASON_ABOVE_MAX_DIFFERENCE, 110.0),
+        ("t2", REASON_NOT_ABOVE_LAST, 100),
+        ("t9", REASON_UNKNOWN_ZONE, ["t1", "t2"]),
+    ]
+
+
+def test_ignore_values_checks_zones_only():
+    meter = _make_meter(t1=_make_zone(100, 10.0))
+
+    assert _reasons(meter, {"t1": 1}, ignore_values=True) == []
+    assert _reasons(meter, {"t2": 1}, ignore_values=True) == [("t2", REASON_UNKNOWN_ZONE, ["t1"])]
+
+
+def test_check_indications_raises_with_all_reasons():
+    meter = _make_meter(t1=_make_zone(100), t2=_make_zone(100))
+
+    with pytest.raises(IndicationsValidationError) as exc_info:
+        check_indications(meter, {"t1": 1, "t2": 2})
+
+    assert isinstance(exc_info.value, ValueError)
+    assert [reason["zone"] for reason in exc_info.value.reasons] == ["t1", "t2"]
+    assert "t1" in str(exc_info.value) and "t2" in str(exc_info.value)